@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+"""
+LQA scan for xTranslator XML, mirroring the app's LqaScanner/LqaHeuristics rules.
+
+Each string is visited once: its shared features (UI-token multisets, stripped text, Latin words,
+Hangul ratio, tone) are computed up front and every rule reads from them. Rules that need the whole
+corpus (dialogue tone majorities, duplicate-source consistency) build their tables in `prepare()`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import textwrap
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from context_db import load_config
+from qa_placeholders import _collect_xml_paths
+
+
+UI_TOKEN_RE = re.compile(r"[+-]?<\s*[^>]+\s*>|\[pagebreak\]|__XT_[A-Za-z0-9_]+__", re.IGNORECASE)
+LATIN_WORD_RE = re.compile(r"[A-Za-z]{2,}")
+ASCII_LETTER_RE = re.compile(r"[A-Za-z]")
+WS_RE = re.compile(r"\s+")
+HANGUL_RE = re.compile(r"[가-힣]")
+
+_PUNCT = r"!\"#%&'()*+,\-./:;<=>?@\[\\\]^_`{|}~…‘’“”·「」『』"
+
+DOUBLED_PARTICLE_RE = re.compile(r"을\s*를|를\s*을|은\s*는|는\s*은|이\s*가|가\s*이|와\s*과|과\s*와")
+HANGUL_PARTICLE_RE = re.compile(rf"(?P<word>[가-힣]{{1,20}})(?P<particle>을|를|은|는|이|가|와|과)(?=$|[\s{_PUNCT}])")
+ROMAN_PARTICLE_RE = re.compile(
+    rf"\b(?P<word>[A-Za-z][A-Za-z0-9'’\-]{{1,}})(?P<particle>을|은|이|과)(?=$|[\s{_PUNCT}])"
+)
+PARTICLE_MARKER_RE = re.compile(
+    r"을\(를\)|를\(을\)|은\(는\)|는\(은\)|을/를|를/을|은/는|는/은"
+    r"|\(\s*을\s*\)\s*를|\(\s*를\s*\)\s*을|\(\s*은\s*\)\s*는|\(\s*는\s*\)\s*은"
+    r"|이\(가\)|가\(이\)|이/가|가/이|\(\s*이\s*\)\s*가|\(\s*가\s*\)\s*이"
+    r"|과\(와\)|와\(과\)|과/와|와/과|\(\s*와\s*\)\s*과|\(\s*과\s*\)\s*와"
+    r"|으로\(로\)|로\(으로\)|으로/로|로/으로|\(\s*으\s*\)\s*로"
+)
+DUPLICATION_ARTIFACT_RE = re.compile(r"효과\s+효과|초\s+초")
+PERCENT_ARTIFACT_RE = re.compile(r"(?:<\s*\d+\s*>|\d+)\s*%\s*포인트|[가-힣]{2,}%")
+
+_EXPECTED_AFTER_FINAL = {"를": "을", "는": "은", "가": "이", "와": "과"}
+_EXPECTED_AFTER_VOWEL = {"을": "를", "은": "는", "이": "가", "과": "와"}
+
+SEVERITY_WEIGHT = {"Error": 0, "Warn": 1}
+
+TONE_UNKNOWN = "Unknown"
+TONE_HAMNIDA = "Hamnida"
+TONE_HAEYO = "Haeyo"
+TONE_PLAIN_DA = "PlainDa"
+TONE_CASUAL = "Casual"
+
+_TONE_TRAIL = " \t\r\n.,!?…\"'”’)]」』"
+_TONE_RECS = ("BOOK", "QUST", "MESG", "DIAL", "INFO")
+
+
+@dataclass
+class LqaEntry:
+    file: str
+    order_index: int
+    edid: str | None
+    rec: str | None
+    source: str
+    dest: str
+
+
+@dataclass
+class LqaIssue:
+    file: str
+    order_index: int
+    edid: str | None
+    rec: str | None
+    severity: str
+    code: str
+    message: str
+    source: str
+    dest: str
+
+
+@dataclass
+class StringFeatures:
+    """Per-string values shared by every rule; computed once per entry."""
+
+    rec_base: str
+    src_clean: str
+    dst_clean: str
+    src_comparable: str
+    dst_comparable: str
+    src_tokens: Counter[str]
+    dst_tokens: Counter[str]
+    src_latin_words: list[str]
+    dst_latin_words: list[str]
+    dst_hangul_ratio: float
+    tone: str
+
+
+@dataclass
+class RuleStats:
+    checked: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class GlossaryTerm:
+    source: str
+    target: str
+
+
+def is_korean_language(lang: str) -> bool:
+    s = (lang or "").strip().lower()
+    if not s:
+        return False
+    return s in ("ko", "korean", "한국어") or s.startswith(("ko-", "ko_")) or "korean" in s or "한국" in s
+
+
+def get_rec_base(rec: str | None) -> str:
+    s = (rec or "").strip()
+    idx = s.find(":")
+    if idx > 0:
+        s = s[:idx]
+    return s.upper()
+
+
+def normalize_edid_stem(edid: str | None) -> str:
+    s = (edid or "").strip()
+    end = len(s)
+    while end > 0 and s[end - 1].isdigit():
+        end -= 1
+    if end <= 0:
+        return ""
+    return s[:end].rstrip("_- ")
+
+
+def _normalize_ui_token(token: str) -> str:
+    s = token.strip()
+    if s.startswith("<"):
+        return WS_RE.sub("", s).lower()
+    if s.startswith("["):
+        return s.lower()
+    if s.upper().startswith("__XT_"):
+        return s.upper()
+    return s
+
+
+def _comparable(clean: str) -> str:
+    return WS_RE.sub(" ", clean).strip().lower()
+
+
+def classify_tone(text: str) -> str:
+    cleaned = UI_TOKEN_RE.sub("", text or "").strip().rstrip(_TONE_TRAIL)
+    if not cleaned:
+        return TONE_UNKNOWN
+    if cleaned.endswith(("나요", "군요")):
+        return TONE_HAEYO
+    if cleaned.endswith(("습니다", "읍니다", "입니다", "합니다", "됩니까", "됩시다", "십시오", "습니까")):
+        return TONE_HAMNIDA
+    if cleaned.endswith("요"):
+        return TONE_HAEYO
+    if cleaned.endswith("다"):
+        return TONE_PLAIN_DA
+    if cleaned.endswith(("해", "야", "지", "냐", "라")):
+        return TONE_CASUAL
+    return TONE_UNKNOWN
+
+
+def strong_majority_tone(tones: list[str]) -> str | None:
+    counts = Counter(t for t in tones if t != TONE_UNKNOWN)
+    total = sum(counts.values())
+    if total < 4 or len(counts) < 2:
+        return None
+    best, best_count = counts.most_common(1)[0]
+    if best_count < 3 or best_count / total < 0.75:
+        return None
+    return best
+
+
+def compute_features(entry: LqaEntry) -> StringFeatures:
+    src_tokens: Counter[str] = Counter()
+    for m in UI_TOKEN_RE.finditer(entry.source):
+        tok = _normalize_ui_token(m.group(0))
+        if tok:
+            src_tokens[tok] += 1
+    dst_tokens: Counter[str] = Counter()
+    for m in UI_TOKEN_RE.finditer(entry.dest):
+        tok = _normalize_ui_token(m.group(0))
+        if tok:
+            dst_tokens[tok] += 1
+
+    src_clean = UI_TOKEN_RE.sub("", entry.source) if src_tokens else entry.source
+    dst_clean = UI_TOKEN_RE.sub("", entry.dest) if dst_tokens else entry.dest
+    dst_latin_words = LATIN_WORD_RE.findall(dst_clean)
+    hangul = len(HANGUL_RE.findall(dst_clean))
+    letters = hangul + sum(len(w) for w in dst_latin_words)
+    rec_base = get_rec_base(entry.rec)
+
+    return StringFeatures(
+        rec_base=rec_base,
+        src_clean=src_clean,
+        dst_clean=dst_clean,
+        src_comparable=_comparable(src_clean),
+        dst_comparable=_comparable(dst_clean),
+        src_tokens=src_tokens,
+        dst_tokens=dst_tokens,
+        src_latin_words=LATIN_WORD_RE.findall(src_clean),
+        dst_latin_words=dst_latin_words,
+        dst_hangul_ratio=(hangul / letters) if letters else 0.0,
+        tone=classify_tone(entry.dest) if rec_base in _TONE_RECS else TONE_UNKNOWN,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+
+
+class LqaRule:
+    """Base rule: `check()` returns (severity, code, message) triples for one string."""
+
+    code = ""
+    korean_only = False
+    # Stop running later rules for this string when this one fires (e.g. untranslated).
+    short_circuit = False
+
+    def prepare(self, entries: list[LqaEntry], features: list[StringFeatures]) -> None:
+        return None
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        raise NotImplementedError
+
+
+class UntranslatedRule(LqaRule):
+    code = "untranslated"
+    korean_only = True
+    short_circuit = True
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        src = feat.src_comparable
+        if len(src) < 6 or not ASCII_LETTER_RE.search(src):
+            return []
+        if src != feat.dst_comparable:
+            return []
+        return [("Warn", self.code, "번역문이 원문과 동일합니다. (미번역 가능성)")]
+
+
+class TokenMismatchRule(LqaRule):
+    code = "token_mismatch"
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        if not feat.src_tokens or feat.src_tokens == feat.dst_tokens:
+            return []
+        return [("Error", self.code, "원문/번역 태그·토큰(<...>, [pagebreak], __XT_*__)이 일치하지 않습니다.")]
+
+
+class GlossaryMissingRule(LqaRule):
+    """Source contains a glossary term (word boundary, case-insensitive) but dest lacks its target."""
+
+    code = "glossary_missing"
+    korean_only = True
+
+    def __init__(self, terms: list[GlossaryTerm]) -> None:
+        self.by_source: dict[str, GlossaryTerm] = {}
+        for t in terms:
+            if t.source.strip() and t.target.strip():
+                self.by_source.setdefault(t.source.strip().lower(), t)
+        self.pattern: re.Pattern[str] | None = None
+        if self.by_source:
+            # One alternation over every term (longest first) instead of one search per term.
+            alternation = "|".join(re.escape(s) for s in sorted(self.by_source, key=len, reverse=True))
+            self.pattern = re.compile(rf"(?<![\w])(?:{alternation})(?![\w])", re.IGNORECASE)
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        if self.pattern is None or not feat.src_latin_words:
+            return []
+        dst_lower = feat.dst_clean.lower()
+        for m in self.pattern.finditer(feat.src_clean):
+            term = self.by_source[m.group(0).lower()]
+            if term.target.strip().lower() not in dst_lower:
+                return [("Warn", self.code, f"용어 누락: {term.source} => {term.target}")]
+        return []
+
+
+class LengthRiskRule(LqaRule):
+    code = "length_risk"
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        if feat.rec_base not in ("QUST", "MESG"):
+            return []
+        src_len = len(feat.src_clean.strip())
+        dst_len = len(feat.dst_clean.strip())
+        if src_len <= 0 or dst_len <= 0:
+            return []
+        ratio = dst_len / src_len
+        abs_threshold, ratio_threshold = (160, 2.5) if feat.rec_base == "MESG" else (300, 2.2)
+        # Conservative: require both absolute and relative growth to reduce false positives.
+        if dst_len < abs_threshold or ratio < ratio_threshold:
+            return []
+        return [("Warn", self.code, f"길이 위험: src={src_len}, dst={dst_len}, x{ratio:.2f}")]
+
+
+class RecToneRule(LqaRule):
+    code = "rec_tone"
+
+    _EXPECTED = {"BOOK": TONE_PLAIN_DA, "QUST": TONE_HAMNIDA, "MESG": TONE_HAMNIDA}
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        expected = self._EXPECTED.get(feat.rec_base)
+        if expected is None or feat.tone in (TONE_UNKNOWN, expected):
+            return []
+        if feat.rec_base == "BOOK":
+            message = f"BOOK 톤: 서술체(…다/…한다) 권장 (현재={feat.tone})"
+        else:
+            message = f"UI/퀘스트 톤: 합니다체 권장 (현재={feat.tone})"
+        return [("Warn", self.code, message)]
+
+
+class ParticleRule(LqaRule):
+    """Unresolved/doubled/mismatched particles (first match wins), plus duplication and percent artifacts."""
+
+    code = "particle"
+    korean_only = True
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        dest = entry.dest
+        out: list[tuple[str, str, str]] = []
+        primary = self._primary(dest)
+        if primary:
+            out.append(primary)
+        m = DUPLICATION_ARTIFACT_RE.search(dest)
+        if m:
+            out.append(("Warn", "dup_artifact", f"중복/오타 패턴이 감지되었습니다: '{WS_RE.sub(' ', m.group(0)).strip()}'."))
+        m = PERCENT_ARTIFACT_RE.search(dest)
+        if m:
+            out.append(("Warn", "percent_artifact", f"퍼센트 표기 오류 가능성: '{m.group(0)}'."))
+        return out
+
+    @staticmethod
+    def _primary(dest: str) -> tuple[str, str, str] | None:
+        if PARTICLE_MARKER_RE.search(dest):
+            return ("Warn", "particle_marker", "조사 표기(괄호/슬래시 형태)가 그대로 남아있습니다.")
+        m = DOUBLED_PARTICLE_RE.search(dest)
+        if m:
+            return ("Warn", "particle_double", f"조사 병기/오타가 남아있습니다: '{WS_RE.sub('', m.group(0))}'.")
+        for m in HANGUL_PARTICLE_RE.finditer(dest):
+            word, particle = m.group("word"), m.group("particle")
+            has_final = (ord(word[-1]) - 0xAC00) % 28 != 0
+            expected = (_EXPECTED_AFTER_FINAL if has_final else _EXPECTED_AFTER_VOWEL).get(particle)
+            if expected:
+                return ("Warn", "particle_mismatch", f"조사 오류 가능성: {word}{particle} → {word}{expected}")
+        for m in ROMAN_PARTICLE_RE.finditer(dest):
+            word, particle = m.group("word"), m.group("particle")
+            if word[-1].lower() not in "aeiouy":
+                continue
+            expected = _EXPECTED_AFTER_VOWEL.get(particle)
+            if expected:
+                return ("Warn", "particle_roman_mismatch", f"조사 오류 가능성(로마자): {word}{particle} → {word}{expected}")
+        return None
+
+
+class BracketMismatchRule(LqaRule):
+    code = "bracket_mismatch"
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        d = entry.dest
+        if d.count("(") == d.count(")") and d.count("[") == d.count("]"):
+            return []
+        return [("Warn", self.code, "괄호/대괄호의 짝이 맞지 않을 수 있습니다.")]
+
+
+class EnglishResidueRule(LqaRule):
+    code = "english_residue"
+    korean_only = True
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        words = feat.dst_latin_words
+        if not words:
+            return []
+        sample = ", ".join(dict.fromkeys(words[:5]))
+        if feat.dst_hangul_ratio < 0.2:
+            return [("Warn", self.code, f"번역문 대부분이 영문입니다 (한글 비율 {feat.dst_hangul_ratio:.0%}): {sample}")]
+        return [("Warn", self.code, f"번역문에 영문이 남아있을 수 있습니다: {sample}")]
+
+
+class DialogueToneConsistencyRule(LqaRule):
+    code = "tone_inconsistent"
+
+    def __init__(self) -> None:
+        self.majority: dict[str, str] = {}
+
+    def prepare(self, entries: list[LqaEntry], features: list[StringFeatures]) -> None:
+        groups: dict[str, list[str]] = {}
+        seq = 0
+        prev_seq_dialogue = False
+        for entry, feat in zip(entries, features):
+            if feat.rec_base not in ("DIAL", "INFO"):
+                prev_seq_dialogue = False
+                continue
+            stem = normalize_edid_stem(entry.edid)
+            if stem:
+                key = "edid:" + stem
+                prev_seq_dialogue = False
+            else:
+                if not prev_seq_dialogue:
+                    seq += 1
+                    prev_seq_dialogue = True
+                key = f"seq:{seq}"
+            groups.setdefault(key, []).append(feat.tone)
+        self.majority = {}
+        for key, tones in groups.items():
+            best = strong_majority_tone(tones)
+            if best is not None:
+                self.majority[key] = best
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        if feat.rec_base not in ("DIAL", "INFO") or feat.tone == TONE_UNKNOWN:
+            return []
+        stem = normalize_edid_stem(entry.edid)
+        # No stable EDID stem => do not flag tone mismatches (avoid high false positives).
+        majority = self.majority.get("edid:" + stem) if stem else None
+        if majority is None or feat.tone == majority:
+            return []
+        return [("Warn", self.code, f"대사 그룹 내 말투가 섞여있을 수 있습니다. (majority={majority})")]
+
+
+class DuplicateSourceConsistencyRule(LqaRule):
+    """The same source text translated differently elsewhere in the scan; flags the minority variants."""
+
+    code = "source_inconsistent"
+
+    def __init__(self) -> None:
+        self.majority: dict[str, tuple[str, int, int]] = {}
+
+    def prepare(self, entries: list[LqaEntry], features: list[StringFeatures]) -> None:
+        variants: dict[str, Counter[str]] = {}
+        for feat in features:
+            if len(feat.src_comparable) < 2 or not feat.dst_comparable or feat.src_comparable == feat.dst_comparable:
+                continue
+            variants.setdefault(feat.src_comparable, Counter())[feat.dst_comparable] += 1
+        self.majority = {}
+        for src, counts in variants.items():
+            if len(counts) < 2:
+                continue
+            best, best_count = counts.most_common(1)[0]
+            self.majority[src] = (best, best_count, len(counts))
+
+    def check(self, entry: LqaEntry, feat: StringFeatures) -> list[tuple[str, str, str]]:
+        hit = self.majority.get(feat.src_comparable)
+        if hit is None:
+            return []
+        best, best_count, n_variants = hit
+        if feat.dst_comparable == best:
+            return []
+        return [
+            ("Warn", self.code, f"같은 원문이 {n_variants}가지로 번역되었습니다. 다수 번역({best_count}건): '{best}'")
+        ]
+
+
+def default_rules(glossary: list[GlossaryTerm] | None = None) -> list[LqaRule]:
+    # Order mirrors LqaScanner.ApplyExtractedRulesForEntry.
+    return [
+        UntranslatedRule(),
+        TokenMismatchRule(),
+        GlossaryMissingRule(glossary or []),
+        LengthRiskRule(),
+        RecToneRule(),
+        ParticleRule(),
+        BracketMismatchRule(),
+        EnglishResidueRule(),
+        DialogueToneConsistencyRule(),
+        DuplicateSourceConsistencyRule(),
+    ]
+
+
+class LqaEngine:
+    def __init__(self, target_lang: str, rules: list[LqaRule] | None = None) -> None:
+        self.is_korean = is_korean_language(target_lang)
+        self.rules = [r for r in (rules if rules is not None else default_rules()) if self.is_korean or not r.korean_only]
+        self.stats: dict[str, RuleStats] = {type(r).__name__: RuleStats() for r in self.rules}
+        self.feature_seconds = 0.0
+        self.prepare_seconds = 0.0
+
+    def scan(self, entries: list[LqaEntry]) -> list[LqaIssue]:
+        t0 = time.perf_counter()
+        features = [compute_features(e) for e in entries]
+        self.feature_seconds += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for rule in self.rules:
+            rule.prepare(entries, features)
+        self.prepare_seconds += time.perf_counter() - t0
+
+        issues: list[LqaIssue] = []
+        timed = [(rule, self.stats[type(rule).__name__]) for rule in self.rules]
+        clock = time.perf_counter
+        for entry, feat in zip(entries, features):
+            for rule, stats in timed:
+                t0 = clock()
+                found = rule.check(entry, feat)
+                stats.seconds += clock() - t0
+                stats.checked += 1
+                if not found:
+                    continue
+                stats.hits += len(found)
+                for severity, code, message in found:
+                    issues.append(
+                        LqaIssue(
+                            file=entry.file,
+                            order_index=entry.order_index,
+                            edid=entry.edid,
+                            rec=entry.rec,
+                            severity=severity,
+                            code=code,
+                            message=message,
+                            source=entry.source,
+                            dest=entry.dest,
+                        )
+                    )
+                if rule.short_circuit:
+                    break
+
+        issues.sort(key=lambda i: (SEVERITY_WEIGHT.get(i.severity, 2), i.file, i.order_index, i.code.lower()))
+        return issues
+
+    def timing_rows(self) -> list[dict[str, object]]:
+        rows: list[dict[str, object]] = [
+            {"rule": "(features)", "checked": 0, "hits": 0, "ms": round(self.feature_seconds * 1000, 2)},
+            {"rule": "(prepare)", "checked": 0, "hits": 0, "ms": round(self.prepare_seconds * 1000, 2)},
+        ]
+        for name, s in self.stats.items():
+            rows.append({"rule": name, "checked": s.checked, "hits": s.hits, "ms": round(s.seconds * 1000, 2)})
+        return rows
+
+
+# ---------------------------------------------------------------------------
+# Input
+# ---------------------------------------------------------------------------
+
+_GLOSSARY_PAIR_RE = re.compile(r'"(?P<src>[^"\n]+)"\s*:\s*"(?P<dst>[^"\n]*)"')
+
+
+def load_glossary(path: Path) -> list[GlossaryTerm]:
+    """TSV (`Source<TAB>Target`) or the repo's hand-edited JSON-ish glossary (`"Term": "용어" // note`)."""
+    text = path.read_text(encoding="utf-8-sig")
+    terms: list[GlossaryTerm] = []
+    if path.suffix.lower() in (".tsv", ".txt"):
+        for line in text.splitlines():
+            parts = line.split("\t")
+            if len(parts) < 2 or (parts[0] == "Source" and parts[1] == "Target"):
+                continue
+            terms.append(GlossaryTerm(source=parts[0].strip(), target=parts[1].strip()))
+        return terms
+    for m in _GLOSSARY_PAIR_RE.finditer(text):
+        if m.group("dst").strip():
+            terms.append(GlossaryTerm(source=m.group("src").strip(), target=m.group("dst").strip()))
+    return terms
+
+
+def read_entries(path: Path) -> tuple[str, list[LqaEntry]]:
+    """Returns (target language from <Params><Dest>, entries with a non-empty Dest)."""
+    entries: list[LqaEntry] = []
+    dest_lang = ""
+    order = 0
+    for _event, elem in ET.iterparse(str(path), events=("end",)):
+        if elem.tag == "Params":
+            dest_lang = (elem.findtext("Dest") or "").strip()
+            continue
+        if elem.tag != "String":
+            continue
+        dest = elem.findtext("Dest") or ""
+        if dest.strip():
+            entries.append(
+                LqaEntry(
+                    file=str(path),
+                    order_index=order,
+                    edid=(elem.findtext("EDID") or "").strip() or None,
+                    rec=(elem.findtext("REC") or "").strip() or None,
+                    source=elem.findtext("Source") or "",
+                    dest=dest,
+                )
+            )
+        order += 1
+        elem.clear()
+    return dest_lang, entries
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="LQA scan (untranslated, tokens, glossary, length, tone, particles) for xTranslator XML.")
+    parser.add_argument("xml_paths", nargs="+", help="XML file(s) or directories (scanned recursively for *.xml).")
+    parser.add_argument("--target-lang", default="", help="Override target language (default: <Params><Dest> of the first file).")
+    parser.add_argument("--glossary", action="append", default=[], help="Glossary file (TSV or JSON-style); repeatable.")
+    parser.add_argument("--out", default=".vibe/reports/lqa.md")
+    parser.add_argument("--json-out", default=".vibe/reports/lqa.json")
+    parser.add_argument("--limit", type=int, default=80)
+    args = parser.parse_args(argv)
+
+    cfg = load_config()
+    paths, missing = _collect_xml_paths(args.xml_paths, cfg.root)
+    for raw in missing:
+        print(f"[lqa] not found: {raw}")
+    if missing or not paths:
+        return 2
+
+    glossary: list[GlossaryTerm] = []
+    for raw in args.glossary:
+        g = Path(raw)
+        glossary.extend(load_glossary(g if g.is_absolute() else cfg.root / g))
+
+    started = time.perf_counter()
+    entries: list[LqaEntry] = []
+    target_lang = args.target_lang
+    errors: list[tuple[str, str]] = []
+    for path in paths:
+        try:
+            lang, file_entries = read_entries(path)
+        except (ET.ParseError, OSError) as e:
+            errors.append((str(path), str(e)))
+            continue
+        target_lang = target_lang or lang
+        entries.extend(file_entries)
+
+    engine = LqaEngine(target_lang or "korean", default_rules(glossary))
+    issues = engine.scan(entries)
+    elapsed = time.perf_counter() - started
+
+    by_code = Counter(i.code for i in issues)
+    timings = engine.timing_rows()
+
+    out_path = cfg.root / args.out
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    json_path = cfg.root / args.json_out
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+
+    payload = {
+        "files": [str(p) for p in paths],
+        "target_lang": target_lang,
+        "glossary_terms": len(glossary),
+        "strings_scanned": len(entries),
+        "issues_total": len(issues),
+        "issues_by_code": dict(sorted(by_code.items())),
+        "rule_timings": timings,
+        "elapsed_s": round(elapsed, 3),
+        "errors": [{"file": p, "error": e} for p, e in errors],
+        "issues": [asdict(i) for i in issues],
+    }
+    json_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    multi = len(paths) > 1
+    lines: list[str] = []
+    lines.append("# LQA\n")
+    lines.append(f"- Files: {len(paths)}" if multi else f"- File: `{paths[0]}`")
+    lines.append(f"- Target: {target_lang or '(unknown)'}; glossary terms: {len(glossary)}")
+    lines.append(f"- Strings scanned: {len(entries)}")
+    lines.append(f"- Issues: {len(issues)}")
+    for code, count in sorted(by_code.items()):
+        lines.append(f"  - {code}: {count}")
+    if errors:
+        lines.append(f"- Unreadable files: {len(errors)}")
+        for path, err in errors:
+            lines.append(f"  - `{path}`: {err}")
+    lines.append("")
+    lines.append("## Rule timings\n")
+    lines.append("| rule | checked | hits | ms |")
+    lines.append("|---|---:|---:|---:|")
+    for row in timings:
+        lines.append(f"| {row['rule']} | {row['checked']} | {row['hits']} | {row['ms']} |")
+    lines.append("")
+    lines.append("## Issues\n")
+    for i in issues[: args.limit]:
+        lines.append(f"- [{i.severity}/{i.code}] {i.rec or ''} {i.edid or ''}".rstrip())
+        if multi:
+            lines.append(textwrap.indent(f"file: {i.file}", "  - "))
+        lines.append(textwrap.indent(i.message, "  - "))
+        lines.append(textwrap.indent(f"EN: {i.source}", "  - "))
+        lines.append(textwrap.indent(f"KO: {i.dest}", "  - "))
+        lines.append("")
+    if len(issues) > args.limit:
+        lines.append(f"... truncated: {len(issues) - args.limit} more\n")
+
+    out_path.write_text("\n".join(lines), encoding="utf-8")
+    print(f"[lqa] wrote: {out_path} + {json_path.name} (strings={len(entries)}, issues={len(issues)}, {elapsed:.2f}s)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(__import__("sys").argv[1:]))
@@ -2,10 +2,15 @@
 from __future__ import annotations
 
 import argparse
+import json
+import os
 import re
 import textwrap
+import time
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
 from pathlib import Path
 
 from context_db import load_config
@@ -14,6 +19,9 @@ from context_db import load_config
 PH_RE = re.compile(r"<[^>]+>")
 XT_TOKEN_RE = re.compile(r"__XT_[A-Z0-9_]+__")
 
+MAG_FORBIDDEN_UNITS = ("초", "분", "시간", "동안", "초당")
+DUR_FORBIDDEN_UNITS = ("포인트", "%")
+
 
 @dataclass
 class QaFinding:
@@ -23,6 +31,7 @@ class QaFinding:
     source: str
     dest: str
     note: str
+    file: str | None = None
 
 
 def _multiset(xs: list[str]) -> dict[str, int]:
@@ -36,29 +45,30 @@ def _extract_placeholders(text: str) -> list[str]:
     return PH_RE.findall(text)
 
 
-def _has_bad_unit_after_mag(dest: str, bad_units: list[str]) -> list[str]:
-    hits: list[str] = []
-    for u in bad_units:
-        if re.search(rf"<mag>\s*{re.escape(u)}", dest, re.IGNORECASE):
-            hits.append(u)
-    return hits
+@lru_cache(maxsize=None)
+def _compile_unit_rule(tag: str, units: tuple[str, ...]) -> re.Pattern[str] | None:
+    """One alternation per placeholder kind: `<tag>` followed by any of the bad unit words."""
+    if not units:
+        return None
+    alternation = "|".join(re.escape(u) for u in sorted(units, key=len, reverse=True))
+    return re.compile(rf"<{tag}>\s*(?:{alternation})", re.IGNORECASE)
 
 
-def _has_bad_unit_after_dur(dest: str, bad_units: list[str]) -> list[str]:
-    hits: list[str] = []
-    for u in bad_units:
-        if re.search(rf"<dur>\s*{re.escape(u)}", dest, re.IGNORECASE):
-            hits.append(u)
-    return hits
+def _bad_unit_hits(dest: str, tag: str, rule: re.Pattern[str] | None, units: tuple[str, ...]) -> list[str]:
+    if rule is None or not rule.search(dest):
+        return []
+    # Rare path: name every offending unit (e.g. both "초" and "초당" for "<mag>초당").
+    return [u for u in units if re.search(rf"<{tag}>\s*{re.escape(u)}", dest, re.IGNORECASE)]
 
 
-def _parse_xtranslator(path: Path, cfg) -> tuple[int, list[QaFinding]]:
+def _parse_xtranslator(
+    path: Path, mag_forbid: tuple[str, ...], dur_forbid: tuple[str, ...]
+) -> tuple[int, list[QaFinding]]:
     findings: list[QaFinding] = []
     total = 0
 
-    bad_units = list(cfg.placeholders.get("bad_unit_words_ko") or [])
-    mag_forbid = [u for u in bad_units if u in ["초", "분", "시간", "동안", "초당"]]
-    dur_forbid = [u for u in bad_units if u in ["포인트", "%"]]
+    mag_rule = _compile_unit_rule("mag", mag_forbid)
+    dur_rule = _compile_unit_rule("dur", dur_forbid)
 
     # xTranslator format uses <String> entries under <Content>.
     for event, elem in ET.iterparse(str(path), events=("end",)):
@@ -85,66 +95,147 @@ def _parse_xtranslator(path: Path, cfg) -> tuple[int, list[QaFinding]]:
                 )
             )
 
-        mag_hits = _has_bad_unit_after_mag(dst, mag_forbid)
-        if mag_hits:
-            findings.append(
-                QaFinding(
-                    edid=edid,
-                    rec=rec,
-                    kind="mag_bad_unit",
-                    source=src,
-                    dest=dst,
-                    note=f"'<mag>' followed by: {', '.join(mag_hits)}",
+        if "<" in dst:
+            mag_hits = _bad_unit_hits(dst, "mag", mag_rule, mag_forbid)
+            if mag_hits:
+                findings.append(
+                    QaFinding(
+                        edid=edid,
+                        rec=rec,
+                        kind="mag_bad_unit",
+                        source=src,
+                        dest=dst,
+                        note=f"'<mag>' followed by: {', '.join(mag_hits)}",
+                    )
                 )
-            )
 
-        dur_hits = _has_bad_unit_after_dur(dst, dur_forbid)
-        if dur_hits:
-            findings.append(
-                QaFinding(
-                    edid=edid,
-                    rec=rec,
-                    kind="dur_bad_unit",
-                    source=src,
-                    dest=dst,
-                    note=f"'<dur>' followed by: {', '.join(dur_hits)}",
+            dur_hits = _bad_unit_hits(dst, "dur", dur_rule, dur_forbid)
+            if dur_hits:
+                findings.append(
+                    QaFinding(
+                        edid=edid,
+                        rec=rec,
+                        kind="dur_bad_unit",
+                        source=src,
+                        dest=dst,
+                        note=f"'<dur>' followed by: {', '.join(dur_hits)}",
+                    )
                 )
-            )
 
         elem.clear()
 
     return total, findings
 
 
+def _scan_file(job: tuple[str, tuple[str, ...], tuple[str, ...]]) -> tuple[str, int, list[QaFinding], str | None]:
+    path, mag_forbid, dur_forbid = job
+    try:
+        total, findings = _parse_xtranslator(Path(path), mag_forbid, dur_forbid)
+    except (ET.ParseError, OSError) as e:
+        return path, 0, [], str(e)
+    for f in findings:
+        f.file = path
+    return path, total, findings, None
+
+
+def _collect_xml_paths(raw_paths: list[str], root: Path) -> tuple[list[Path], list[str]]:
+    found: list[Path] = []
+    missing: list[str] = []
+    for raw in raw_paths:
+        path = Path(raw)
+        if not path.is_absolute():
+            path = root / path
+        if path.is_dir():
+            found.extend(sorted(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() == ".xml"))
+        elif path.exists():
+            found.append(path)
+        else:
+            missing.append(raw)
+    return found, missing
+
+
 def main(argv: list[str]) -> int:
     parser = argparse.ArgumentParser(description="Placeholder QA for xTranslator XML.")
-    parser.add_argument("xml_path")
+    parser.add_argument("xml_paths", nargs="+", help="XML file(s) or directories (scanned recursively for *.xml).")
     parser.add_argument("--out", default=".vibe/reports/placeholder_qa.md")
+    parser.add_argument("--json-out", default=".vibe/reports/placeholder_qa.json")
     parser.add_argument("--limit", type=int, default=80)
+    parser.add_argument("--jobs", type=int, default=0, help="Worker processes (0=cpu count, 1=in-process).")
     args = parser.parse_args(argv)
 
     cfg = load_config()
-    path = Path(args.xml_path)
-    if not path.is_absolute():
-        path = cfg.root / path
-    if not path.exists():
-        print(f"[qa] not found: {args.xml_path}")
+    paths, missing = _collect_xml_paths(args.xml_paths, cfg.root)
+    for raw in missing:
+        print(f"[qa] not found: {raw}")
+    if missing or not paths:
         return 2
 
-    total, findings = _parse_xtranslator(path, cfg)
-    findings.sort(key=lambda f: (f.kind, f.rec or "", f.edid or ""))
+    bad_units = list(cfg.placeholders.get("bad_unit_words_ko") or [])
+    mag_forbid = tuple(u for u in bad_units if u in MAG_FORBIDDEN_UNITS)
+    dur_forbid = tuple(u for u in bad_units if u in DUR_FORBIDDEN_UNITS)
+    jobs_list = [(str(p), mag_forbid, dur_forbid) for p in paths]
+
+    started = time.perf_counter()
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(paths) == 1:
+        results = [_scan_file(j) for j in jobs_list]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            results = list(pool.map(_scan_file, jobs_list, chunksize=max(1, len(paths) // (jobs * 4))))
+    elapsed = time.perf_counter() - started
+
+    total = 0
+    findings: list[QaFinding] = []
+    per_file: list[dict[str, object]] = []
+    errors: list[tuple[str, str]] = []
+    for path, count, file_findings, err in results:
+        if err is not None:
+            errors.append((path, err))
+        total += count
+        findings.extend(file_findings)
+        per_file.append({"file": path, "strings": count, "findings": len(file_findings), "error": err})
+    findings.sort(key=lambda f: (f.kind, f.file or "", f.rec or "", f.edid or ""))
+
+    by_kind: dict[str, int] = {}
+    for f in findings:
+        by_kind[f.kind] = by_kind.get(f.kind, 0) + 1
 
     out_path = cfg.root / args.out
     out_path.parent.mkdir(parents=True, exist_ok=True)
-
+    json_path = cfg.root / args.json_out
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+
+    payload = {
+        "files": per_file,
+        "strings_scanned": total,
+        "findings_total": len(findings),
+        "findings_by_kind": by_kind,
+        "elapsed_s": round(elapsed, 3),
+        "findings": [asdict(f) for f in findings],
+    }
+    json_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    multi = len(paths) > 1
     lines: list[str] = []
     lines.append(f"# Placeholder QA\n")
-    lines.append(f"- File: `{path}`")
+    if multi:
+        lines.append(f"- Files: {len(paths)}")
+    else:
+        lines.append(f"- File: `{paths[0]}`")
     lines.append(f"- Strings scanned: {total}")
-    lines.append(f"- Findings: {len(findings)}\n")
+    lines.append(f"- Findings: {len(findings)}")
+    for kind, count in sorted(by_kind.items()):
+        lines.append(f"  - {kind}: {count}")
+    if errors:
+        lines.append(f"- Unreadable files: {len(errors)}")
+        for path, err in errors:
+            lines.append(f"  - `{path}`: {err}")
+    lines.append("")
     for f in findings[: args.limit]:
         head = f"- [{f.kind}] {f.rec or ''} {f.edid or ''}".strip()
         lines.append(head)
+        if multi:
+            lines.append(textwrap.indent(f"file: {f.file}", "  - "))
         lines.append(textwrap.indent(f.note, "  - "))
         lines.append(textwrap.indent(f"EN: {f.source}", "  - "))
         lines.append(textwrap.indent(f"KO: {f.dest}", "  - "))
@@ -153,8 +244,11 @@ def main(argv: list[str]) -> int:
         lines.append(f"... truncated: {len(findings) - args.limit} more\n")
 
     out_path.write_text("\n".join(lines), encoding="utf-8")
-    print(f"[qa] wrote: {out_path} (findings={len(findings)})")
-    return 0
+    print(
+        f"[qa] wrote: {out_path} + {json_path.name} "
+        f"(files={len(paths)}, findings={len(findings)}, {elapsed:.2f}s)"
+    )
+    return 1 if errors else 0
 
 
 if __name__ == "__main__":
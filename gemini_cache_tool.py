@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Maintenance for the `*.gemini_cache.jsonl` translation caches.
+
+The cache is append-only: re-translations add a line for a key that already has one, so the file (and
+`Cache.load` time) keeps growing. Commands:
+
+- `stats CACHE...`: lines, live entries, superseded lines, size and load time.
+- `compact CACHE...`: rewrite with one line per key (last write wins; a model's own entry beats a promoted
+  one). The file is replaced atomically under `<cache>.lock`, which the translator takes for every append;
+  lines appended while the compacted copy was being built are carried over, so a running translator
+  loses nothing.
+- `promote CACHE --input FILE --from-model OLD [--model NEW]`: cache keys hash the model with the source
+  text, so switching models starts from zero. For every source string in FILE (xTranslator XML or STRINGS,
+  as for the translator) this copies OLD's translation under NEW's key as a lower-trust fallback. The
+  translator only uses a fallback when it passes the same placeholder/line-break validation as a fresh
+  translation, and a real translation by NEW always replaces it.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any
+
+from translate_xtranslator_xml_gemini import (
+    STRINGS_LOCALE_LANGUAGES,
+    Cache,
+    _cache_key,
+    cache_write_lock,
+    is_strings_file,
+    load_strings_input,
+    validate_translation,
+)
+
+DEFAULT_MODEL = "gemini-2.5-flash-lite"
+
+
+def _format_bytes(n: int) -> str:
+    if n < 1024:
+        return f"{n} B"
+    if n < 1024 * 1024:
+        return f"{n / 1024:.1f} KiB"
+    return f"{n / (1024 * 1024):.1f} MiB"
+
+
+def cache_stats(path: Path) -> dict[str, Any]:
+    t0 = time.perf_counter()
+    cache = Cache.load(path)
+    load_s = time.perf_counter() - t0
+    return {
+        "path": str(path),
+        "bytes": path.stat().st_size if path.exists() else 0,
+        "lines": cache.lines,
+        "entries": len(cache.items),
+        "fallback": len(cache.fallback),
+        "stale": cache.lines - len(cache.items) - len(cache.fallback),
+        "load_ms": round(load_s * 1000, 1),
+    }
+
+
+def compact_cache(path: Path, *, dry_run: bool = False) -> tuple[int, int, int, int]:
+    """
+    Rewrite `path` with its live entries only; returns (lines_before, lines_after, bytes_before, bytes_after).
+
+    The bulk is read and written without blocking translators. Only the final step holds the cache lock:
+    whatever was appended after the part that was read is copied onto the new file before it replaces the old.
+    """
+    records: dict[str, dict[str, Any]] = {}
+    lines = 0
+    consumed = 0  # bytes of complete lines read; a half-written last line is left for the locked step
+    with path.open("rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            consumed += len(raw)
+            line = raw.decode("utf-8", "replace").strip()
+            if not line:
+                continue
+            lines += 1
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            key = obj.get("key")
+            if not isinstance(key, str) or not isinstance(obj.get("dst"), str):
+                continue
+            held = records.get(key)
+            if held is not None and "fallback" not in held and "fallback" in obj:
+                continue
+            # Re-inserting keeps the file in last-write order, like appending would have.
+            records.pop(key, None)
+            records[key] = obj
+
+    body = "".join(json.dumps(obj, ensure_ascii=False) + "\n" for obj in records.values()).encode("utf-8")
+    if dry_run:
+        return lines, len(records), path.stat().st_size, len(body)
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.compact.tmp")
+    try:
+        with tmp.open("wb") as out:
+            out.write(body)
+            with cache_write_lock(path) as locked:
+                if not locked:
+                    raise SystemExit(f"{path} is locked by another writer; try again later")
+                size_before = path.stat().st_size
+                if size_before < consumed:
+                    raise SystemExit(f"{path} was replaced while compacting; try again later")
+                # Appends since the read are kept verbatim; they load the same as if compacted.
+                with path.open("rb") as f:
+                    f.seek(consumed)
+                    tail = f.read()
+                if tail and not tail.endswith(b"\n"):
+                    tail += b"\n"
+                out.write(tail)
+                out.flush()
+                os.fsync(out.fileno())
+                out.close()
+                os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    tail_lines = sum(1 for line in tail.splitlines() if line.strip())
+    return lines + tail_lines, len(records) + tail_lines, size_before, len(body) + len(tail)
+
+
+def read_input_sources(
+    path: Path, *, source_locale: str, target_locale: str
+) -> tuple[str, str, list[str]]:
+    """(src_lang, dst_lang, source texts) the translator would see for `--input path`."""
+    if path.is_dir() or is_strings_file(path.name):
+        _files, entries = load_strings_input(path, source_locale=source_locale, target_locale=target_locale, existing_root=None)
+        src_lang = STRINGS_LOCALE_LANGUAGES.get(source_locale.lower(), source_locale.lower())
+        dst_lang = STRINGS_LOCALE_LANGUAGES.get(target_locale.lower(), target_locale.lower())
+        return src_lang, dst_lang, [src for src, _slot in entries]
+    root = ET.parse(path).getroot()
+    src_lang = root.findtext("./Params/Source") or "english"
+    dst_lang = root.findtext("./Params/Dest") or "korean"
+    texts = [node.findtext("Source") or "" for node in root.findall("./Content/String")]
+    return src_lang, dst_lang, [t for t in texts if t]
+
+
+def promote(
+    cache_path: Path,
+    *,
+    from_cache_path: Path,
+    texts: list[str],
+    src_lang: str,
+    dst_lang: str,
+    from_model: str,
+    model: str,
+    dry_run: bool = False,
+) -> dict[str, int]:
+    cache = Cache.load(cache_path)
+    source = cache if from_cache_path == cache_path else Cache.load(from_cache_path)
+    counts = {"promoted": 0, "already": 0, "missing": 0, "rejected": 0}
+    new_lines: list[str] = []
+    for text in dict.fromkeys(texts):
+        key = _cache_key(model=model, src_lang=src_lang, dst_lang=dst_lang, source_text=text)
+        if key in cache.items or key in cache.fallback:
+            counts["already"] += 1
+            continue
+        old = source.items.get(_cache_key(model=from_model, src_lang=src_lang, dst_lang=dst_lang, source_text=text))
+        if old is None:
+            counts["missing"] += 1
+            continue
+        if validate_translation(text, old) is not None:
+            counts["rejected"] += 1
+            continue
+        cache.fallback[key] = old
+        new_lines.append(json.dumps({"key": key, "dst": old, "fallback": from_model}, ensure_ascii=False) + "\n")
+        counts["promoted"] += 1
+    if new_lines and not dry_run:
+        with cache_write_lock(cache_path), cache_path.open("a", encoding="utf-8") as f:
+            f.writelines(new_lines)
+    return counts
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Inspect, compact and migrate *.gemini_cache.jsonl translation caches.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_stats = sub.add_parser("stats", help="Report lines, live entries, superseded lines, size and load time")
+    p_stats.add_argument("caches", nargs="+", type=Path)
+    p_stats.add_argument("--json", action="store_true", help="Print one JSON object per cache")
+
+    p_compact = sub.add_parser("compact", help="Rewrite with one line per key (last write wins)")
+    p_compact.add_argument("caches", nargs="+", type=Path)
+    p_compact.add_argument("--dry-run", action="store_true", help="Only report what compaction would save")
+
+    p_promote = sub.add_parser("promote", help="Reuse another model's translations as validated fallbacks")
+    p_promote.add_argument("cache", type=Path)
+    p_promote.add_argument("--input", required=True, type=Path, help="The XML/STRINGS input the cache belongs to")
+    p_promote.add_argument("--from-model", required=True, help="Model whose cached translations to reuse")
+    p_promote.add_argument("--model", default=DEFAULT_MODEL, help=f"Model the translator will run with (default: {DEFAULT_MODEL})")
+    p_promote.add_argument("--from-cache", type=Path, default=None, help="Read --from-model entries from this cache (default: the same file)")
+    p_promote.add_argument("--source-locale", default="en", help="STRINGS input: source file locale suffix (default: en)")
+    p_promote.add_argument("--target-locale", default="ko", help="STRINGS input: target locale suffix (default: ko)")
+    p_promote.add_argument("--dry-run", action="store_true", help="Count, but do not write")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        for path in args.caches:
+            stats = cache_stats(path)
+            if args.json:
+                print(json.dumps(stats))
+            else:
+                print(
+                    f"{path}: {_format_bytes(stats['bytes'])}, {stats['lines']} lines, {stats['entries']} entries "
+                    f"(+{stats['fallback']} fallback), {stats['stale']} superseded, load {stats['load_ms']} ms"
+                )
+        return 0
+
+    if args.command == "compact":
+        for path in args.caches:
+            if not path.is_file():
+                print(f"{path}: not found", file=sys.stderr)
+                return 2
+            lines, kept, size_before, size_after = compact_cache(path, dry_run=args.dry_run)
+            verb = "would shrink" if args.dry_run else "compacted"
+            print(
+                f"{path}: {verb} {lines} -> {kept} lines, "
+                f"{_format_bytes(size_before)} -> {_format_bytes(size_after)}"
+            )
+        return 0
+
+    if args.model == args.from_model:
+        parser.error("--from-model must differ from --model")
+    src_lang, dst_lang, texts = read_input_sources(
+        args.input, source_locale=args.source_locale, target_locale=args.target_locale
+    )
+    counts = promote(
+        args.cache,
+        from_cache_path=args.from_cache or args.cache,
+        texts=texts,
+        src_lang=src_lang,
+        dst_lang=dst_lang,
+        from_model=args.from_model,
+        model=args.model,
+        dry_run=args.dry_run,
+    )
+    print(
+        f"{args.cache}: promoted {counts['promoted']} from {args.from_model} to {args.model}; "
+        f"already cached {counts['already']}, not cached by {args.from_model} {counts['missing']}, "
+        f"failed validation {counts['rejected']}" + (" (dry run)" if args.dry_run else "")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Record/replay of Gemini HTTP traffic ("cassettes") for reproducible offline runs.
+
+With `--record DIR` every request the client sends is stored under a hash of what was asked (endpoint,
+model and JSON payload; never the API key) together with the response status, body, Retry-After and the
+observed latency. `--replay DIR` answers the same requests from those files without touching the network,
+so pipeline changes can be timed against real captured traffic. `--replay-latency F` sleeps F times the
+recorded latency (0 = as fast as possible, 1 = as recorded; streams also keep their time to first chunk).
+
+Layout: `DIR/<hash>.jsonl`, one line per recorded response. Repeats of the same request (retries) get the
+recorded responses in order, and the last one again once they run out. A request that was never recorded
+raises `CassetteMiss`, which the batch retry logic treats like any other API error.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+
+class CassetteMiss(RuntimeError):
+    pass
+
+
+def request_hash(kind: str, model: str, payload: dict[str, Any]) -> str:
+    canonical = json.dumps({"kind": kind, "model": model, "payload": payload}, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class ReplayResponse:
+    """The parts of `requests.Response` that `GeminiClient` uses, served from a recorded interaction."""
+
+    def __init__(self, record: dict[str, Any], latency_scale: float) -> None:
+        self.status_code = int(record.get("status", 0))
+        self.text = str(record.get("body", ""))
+        self.headers = {"Retry-After": record["retry_after"]} if record.get("retry_after") else {}
+        self.encoding = "utf-8"
+        self._latency_s = float(record.get("latency_s", 0.0)) * latency_scale
+        self._first_s = min(float(record.get("first_chunk_s", record.get("latency_s", 0.0))) * latency_scale, self._latency_s)
+
+    def __enter__(self) -> "ReplayResponse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def wait(self) -> None:
+        if self._latency_s > 0:
+            time.sleep(self._latency_s)
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def iter_lines(self, decode_unicode: bool = False) -> Iterator[str]:
+        lines = self.text.split("\n")
+        if self._first_s > 0:
+            time.sleep(self._first_s)
+        step = (self._latency_s - self._first_s) / max(1, len(lines) - 1)
+        for n, line in enumerate(lines):
+            if n and step > 0:
+                time.sleep(step)
+            yield line
+
+
+class RecordingStream:
+    """Wraps a streaming `requests.Response`; saves the lines it yielded when the response is closed."""
+
+    def __init__(self, cassette: "Cassette", key: str, resp: Any, started: float) -> None:
+        self._cassette = cassette
+        self._key = key
+        self._resp = resp
+        self._started = started
+        self._first_s: float | None = None
+        self._lines: list[str] = []
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+
+    @property
+    def text(self) -> str:
+        return self._resp.text
+
+    def __enter__(self) -> "RecordingStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        try:
+            if self.status_code == 200:
+                body = "\n".join(self._lines)
+            else:
+                body = self._resp.text
+            self._cassette.save(
+                self._key,
+                status=self.status_code,
+                body=body,
+                retry_after=self.headers.get("Retry-After"),
+                latency_s=time.monotonic() - self._started,
+                first_chunk_s=self._first_s,
+            )
+        finally:
+            self._resp.close()
+
+    @property
+    def encoding(self) -> str | None:
+        return self._resp.encoding
+
+    @encoding.setter
+    def encoding(self, value: str | None) -> None:
+        self._resp.encoding = value
+
+    def iter_lines(self, decode_unicode: bool = False) -> Iterator[str]:
+        for line in self._resp.iter_lines(decode_unicode=decode_unicode):
+            if self._first_s is None:
+                self._first_s = time.monotonic() - self._started
+            self._lines.append(line)
+            yield line
+
+
+class Cassette:
+    def __init__(self, directory: Path, *, replay: bool, latency_scale: float = 0.0) -> None:
+        self.directory = directory
+        self.replay = replay
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._seen: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        if replay and not directory.is_dir():
+            raise SystemExit(f"--replay directory not found: {directory}")
+        if not replay:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.jsonl"
+
+    def load(self, key: str) -> ReplayResponse:
+        try:
+            records = [json.loads(line) for line in self._path(key).read_text(encoding="utf-8").splitlines() if line.strip()]
+        except (OSError, ValueError):
+            records = []
+        with self._lock:
+            if not records:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for request {key} in {self.directory}")
+            n = self._seen.get(key, 0)
+            self._seen[key] = n + 1
+            self.hits += 1
+        return ReplayResponse(records[min(n, len(records) - 1)], self.latency_scale)
+
+    def save(
+        self,
+        key: str,
+        *,
+        status: int,
+        body: str,
+        retry_after: str | None,
+        latency_s: float,
+        first_chunk_s: float | None = None,
+    ) -> None:
+        record: dict[str, Any] = {"status": status, "body": body, "latency_s": round(latency_s, 4)}
+        if retry_after:
+            record["retry_after"] = retry_after
+        if first_chunk_s is not None:
+            record["first_chunk_s"] = round(first_chunk_s, 4)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                with self._path(key).open("a", encoding="utf-8") as f:
+                    f.write(line)
+                self.recorded += 1
+            except OSError as ex:
+                # Best-effort: a lost recording only makes that request a replay miss later.
+                print(f"[cassette] not written ({self._path(key)}): {ex}", file=sys.stderr)
+
+    def report_line(self) -> str:
+        if self.replay:
+            return f"[cassette] replayed={self.hits} missing={self.misses} from {self.directory}"
+        return f"[cassette] recorded={self.recorded} to {self.directory}"
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Pool of Gemini API keys with per-key rate limiting.
+
+Every key has its own token buckets for requests/min and tokens/min, a cool-down after HTTP 429 (the
+server's Retry-After / retryDelay when given), and a daily request counter. `acquire()` hands out the
+key with the most headroom and only sleeps when no key can take the request, so aggregate throughput
+grows with the number of keys. Daily counters are kept in a small JSON file (keyed by a hash of the
+key, never the key itself) so quotas carry over between runs; the day rolls over at midnight Pacific
+time like the API's own quota. Each save adds the requests made since the last save to the count on
+disk (under a lock file), so workers sharing a key add up instead of overwriting each other.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _QUOTA_TZ: Any = ZoneInfo("America/Los_Angeles")
+except Exception:  # noqa: BLE001 - no tz database (e.g. Windows without tzdata): fall back to UTC days
+    _QUOTA_TZ = timezone.utc
+
+DEFAULT_COOLDOWN_S = 10.0
+MAX_COOLDOWN_S = 300.0
+USAGE_LOCK_TIMEOUT_S = 10.0
+
+_RETRY_IN_RE = re.compile(r"retry\s+in\s+([0-9]+(?:\.[0-9]+)?)s", re.IGNORECASE)
+_DURATION_RE = re.compile(r"^\s*([0-9]+(?:\.[0-9]+)?)s\s*$")
+
+
+def default_usage_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or str(Path.home() / ".cache")
+    return Path(base) / "xtranslator-ai" / "key-usage.json"
+
+
+def split_api_keys(values: list[str] | None) -> list[str]:
+    """Keys from repeated/comma-separated `--api-key` values, else GEMINI_API_KEYS / GEMINI_API_KEY; duplicates dropped."""
+    raw = list(values or [])
+    if not raw:
+        raw = [os.environ.get("GEMINI_API_KEYS") or os.environ.get("GEMINI_API_KEY") or ""]
+    keys: list[str] = []
+    for value in raw:
+        for key in value.split(","):
+            key = key.strip()
+            if key and key not in keys:
+                keys.append(key)
+    return keys
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt size before the server reports usage (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def parse_retry_after(headers: Any, body: str) -> float | None:
+    """Seconds to wait from a 429: Retry-After header, error.details[].retryDelay, or "retry in Ns" text (largest wins)."""
+    delays: list[float] = []
+    header = headers.get("Retry-After") if headers is not None else None
+    if header:
+        try:
+            delays.append(float(header))
+        except ValueError:
+            pass
+    try:
+        error = json.loads(body).get("error") or {}
+        for item in error.get("details") or []:
+            match = _DURATION_RE.match(str(item.get("retryDelay", ""))) if isinstance(item, dict) else None
+            if match:
+                delays.append(float(match.group(1)))
+                break
+    except (ValueError, AttributeError):
+        pass
+    if not delays:
+        match = _RETRY_IN_RE.search(body or "")
+        if match:
+            delays.append(float(match.group(1)))
+    delays = [d for d in delays if d > 0]
+    return max(delays) if delays else None
+
+
+def _lock_file(lock_path: Path) -> bool:
+    """Create `lock_path` exclusively, waiting for another saver; a lock older than the timeout is stale."""
+    deadline = time.monotonic() + USAGE_LOCK_TIMEOUT_S
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > USAGE_LOCK_TIMEOUT_S:
+                    lock_path.unlink(missing_ok=True)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to one minute's worth; `per_minute <= 0` means unlimited."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._stamp = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._stamp) * self._rate)
+        self._stamp = now
+
+    def headroom(self, now: float) -> float:
+        if self.unlimited:
+            return 1.0
+        self._refill(now)
+        return max(0.0, self.level) / self.capacity
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (a request larger than the bucket waits for a full bucket)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        need = min(amount, self.capacity) - self.level
+        return 0.0 if need <= 0 else need / self._rate
+
+    def take(self, amount: float, now: float) -> None:
+        if not self.unlimited:
+            self._refill(now)
+            self.level -= amount
+
+    def adjust(self, delta: float) -> None:
+        """Correct an earlier estimate once the real usage is known (may go negative: the key then pays it back)."""
+        if not self.unlimited:
+            self.level -= delta
+
+
+@dataclass
+class ApiKeyState:
+    key: str
+    rpm: TokenBucket
+    tpm: TokenBucket
+    daily_limit: int
+    key_id: str = ""
+    cooldown_until: float = 0.0
+    rate_limit_streak: int = 0
+    requests: int = 0
+    tokens: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    day: str = ""
+    day_requests: int = 0
+    unsaved_requests: int = 0
+    in_flight: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        return f"...{self.key[-4:]}" if len(self.key) > 8 else self.key_id[:8]
+
+    def daily_left(self) -> float:
+        return math.inf if self.daily_limit <= 0 else self.daily_limit - self.day_requests
+
+
+class KeyPool:
+    """Thread-safe key selection; `acquire()` before each request and `release()` with its outcome."""
+
+    def __init__(
+        self,
+        keys: list[str],
+        *,
+        rpm: float = 0,
+        tpm: float = 0,
+        daily_requests: int = 0,
+        usage_path: Path | None = None,
+    ) -> None:
+        if not keys:
+            raise ValueError("KeyPool needs at least one API key")
+        self._lock = threading.Lock()
+        self._usage_path = usage_path
+        self._ticket = 0
+        self.waited_s = 0.0
+        self.keys = [
+            ApiKeyState(
+                key=k,
+                rpm=TokenBucket(rpm),
+                tpm=TokenBucket(tpm),
+                daily_limit=daily_requests,
+                key_id=hashlib.sha256(k.encode("utf-8")).hexdigest()[:16],
+            )
+            for k in keys
+        ]
+        self._load_usage()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(_QUOTA_TZ).strftime("%Y-%m-%d")
+
+    def _load_usage(self) -> None:
+        if self._usage_path is None:
+            return
+        try:
+            payload = json.loads(self._usage_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        today = self._today()
+        for state in self.keys:
+            day, count = (payload.get(state.key_id) or ["", 0])[:2]
+            if day == today:
+                state.day, state.day_requests = day, int(count)
+
+    def save_usage(self) -> None:
+        """Add this process's unsaved requests to the daily counts on disk and pick up the new totals."""
+        if self._usage_path is None:
+            return
+        lock_path = self._usage_path.with_name(self._usage_path.name + ".lock")
+        try:
+            self._usage_path.parent.mkdir(parents=True, exist_ok=True)
+            if not _lock_file(lock_path):
+                print(f"[keys] usage not written ({self._usage_path}): locked by another process", file=sys.stderr)
+                return
+        except OSError as ex:
+            # Best-effort: losing the counters only means the next run starts the day from zero.
+            print(f"[keys] usage not written ({self._usage_path}): {ex}", file=sys.stderr)
+            return
+        try:
+            try:
+                payload = json.loads(self._usage_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                payload = {}
+            with self._lock:
+                saved: list[tuple[ApiKeyState, str, int, int]] = []
+                for state in self.keys:
+                    if not state.day:
+                        continue
+                    day, count = (payload.get(state.key_id) or ["", 0])[:2]
+                    if day > state.day:
+                        continue  # another process already counts a later quota day
+                    total = (int(count) if day == state.day else 0) + state.unsaved_requests
+                    payload[state.key_id] = [state.day, total]
+                    saved.append((state, state.day, state.unsaved_requests, total))
+            tmp = self._usage_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(self._usage_path)
+            with self._lock:
+                for state, day, written, total in saved:
+                    if state.day == day:
+                        # Requests made while saving stay unsaved; the total now includes other processes' requests.
+                        state.unsaved_requests -= written
+                        state.day_requests = total + state.unsaved_requests
+        except OSError as ex:
+            print(f"[keys] usage not written ({self._usage_path}): {ex}", file=sys.stderr)
+        finally:
+            lock_path.unlink(missing_ok=True)
+
+    def _roll_day(self, state: ApiKeyState, today: str) -> None:
+        if state.day != today:
+            state.day, state.day_requests, state.unsaved_requests = today, 0, 0
+
+    def acquire(self, est_tokens: int) -> tuple[ApiKeyState, int]:
+        """Block until some key can take a request of `est_tokens`; returns (key, ticket) for `release()`."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                today = self._today()
+                best: ApiKeyState | None = None
+                best_score = -1.0
+                soonest = math.inf
+                for state in self.keys:
+                    self._roll_day(state, today)
+                    if state.daily_left() <= 0:
+                        continue
+                    wait = max(
+                        state.cooldown_until - now,
+                        state.rpm.wait_time(1, now),
+                        state.tpm.wait_time(est_tokens, now),
+                    )
+                    if wait > 0:
+                        soonest = min(soonest, wait)
+                        continue
+                    score = min(state.rpm.headroom(now), state.tpm.headroom(now))
+                    if score > best_score:
+                        best, best_score = state, score
+                if best is not None:
+                    best.rpm.take(1, now)
+                    best.tpm.take(est_tokens, now)
+                    best.requests += 1
+                    best.day_requests += 1
+                    best.unsaved_requests += 1
+                    self._ticket += 1
+                    best.in_flight[self._ticket] = est_tokens
+                    return best, self._ticket
+                if soonest is math.inf:
+                    # Not retryable: stop the run instead of letting batch retries spin on it.
+                    raise SystemExit("All API keys have used up their daily request quota (--daily-requests).")
+                self.waited_s += soonest
+            # Nothing available: sleep (outside the lock) until the soonest key frees up.
+            time.sleep(soonest)
+
+    def release(
+        self,
+        state: ApiKeyState,
+        ticket: int,
+        *,
+        status: int,
+        used_tokens: int | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        with self._lock:
+            est = state.in_flight.pop(ticket, 0)
+            if used_tokens is not None:
+                state.tokens += used_tokens
+                state.tpm.adjust(used_tokens - est)
+            if status == 429:
+                state.rate_limited += 1
+                state.rate_limit_streak += 1
+                cooldown = retry_after or min(MAX_COOLDOWN_S, DEFAULT_COOLDOWN_S * 2 ** (state.rate_limit_streak - 1))
+                state.cooldown_until = max(state.cooldown_until, time.monotonic() + cooldown)
+            elif status == 200:
+                state.rate_limit_streak = 0
+            else:
+                state.errors += 1
+
+    def report_lines(self) -> list[str]:
+        lines = []
+        for state in self.keys:
+            daily = f"{state.day_requests}/{state.daily_limit}" if state.daily_limit > 0 else str(state.day_requests)
+            lines.append(
+                f"[keys] {state.label}: requests={state.requests} tokens={state.tokens} "
+                f"http429={state.rate_limited} errors={state.errors} today={daily}"
+            )
+        lines.append(f"[keys] waited for rate limits: {self.waited_s:.1f}s")
+        return lines
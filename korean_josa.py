@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Korean particle (josa) selection and correction.
+
+Every Hangul syllable's final consonant (batchim) class is precomputed once into a lookup table, along
+with the Korean readings of digits and the predictable Latin word endings, so choosing 을/를, 이/가,
+은/는, 과/와, (으)로 is a single dict lookup on the last character.
+
+`JosaFixer` corrects particles that follow substituted values: numeric placeholders (`<25>`, `<25%>`),
+plain numbers, Latin names, and the CLI's masking markers (`__XT_PH_NUM_0002__`, `__XT_PH_MAG_0000__`,
+or compact `{N2}`, `{M0}`), which are resolved through the placeholder map to the value they stand for. `<mag>`/`<dur>` have no
+known value until the game fills them in, so particles after them are left alone.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+
+NO_FINAL = 0
+FINAL = 1
+FINAL_RIEUL = 2
+
+_HANGUL_FIRST = 0xAC00
+_HANGUL_LAST = 0xD7A3
+
+
+def _build_final_class_table() -> dict[str, int]:
+    table: dict[str, int] = {}
+    for code in range(_HANGUL_FIRST, _HANGUL_LAST + 1):
+        jong = (code - _HANGUL_FIRST) % 28
+        table[chr(code)] = NO_FINAL if jong == 0 else (FINAL_RIEUL if jong == 8 else FINAL)
+
+    # Digit readings: 0=영 1=일 2=이 3=삼 4=사 5=오 6=육 7=칠 8=팔 9=구
+    for digit, cls in zip("0123456789", (FINAL, FINAL_RIEUL, NO_FINAL, FINAL, NO_FINAL,
+                                         NO_FINAL, FINAL, FINAL_RIEUL, FINAL_RIEUL, NO_FINAL)):
+        table[digit] = cls
+
+    # Latin words, read as Korean loanwords: only endings with a predictable reading are classified.
+    # Vowels/-r/-w end open (Tiber -> 티버를), -m/-n close (Skyrim -> 스카이림을), -l is ㄹ. Endings like
+    # -d/-t/-k usually gain a vowel (Riverwood -> 리버우드를) but not always, so they stay unknown. So does
+    # -e, which is mostly silent (Dragonstone -> 드래곤스톤을, Blade -> 블레이드를).
+    for ch in "aiouyrw":
+        table[ch] = table[ch.upper()] = NO_FINAL
+    for ch in "mn":
+        table[ch] = table[ch.upper()] = FINAL
+    table["l"] = table["L"] = FINAL_RIEUL
+
+    table["%"] = NO_FINAL  # 퍼센트
+    return table
+
+
+FINAL_CLASS: dict[str, int] = _build_final_class_table()
+
+# particle -> (form after a final consonant, form after a vowel); (으)로 also takes "로" after ㄹ.
+_PARTICLE_FORMS: dict[str, tuple[str, str]] = {
+    "을": ("을", "를"),
+    "를": ("을", "를"),
+    "이": ("이", "가"),
+    "가": ("이", "가"),
+    "은": ("은", "는"),
+    "는": ("은", "는"),
+    "과": ("과", "와"),
+    "와": ("과", "와"),
+    "으로": ("으로", "로"),
+    "로": ("으로", "로"),
+}
+
+_TRAILING_ZEROS_RE = re.compile(r"[1-9]0+$")
+
+
+def final_class(word: str) -> int | None:
+    """Batchim class of the last readable character of `word`, or None when it can't be determined."""
+    s = (word or "").rstrip()
+    if not s:
+        return None
+    # 10/100/1000/10000 read 십/백/천/만: always a (non-ㄹ) final consonant.
+    if s[-1] == "0" and _TRAILING_ZEROS_RE.search(s):
+        return FINAL
+    for ch in reversed(s):
+        cls = FINAL_CLASS.get(ch)
+        if cls is not None:
+            return cls
+        if ch in "'’\")]}>":
+            continue
+        return None
+    return None
+
+
+def choose_particle(word: str, particle: str, *, default: str | None = None) -> str:
+    forms = _PARTICLE_FORMS.get(particle)
+    if forms is None:
+        return particle
+    cls = final_class(word)
+    if cls is None:
+        return default if default is not None else forms[1]
+    with_final, without_final = forms
+    if with_final == "으로" and cls == FINAL_RIEUL:
+        return without_final
+    return with_final if cls != NO_FINAL else without_final
+
+
+def choose_subject_particle(noun: str) -> str:
+    return _choose_hangul(noun, "이", default="가")
+
+
+def choose_object_particle(noun: str) -> str:
+    return _choose_hangul(noun, "을", default="를")
+
+
+def choose_topic_particle(noun: str) -> str:
+    return _choose_hangul(noun, "은", default="는")
+
+
+def choose_conjunction_particle(noun: str) -> str:
+    return _choose_hangul(noun, "과", default="와")
+
+
+def choose_directional_particle(noun: str) -> str:
+    return _choose_hangul(noun, "으로", default="로")
+
+
+def _choose_hangul(noun: str, particle: str, *, default: str) -> str:
+    # App semantics (KoreanParticleSelector): non-Hangul endings fall back to the vowel form.
+    if not noun or not (_HANGUL_FIRST <= ord(noun[-1]) <= _HANGUL_LAST):
+        return default
+    return choose_particle(noun, particle)
+
+
+def _has_final_consonant_latin(noun: str) -> bool:
+    for ch in reversed(noun or ""):
+        if "0" <= ch <= "9":
+            return FINAL_CLASS[ch] != NO_FINAL
+        if "A" <= ch <= "Z" or "a" <= ch <= "z":
+            return ch.lower() not in "aeiouy"
+    return True
+
+
+def choose_object_particle_latin(noun: str) -> str:
+    return "을" if _has_final_consonant_latin(noun) else "를"
+
+
+def choose_topic_particle_latin(noun: str) -> str:
+    return "은" if _has_final_consonant_latin(noun) else "는"
+
+
+def _fix_particle_safely(noun: str, particle: str, expected: str, *, unsafe_particle: str, unsafe_expected: str) -> str:
+    if particle == expected:
+        return particle
+    # Single-syllable + (을->를, 은->는) can be a real word ending with that syllable (e.g. "가을", "가은").
+    if len(noun) < 2 and particle == unsafe_particle and expected == unsafe_expected:
+        return particle
+    return expected
+
+
+def fix_object_particle_safely(noun: str, particle: str) -> str:
+    return _fix_particle_safely(noun, particle, choose_object_particle(noun), unsafe_particle="을", unsafe_expected="를")
+
+
+def fix_object_particle_safely_latin(noun: str, particle: str) -> str:
+    return _fix_particle_safely(
+        noun, particle, choose_object_particle_latin(noun), unsafe_particle="을", unsafe_expected="를"
+    )
+
+
+def fix_topic_particle_safely(noun: str, particle: str) -> str:
+    expected = choose_topic_particle(noun)
+    if particle == expected:
+        return particle
+    # "…는" can be an attributive verb ending ("있는/없는"); don't rewrite those to "은".
+    if particle == "는" and expected == "은" and (len(noun) < 2 or noun.endswith(("있", "없"))):
+        return particle
+    return _fix_particle_safely(noun, particle, expected, unsafe_particle="은", unsafe_expected="는")
+
+
+def fix_topic_particle_safely_latin(noun: str, particle: str) -> str:
+    return _fix_particle_safely(
+        noun, particle, choose_topic_particle_latin(noun), unsafe_particle="은", unsafe_expected="는"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Bulk fixer
+# ---------------------------------------------------------------------------
+
+_PARTICLE_ALT = "으로|을|를|이|가|은|는|과|와|로"
+_BOUNDARY = r"(?=$|[\s!\"#%&'()*,\-./:;?@\[\\\]_{}…‘’“”·「」『』])"
+
+_ANCHOR_RE = re.compile(
+    r"(?P<anchor>"
+    r"__XT_PH_(?:[A-Z]+_)?\d{4}__"  # masking marker
+    r"|\{[MDN]?\d+\}"  # compact masking marker
+    r"|[+-]?<\s*[0-9]+(?:\.[0-9]+)?\s*%?\s*>"  # numeric placeholder
+    r"|[+-]?<\s*(?:mag|dur)\s*>%?"  # unresolved game value
+    r"|(?<![\w.])[0-9]+(?:[.,][0-9]+)*%?"  # plain number
+    r"|(?<![A-Za-z])[A-Z][A-Za-z'’\-]*(?: [A-Z][A-Za-z'’\-]*){0,4}"  # Latin (proper) name
+    r")"
+    rf"(?P<particle>{_PARTICLE_ALT}){_BOUNDARY}"
+)
+
+_NUMERIC_PLACEHOLDER_RE = re.compile(r"^[+-]?<\s*(?P<value>[0-9]+(?:\.[0-9]+)?\s*%?)\s*>$")
+
+
+def resolve_anchor(anchor: str, placeholder_map: dict[str, str] | None = None) -> str | None:
+    """Text whose final sound decides the particle, or None when the value is unknown (<mag>/<dur>)."""
+    if anchor.startswith(("__XT_PH_", "{")):
+        original = (placeholder_map or {}).get(anchor)
+        if original is None:
+            return None
+        return resolve_anchor(original)
+    if "<" in anchor:
+        m = _NUMERIC_PLACEHOLDER_RE.match(anchor.strip())
+        return m.group("value").replace(" ", "") if m else None
+    return anchor
+
+
+class JosaFixer:
+    """Fixes particles after substituted values; keeps hit counters for reporting."""
+
+    def __init__(self) -> None:
+        self.checked = 0
+        self.hits = 0
+        self.unresolved = 0
+        self.seconds = 0.0
+
+    def fix(self, text: str, placeholder_map: dict[str, str] | None = None) -> str:
+        if not text or not any(p in text for p in "을를이가은는과와로"):
+            return text
+
+        def repl(m: re.Match[str]) -> str:
+            anchor = m.group("anchor")
+            particle = m.group("particle")
+            self.checked += 1
+            word = resolve_anchor(anchor, placeholder_map)
+            if word is None:
+                self.unresolved += 1
+                return m.group(0)
+            fixed = choose_particle(word, particle, default=particle)
+            if fixed == particle:
+                return m.group(0)
+            self.hits += 1
+            return anchor + fixed
+
+        return _ANCHOR_RE.sub(repl, text)
+
+    def fix_all(self, texts: list[str]) -> list[str]:
+        t0 = time.perf_counter()
+        out = [self.fix(t) for t in texts]
+        self.seconds += time.perf_counter() - t0
+        return out
+
+    def report_line(self) -> str:
+        return (
+            f"[josa] hits={self.hits} checked={self.checked} unresolved={self.unresolved} "
+            f"time={self.seconds * 1000:.1f}ms"
+        )
+
+
+def main(argv: list[str]) -> int:
+    from translate_xtranslator_xml_gemini import read_xml_prolog, write_xml
+    import xml.etree.ElementTree as ET
+
+    ap = argparse.ArgumentParser(description="Fix Korean particles after values/names in an existing xTranslator XML.")
+    ap.add_argument("inputs", nargs="+", type=Path, help="xTranslator XML file(s)")
+    ap.add_argument("--output", type=Path, help="Output XML (single input only; default: overwrite input)")
+    args = ap.parse_args(argv)
+
+    if args.output and len(args.inputs) != 1:
+        print("--output requires exactly one input", file=sys.stderr)
+        return 2
+
+    fixer = JosaFixer()
+    total = 0
+    for path in args.inputs:
+        bom, prolog = read_xml_prolog(path)
+        root = ET.parse(path).getroot()
+        nodes = [n for n in root.findall("./Content/String/Dest") if n.text]
+        fixed = fixer.fix_all([n.text or "" for n in nodes])
+        for node, text in zip(nodes, fixed):
+            node.text = text
+        total += len(nodes)
+        write_xml(args.output or path, root, bom=bom, prolog=prolog)
+
+    print(f"{fixer.report_line()} strings={total} files={len(args.inputs)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Reader for Bethesda archives: BSA v103 (Oblivion), v104 (FO3/FNV/Skyrim LE), v105 (Skyrim SE/AE)
+and Fallout 4 BA2 (GNRL, v1/v7/v8).
+
+Opening an archive parses its folder/file record tables into a name -> entry index. The index is
+persisted as JSON (keyed on the archive's resolved path, size and mtime) so repeat runs skip the table
+walk entirely. Entry payloads are read through one read-only mmap of the archive; compressed entries
+are inflated with zlib (BSA v103/v104, BA2) or LZ4 frames (BSA v105; needs the optional `lz4`
+package).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+try:
+    import lz4.frame as lz4_frame  # optional: v105 (SSE/AE) archives compress entries with LZ4 frames
+except ImportError:
+    lz4_frame = None
+
+
+ARCHIVE_SUFFIXES = (".bsa", ".ba2")
+INDEX_CACHE_FORMAT = 1
+
+CODEC_NONE = "none"
+CODEC_ZLIB = "zlib"
+CODEC_LZ4 = "lz4"
+
+
+def default_index_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or str(Path.home() / ".cache")
+    return Path(base) / "xtranslator-ai" / "archive-index"
+
+
+def is_archive_path(path: Path) -> bool:
+    return path.is_file() and path.suffix.lower() in ARCHIVE_SUFFIXES
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    # Lower-case, forward-slash path inside the archive, e.g. "strings/skyrim_english.strings".
+    name: str
+    # offset/size cover the whole stored record, including any embedded name / size prefix.
+    offset: int
+    size: int
+    codec: str = CODEC_NONE
+    # Uncompressed size when the record table states it (BA2); BSA stores it in the payload instead.
+    original_size: int = 0
+    embedded_name: bool = False
+    size_prefix: bool = False
+
+
+class ArchiveFormatError(ValueError):
+    pass
+
+
+class _Reader:
+    def __init__(self, buf: mmap.mmap | bytes, path: Path) -> None:
+        self.buf = buf
+        self.pos = 0
+        self.path = path
+
+    def take(self, n: int) -> bytes:
+        end = self.pos + n
+        if end > len(self.buf):
+            raise ArchiveFormatError(f"truncated archive (need {n} bytes at {self.pos}): {self.path}")
+        b = self.buf[self.pos : end]
+        self.pos = end
+        return b
+
+    def unpack(self, fmt: str) -> tuple[int, ...]:
+        return struct.unpack(fmt, self.take(struct.calcsize(fmt)))
+
+
+def _parse_bsa(buf: mmap.mmap | bytes, path: Path) -> tuple[int, list[ArchiveEntry]]:
+    r = _Reader(buf, path)
+    r.take(4)
+    (
+        version,
+        _offset,
+        archive_flags,
+        folder_count,
+        file_count,
+        _total_folder_name_len,
+        total_file_name_len,
+        _file_flags,
+        _padding,
+    ) = r.unpack("<IIIIIIIHH")
+    if version not in (103, 104, 105):
+        raise ArchiveFormatError(f"unsupported BSA version: {version} ({path})")
+
+    include_folder_names = (archive_flags & 0x1) != 0
+    include_file_names = (archive_flags & 0x2) != 0
+    compressed_by_default = (archive_flags & 0x4) != 0
+    # 0x100 means "file names embedded in data" from v104 on; v103 uses the bit for something else.
+    include_names_in_data = version >= 104 and (archive_flags & 0x100) != 0
+    if not include_folder_names:
+        raise ArchiveFormatError(f"BSA missing folder names (archiveFlags=0x{archive_flags:x}): {path}")
+    if not include_file_names:
+        raise ArchiveFormatError(f"BSA missing file names block (archiveFlags=0x{archive_flags:x}): {path}")
+
+    folder_fmt = "<QIIQ" if version == 105 else "<QII"
+    counts = [r.unpack(folder_fmt)[1] for _ in range(folder_count)]
+
+    records: list[tuple[str, int, int]] = []  # folder, size_raw, offset
+    for count in counts:
+        (name_len,) = r.unpack("<B")
+        folder = r.take(name_len).rstrip(b"\x00").decode("utf-8", errors="replace")
+        folder = folder.replace("\\", "/").strip("/").lower()
+        table = r.take(16 * count)
+        for _hash, size_raw, off in struct.iter_unpack("<QII", table):
+            records.append((folder, size_raw, off))
+
+    names_block = r.take(total_file_name_len)
+    file_names = [p.decode("utf-8", errors="replace") for p in names_block.split(b"\x00") if p]
+    if len(file_names) != file_count or len(records) != file_count:
+        raise ArchiveFormatError(
+            f"bad BSA index: file_count={file_count} names={len(file_names)} records={len(records)} ({path})"
+        )
+
+    codec = CODEC_LZ4 if version == 105 else CODEC_ZLIB
+    entries: list[ArchiveEntry] = []
+    for (folder, size_raw, off), fname in zip(records, file_names):
+        # Bit 30 of the size inverts the archive-wide default compression for this entry.
+        compressed = compressed_by_default != ((size_raw & 0x40000000) != 0)
+        name = f"{folder}/{fname.lower()}" if folder else fname.lower()
+        entries.append(
+            ArchiveEntry(
+                name=name.replace("\\", "/"),
+                offset=off,
+                size=size_raw & 0x3FFFFFFF,
+                codec=codec if compressed else CODEC_NONE,
+                embedded_name=include_names_in_data,
+                size_prefix=compressed,
+            )
+        )
+    return version, entries
+
+
+def _parse_ba2(buf: mmap.mmap | bytes, path: Path) -> tuple[int, list[ArchiveEntry]]:
+    r = _Reader(buf, path)
+    r.take(4)
+    (version,) = r.unpack("<I")
+    kind = r.take(4)
+    file_count, name_table_offset = r.unpack("<IQ")
+    if version not in (1, 7, 8):
+        raise ArchiveFormatError(f"unsupported BA2 version: {version} ({path})")
+    if kind != b"GNRL":
+        raise ArchiveFormatError(f"unsupported BA2 type {kind!r} (only GNRL): {path}")
+
+    records = list(struct.iter_unpack("<I4sIIQIII", r.take(36 * file_count)))
+
+    r.pos = name_table_offset
+    names: list[str] = []
+    for _ in range(file_count):
+        (n,) = r.unpack("<H")
+        names.append(r.take(n).decode("utf-8", errors="replace").replace("\\", "/").lower())
+
+    entries: list[ArchiveEntry] = []
+    for (_hash, _ext, _dir_hash, _flags, off, packed, unpacked, _align), name in zip(records, names):
+        entries.append(
+            ArchiveEntry(
+                name=name,
+                offset=off,
+                size=packed or unpacked,
+                codec=CODEC_ZLIB if packed else CODEC_NONE,
+                original_size=unpacked,
+            )
+        )
+    return version, entries
+
+
+def _cache_path(cache_dir: Path, archive: Path) -> Path:
+    digest = hashlib.sha1(str(archive).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{archive.name}.{digest}.json"
+
+
+def _load_cached_index(cache_file: Path, st: os.stat_result) -> tuple[str, int, list[ArchiveEntry]] | None:
+    try:
+        payload = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if (
+        payload.get("format") != INDEX_CACHE_FORMAT
+        or payload.get("size") != st.st_size
+        or payload.get("mtime_ns") != st.st_mtime_ns
+    ):
+        return None
+    entries = [
+        ArchiveEntry(name, off, size, codec, orig, bool(flags & 1), bool(flags & 2))
+        for name, off, size, codec, orig, flags in payload["entries"]
+    ]
+    return payload["kind"], int(payload["version"]), entries
+
+
+def _save_cached_index(cache_file: Path, st: os.stat_result, kind: str, version: int, entries: list[ArchiveEntry]) -> None:
+    payload = {
+        "format": INDEX_CACHE_FORMAT,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "kind": kind,
+        "version": version,
+        "entries": [
+            [e.name, e.offset, e.size, e.codec, e.original_size, int(e.embedded_name) | (int(e.size_prefix) << 1)]
+            for e in entries
+        ],
+    }
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(cache_file)
+    except OSError as ex:
+        # Best-effort: a read-only cache dir only costs the next run a re-parse.
+        print(f"[archive] index cache not written ({cache_file}): {ex}", file=sys.stderr)
+
+
+class Archive:
+    """An opened BSA/BA2: `entries` maps lower-case archive paths to ArchiveEntry."""
+
+    def __init__(self, path: Path, kind: str, version: int, entries: list[ArchiveEntry], mm: mmap.mmap | None) -> None:
+        self.path = path
+        self.kind = kind
+        self.version = version
+        self.entries: dict[str, ArchiveEntry] = {e.name: e for e in entries}
+        self.from_cache = False
+        self._mm = mm
+
+    def _buffer(self) -> mmap.mmap:
+        if self._mm is None:
+            with self.path.open("rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def iter_entries(self, prefix: str = "", suffixes: tuple[str, ...] = ()) -> Iterator[ArchiveEntry]:
+        for e in self.entries.values():
+            if prefix and not e.name.startswith(prefix):
+                continue
+            if suffixes and not e.name.endswith(suffixes):
+                continue
+            yield e
+
+    def read(self, name: str) -> bytes:
+        return self.read_entry(self.entries[name.replace("\\", "/").lower()])
+
+    def read_stored(self, entry: ArchiveEntry) -> bytes:
+        """The entry's record exactly as stored (name/size prefixes and compression included)."""
+        buf = self._buffer()
+        if entry.offset + entry.size > len(buf):
+            raise ArchiveFormatError(f"entry {entry.name} runs past end of archive: {self.path}")
+        return buf[entry.offset : entry.offset + entry.size]
+
+    def read_entry(self, entry: ArchiveEntry) -> bytes:
+        buf = self._buffer()
+        start = entry.offset
+        end = start + entry.size
+        if end > len(buf):
+            raise ArchiveFormatError(f"entry {entry.name} runs past end of archive: {self.path}")
+        if entry.embedded_name:
+            # Payload starts with a bstring (u8 length + full path).
+            start += 1 + buf[start]
+        original_size = entry.original_size
+        if entry.size_prefix:
+            original_size = struct.unpack_from("<I", buf, start)[0]
+            start += 4
+        raw = buf[start:end]
+
+        if entry.codec == CODEC_NONE:
+            return raw
+        if entry.codec == CODEC_LZ4:
+            if lz4_frame is None:
+                raise ArchiveFormatError("LZ4-compressed entry; install the `lz4` package (pip install lz4)")
+            data = lz4_frame.decompress(raw)
+        else:
+            data = zlib.decompress(raw)
+        if original_size and len(data) != original_size:
+            raise ArchiveFormatError(
+                f"decompressed size mismatch for {entry.name}: expected {original_size}, got {len(data)}"
+            )
+        return data
+
+    def needs_lz4(self, entries: Iterable[ArchiveEntry]) -> bool:
+        return lz4_frame is None and any(e.codec == CODEC_LZ4 for e in entries)
+
+    def read_many(self, entries: list[ArchiveEntry], jobs: int = 0) -> Iterator[tuple[ArchiveEntry, bytes | Exception]]:
+        """Yields (entry, data or error) in input order while later entries are still being inflated.
+
+        zlib/lz4 release the GIL, so threads sharing the one mapping decompress in parallel.
+        """
+        self._buffer()
+
+        def read_one(e: ArchiveEntry) -> bytes | Exception:
+            try:
+                return self.read_entry(e)
+            except Exception as ex:  # noqa: BLE001
+                return ex
+
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            futures = [pool.submit(read_one, e) for e in entries]
+            for e, fut in zip(entries, futures):
+                yield e, fut.result()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self) -> Archive:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def open_archive(path: Path, *, cache_dir: Path | None = None, use_cache: bool = True) -> Archive:
+    """Open a BSA/BA2, reusing a persisted index when the archive's size and mtime are unchanged."""
+    path = path.expanduser().resolve()
+    st = path.stat()
+    cache_file = _cache_path(cache_dir or default_index_cache_dir(), path) if use_cache else None
+
+    if cache_file is not None:
+        cached = _load_cached_index(cache_file, st)
+        if cached is not None:
+            kind, version, entries = cached
+            archive = Archive(path, kind, version, entries, None)
+            archive.from_cache = True
+            return archive
+
+    with path.open("rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic = mm[:4]
+        if magic == b"BSA\x00":
+            kind = "BSA"
+            version, entries = _parse_bsa(mm, path)
+        elif magic == b"BTDX":
+            kind = "BA2"
+            version, entries = _parse_ba2(mm, path)
+        else:
+            raise ArchiveFormatError(f"not a BSA/BA2 archive: {path}")
+    except Exception:
+        mm.close()
+        raise
+
+    if cache_file is not None:
+        _save_cached_index(cache_file, st, kind, version, entries)
+    return Archive(path, kind, version, entries, mm)
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    import time
+
+    ap = argparse.ArgumentParser(description="List entries of a Bethesda BSA/BA2 archive.")
+    ap.add_argument("archive", type=Path)
+    ap.add_argument("--prefix", default="", help="Only list entries under this path (e.g. strings/).")
+    ap.add_argument("--extract", type=Path, help="Extract the listed entries into this directory.")
+    ap.add_argument("--no-index-cache", action="store_true", help="Always re-parse the record tables.")
+    ap.add_argument("--jobs", type=int, default=0, help="Decompression threads for --extract (0=cpu count).")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    with open_archive(args.archive, use_cache=not args.no_index_cache) as archive:
+        opened = time.perf_counter() - t0
+        entries = list(archive.iter_entries(prefix=args.prefix.replace("\\", "/").lower()))
+        if args.extract is None:
+            for e in entries:
+                print(f"{e.size:>12} {e.codec:<4} {e.name}")
+        else:
+            if archive.needs_lz4(entries):
+                raise SystemExit("this archive uses LZ4-compressed entries; install the `lz4` package (pip install lz4)")
+            for e, data in archive.read_many(entries, jobs=args.jobs):
+                if isinstance(data, Exception):
+                    print(f"[archive] failed: {e.name}: {data}", file=sys.stderr)
+                    continue
+                out = args.extract / e.name
+                out.parent.mkdir(parents=True, exist_ok=True)
+                out.write_bytes(data)
+        print(
+            f"[archive] {archive.kind} v{archive.version} entries={len(archive.entries)} listed={len(entries)} "
+            f"index={'cache' if archive.from_cache else 'parsed'} open={opened * 1000:.1f}ms",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Reader for Bethesda Scaleform interface translation tables (`Interface/Translations/translate_<language>.txt`).
+
+Each line is `$TOKEN<TAB>text`; files are UTF-16 (LE with BOM in the shipped games) with CRLF line
+endings. The whole file is decoded once and split with one compiled multi-line pattern instead of
+line-by-line parsing.
+
+Tables can be read from a file, a directory (searched recursively) or a BSA/BA2 archive
+(`interface/translations/translate_<language>.txt` or `interface/translate_<language>.txt`).
+"""
+from __future__ import annotations
+
+import re
+import sys
+from pathlib import Path
+
+try:
+    from bethesda_archive import is_archive_path, open_archive
+except ModuleNotFoundError:
+    from scripts.bethesda_archive import is_archive_path, open_archive
+
+# `$TOKEN<TAB>text` per line; the token runs to the first tab, the text to the end of the line.
+TRANSLATION_LINE_RE = re.compile(r"^(\$[^\t\r\n]*)\t([^\r\n]*)", re.MULTILINE)
+
+
+def decode_translation_bytes(data: bytes) -> str:
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return data.decode("utf-16")
+    if data.startswith(b"\xef\xbb\xbf"):
+        return data[3:].decode("utf-8", errors="replace")
+    # No BOM: UTF-16LE if every other byte of the first tokens is NULL (`$\x00`), else UTF-8.
+    if len(data) >= 2 and data[1:2] == b"\x00":
+        return data.decode("utf-16-le", errors="replace")
+    return data.decode("utf-8", errors="replace")
+
+
+def parse_translation_text(text: str) -> dict[str, str]:
+    """$TOKEN -> text in file order; for repeated tokens the first definition wins."""
+    table: dict[str, str] = {}
+    for token, value in TRANSLATION_LINE_RE.findall(text):
+        table.setdefault(token, value)
+    return table
+
+
+def parse_translation_bytes(data: bytes) -> dict[str, str]:
+    return parse_translation_text(decode_translation_bytes(data))
+
+
+def translation_file_name(language: str) -> str:
+    return f"translate_{language.lower()}.txt"
+
+
+def read_translation_table(path: Path, language: str = "english") -> dict[str, str]:
+    """Load `translate_<language>.txt` from a file, a directory tree, or a BSA/BA2 archive."""
+    wanted = translation_file_name(language)
+    if is_archive_path(path):
+        with open_archive(path) as archive:
+            for name in (f"interface/translations/{wanted}", f"interface/{wanted}"):
+                if name in archive.entries:
+                    return parse_translation_bytes(archive.read(name))
+            matches = [e.name for e in archive.iter_entries(suffixes=(f"/{wanted}",))]
+            if not matches:
+                raise FileNotFoundError(f"{wanted} not found in {path}")
+            return parse_translation_bytes(archive.read(sorted(matches)[0]))
+    if path.is_dir():
+        matches = sorted(p for p in path.rglob("*") if p.is_file() and p.name.lower() == wanted)
+        if not matches:
+            raise FileNotFoundError(f"{wanted} not found under {path}")
+        path = matches[0]
+    return parse_translation_bytes(path.read_bytes())
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Parse Interface translate_<language>.txt tables and print token counts.")
+    ap.add_argument("paths", nargs="+", help="translate_*.txt files, directories, or BSA/BA2 archives.")
+    ap.add_argument("--language", default="english", help="Language of the file to look for in directories/archives.")
+    ap.add_argument("--show", type=int, default=0, help="Also print the first N token/text pairs.")
+    args = ap.parse_args(argv)
+
+    for raw in args.paths:
+        path = Path(raw).expanduser()
+        table = read_translation_table(path, args.language)
+        print(f"[interface] {path}: tokens={len(table)}", file=sys.stderr)
+        for token, text in list(table.items())[: args.show]:
+            print(f"{token}\t{text}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Shared reader for Bethesda localized string tables (*.STRINGS / *.DLSTRINGS / *.ILSTRINGS).
+
+Layout: u32 count, u32 data_size, then `count` (u32 id, u32 offset) directory pairs, then the data
+block. `.strings` entries are NULL-terminated; `.dlstrings`/`.ilstrings` entries are prefixed with a
+u32 length that includes the trailing NULL.
+
+Files are memory-mapped and only the directory is parsed up front (vectorised with numpy when it is
+installed) into id-sorted (id, start, end) arrays. Text is decoded when a string is looked up, so a
+TM join that only touches ids present on both sides never decodes the rest.
+
+`build_strings_bytes` writes the same layout: directory in the given order, data block in order of
+first use with identical strings stored once (entries share the offset), all in one preallocated
+buffer. `rebuild_strings` keeps a source file's own sharing instead (some official files store
+duplicate strings separately), so an unchanged table is reproduced byte for byte.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Hashable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any, Iterable, Union
+
+try:
+    import numpy as np  # optional: vectorised directory/terminator scan
+except ImportError:
+    np = None
+
+
+STRINGS_EXTENSIONS = (".strings", ".dlstrings", ".ilstrings")
+
+# Bethesda STRINGS locale suffix -> xTranslator language name (Skyrim files use the name itself).
+STRINGS_LOCALE_LANGUAGES = {
+    "en": "english",
+    "ko": "korean",
+    "de": "german",
+    "fr": "french",
+    "es": "spanish",
+    "esmx": "spanish",
+    "it": "italian",
+    "ja": "japanese",
+    "pl": "polish",
+    "ptbr": "portuguese",
+    "ru": "russian",
+    "cn": "chinese",
+}
+
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+
+def is_strings_file(name: str) -> bool:
+    return name.lower().endswith(STRINGS_EXTENSIONS)
+
+
+def is_sized_strings_file(name: str) -> bool:
+    return name.lower().endswith((".dlstrings", ".ilstrings"))
+
+
+def decode_bethesda_string(raw: bytes) -> str:
+    # These files are typically UTF-8, but some official assets may contain legacy encodings.
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("cp1252", errors="replace")
+
+
+def _index_numpy(buf: Buffer, count: int, sized: bool) -> tuple[Any, Any, Any]:
+    size = len(buf)
+    data_off = 8 + count * 8
+    table = np.frombuffer(buf, dtype="<u4", count=count * 2, offset=8).reshape(count, 2)
+    ids = table[:, 0]
+    starts = table[:, 1].astype(np.int64) + data_off
+    keep = starts < size
+    ids, starts = ids[keep], starts[keep]
+
+    raw = np.frombuffer(buf, dtype=np.uint8)
+    if sized:
+        keep = starts + 4 <= size
+        ids, starts = ids[keep], starts[keep]
+        # Gather the u32 little-endian length prefixes in one shot.
+        lengths = (
+            raw[starts].astype(np.int64)
+            | (raw[starts + 1].astype(np.int64) << 8)
+            | (raw[starts + 2].astype(np.int64) << 16)
+            | (raw[starts + 3].astype(np.int64) << 24)
+        )
+        starts = starts + 4
+        ends = np.minimum(size, starts + np.maximum(0, lengths - 1))  # exclude NULL
+    else:
+        # One scan for every NULL in the data block, then a binary search per string start.
+        nulls = np.flatnonzero(raw[data_off:] == 0) + data_off
+        pos = np.searchsorted(nulls, starts)
+        keep = pos < len(nulls)  # no terminator -> skip, like the scalar path
+        ids, starts, pos = ids[keep], starts[keep], pos[keep]
+        ends = nulls[pos]
+
+    # Sort by id; for duplicate ids keep the last one in file order (same as assigning into a dict).
+    order = np.argsort(ids, kind="stable")
+    ids, starts, ends = ids[order], starts[order], ends[order]
+    last = np.ones(len(ids), dtype=bool)
+    last[:-1] = ids[1:] != ids[:-1]
+    return ids[last], starts[last], ends[last]
+
+
+def _index_python(buf: Buffer, count: int, sized: bool) -> tuple[array, array, array]:
+    size = len(buf)
+    data_off = 8 + count * 8
+    spans: dict[int, tuple[int, int]] = {}
+    for sid, off in struct.iter_unpack("<II", buf[8:data_off]):
+        start = data_off + off
+        if start >= size:
+            continue
+        if sized:
+            if start + 4 > size:
+                continue
+            length = int.from_bytes(buf[start : start + 4], "little")
+            start += 4
+            end = min(size, start + max(0, length - 1))  # exclude NULL
+        else:
+            end = buf.find(b"\x00", start)
+            if end < 0:
+                continue
+        spans[sid] = (start, end)
+    ids = sorted(spans)
+    return (
+        array("I", ids),
+        array("q", (spans[sid][0] for sid in ids)),
+        array("q", (spans[sid][1] for sid in ids)),
+    )
+
+
+class StringsTable(Mapping[int, str]):
+    """Read-only id -> text view over one STRINGS buffer; each lookup decodes one entry.
+
+    The index is three parallel arrays sorted by id (ids, start, end) rather than a dict, so an
+    indexed file costs ~20 bytes per entry on top of the (shared, file-backed) mapping.
+    """
+
+    def __init__(self, name: str, buf: Buffer, *, owner: mmap.mmap | None = None) -> None:
+        self.name = name
+        self._buf = buf
+        self._owner = owner
+        self._ids: Sequence[int] = array("I")
+        self._starts: Sequence[int] = array("q")
+        self._ends: Sequence[int] = array("q")
+
+        if len(buf) < 8:
+            return
+        count, _data_size = struct.unpack_from("<II", buf, 0)
+        count = min(count, (len(buf) - 8) // 8)
+        sized = is_sized_strings_file(name)
+        if np is not None:
+            self._ids, self._starts, self._ends = _index_numpy(buf, count, sized)
+        else:
+            self._ids, self._starts, self._ends = _index_python(buf, count, sized)
+
+    def _find(self, sid: object) -> int:
+        if not isinstance(sid, int):
+            return -1
+        ids = self._ids
+        i = bisect_left(ids, sid) if isinstance(ids, array) else int(np.searchsorted(ids, sid))
+        return i if i < len(ids) and ids[i] == sid else -1
+
+    def __getitem__(self, sid: int) -> str:
+        i = self._find(sid)
+        if i < 0:
+            raise KeyError(sid)
+        return decode_bethesda_string(self._buf[self._starts[i] : self._ends[i]])
+
+    def __contains__(self, sid: object) -> bool:
+        return self._find(sid) >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def raw(self, sid: int) -> bytes:
+        i = self._find(sid)
+        if i < 0:
+            raise KeyError(sid)
+        return bytes(self._buf[self._starts[i] : self._ends[i]])
+
+    def iter_items(self) -> Iterator[tuple[int, str]]:
+        """(id, text) in id order without per-key lookups."""
+        buf = self._buf
+        for sid, start, end in zip(self._ids.tolist(), self._starts.tolist(), self._ends.tolist()):
+            yield sid, decode_bethesda_string(buf[start:end])
+
+    def join(self, other: StringsTable) -> Iterator[tuple[int, str, str]]:
+        """(id, self text, other text) for ids present in both tables, in id order; only those are decoded."""
+        if not isinstance(self._ids, array) and not isinstance(other._ids, array):
+            common, mine, theirs = np.intersect1d(self._ids, other._ids, assume_unique=True, return_indices=True)
+            positions = zip(common.tolist(), mine.tolist(), theirs.tolist())
+        else:
+            theirs_by_id = {sid: j for j, sid in enumerate(other._ids)}
+            positions = ((sid, i, theirs_by_id[sid]) for i, sid in enumerate(self._ids) if sid in theirs_by_id)
+        a, b = self._buf, other._buf
+        for sid, i, j in positions:
+            yield (
+                sid,
+                decode_bethesda_string(a[self._starts[i] : self._ends[i]]),
+                decode_bethesda_string(b[other._starts[j] : other._ends[j]]),
+            )
+
+    def directory(self) -> list[tuple[int, int, bytes]]:
+        """(id, data offset, raw bytes) for every directory entry in file order, duplicates included."""
+        buf = self._buf
+        if len(buf) < 8:
+            return []
+        count = min(struct.unpack_from("<I", buf, 0)[0], (len(buf) - 8) // 8)
+        data_off = 8 + count * 8
+        sized = is_sized_strings_file(self.name)
+        out: list[tuple[int, int, bytes]] = []
+        for sid, off in struct.iter_unpack("<II", buf[8:data_off]):
+            start = data_off + off
+            if sized:
+                length = int.from_bytes(buf[start : start + 4], "little")
+                start += 4
+                end = min(len(buf), start + max(0, length - 1))
+            else:
+                end = buf.find(b"\x00", start)
+                if end < 0:
+                    raise ValueError(f"{self.name}: unterminated string {sid} at offset {off}")
+            out.append((sid, off, bytes(buf[start:end])))
+        return out
+
+    def close(self) -> None:
+        self._ids, self._starts, self._ends = array("I"), array("q"), array("q")
+        self._buf = b""
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+    def __enter__(self) -> StringsTable:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def open_strings_file(path: Path) -> StringsTable:
+    """Memory-map `path` and index it. Call `close()` (or use `with`) to release the mapping."""
+    with path.open("rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return StringsTable(path.name, b"")
+    return StringsTable(path.name, mm, owner=mm)
+
+
+def parse_strings_bytes(file_name: str, data: Buffer) -> StringsTable:
+    """Index an in-memory STRINGS payload (e.g. an entry read from a BSA)."""
+    return StringsTable(file_name, data)
+
+
+def _build(file_name: str, entries: Sequence[tuple[int, bytes]], share_keys: Sequence[Hashable]) -> bytes:
+    sized = is_sized_strings_file(file_name)
+    overhead = 5 if sized else 1  # u32 length prefix (sized only) + NULL terminator
+    slots: dict[Hashable, tuple[int, bytes]] = {}
+    directory = array("I", bytes(8 * len(entries)))
+    data_size = 0
+    for i, ((sid, raw), key) in enumerate(zip(entries, share_keys)):
+        slot = slots.get(key)
+        if slot is None:
+            if b"\x00" in raw:
+                raise ValueError(f"{file_name}: string {sid} contains a NULL byte")
+            slot = slots[key] = (data_size, raw)
+            data_size += len(raw) + overhead
+        directory[2 * i] = sid
+        directory[2 * i + 1] = slot[0]
+    if sys.byteorder != "little":
+        directory.byteswap()
+
+    data_off = 8 + 8 * len(entries)
+    out = bytearray(data_off + data_size)
+    struct.pack_into("<II", out, 0, len(entries), data_size)
+    out[8:data_off] = directory.tobytes()
+    view = memoryview(out)
+    for off, raw in slots.values():  # insertion order == offset order
+        pos = data_off + off
+        if sized:
+            struct.pack_into("<I", out, pos, len(raw) + 1)
+            pos += 4
+        view[pos : pos + len(raw)] = raw
+        # The NULL terminator is already there: the buffer starts zero-filled.
+    return bytes(out)
+
+
+def _encode(text: str | bytes) -> bytes:
+    return text.encode("utf-8") if isinstance(text, str) else bytes(text)
+
+
+def build_strings_bytes(file_name: str, entries: Sequence[tuple[int, str | bytes]]) -> bytes:
+    """Serialize (id, text) entries, in directory order, as a STRINGS/DLSTRINGS/ILSTRINGS payload.
+
+    `str` values are UTF-8 encoded; `bytes` values are written as-is. Identical payloads share one
+    copy in the data block.
+    """
+    encoded = [(sid, _encode(text)) for sid, text in entries]
+    return _build(file_name, encoded, [raw for _sid, raw in encoded])
+
+
+def rebuild_strings(table: StringsTable, replacements: Mapping[int, str | bytes]) -> bytes:
+    """`table`'s layout with the given ids' text replaced; unchanged input is reproduced byte for byte.
+
+    Untouched entries keep the source's offset sharing; replaced texts are shared by content.
+    """
+    entries: list[tuple[int, bytes]] = []
+    keys: list[Hashable] = []
+    for sid, off, raw in table.directory():
+        if sid in replacements:
+            raw = _encode(replacements[sid])
+            keys.append(("text", raw))
+        else:
+            keys.append(("offset", off))
+        entries.append((sid, raw))
+    return _build(table.name, entries, keys)
+
+
+def write_strings_file(path: Path, data: bytes) -> None:
+    """Write a built STRINGS payload via a temp file so a failed write never leaves a truncated table."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def iter_strings_files(root: Path, locale: str | None = None) -> Iterable[Path]:
+    """STRINGS files under `root` (recursive, sorted); with `locale`, only names containing `_<locale>.`."""
+    suffix = f"_{locale.lower()}." if locale else None
+    for p in sorted(root.rglob("*")):
+        if not p.is_file() or not is_strings_file(p.name):
+            continue
+        if suffix and suffix not in p.name.lower():
+            continue
+        yield p
+
+
+def open_strings_dir(root: Path, locale: str | None = None) -> dict[str, StringsTable]:
+    """Index every STRINGS file under `root`, keyed by lower-cased file name (first path wins)."""
+    out: dict[str, StringsTable] = {}
+    for p in iter_strings_files(root, locale):
+        key = p.name.lower()
+        if key in out:
+            continue
+        out[key] = open_strings_file(p)
+    return out
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    import time
+
+    ap = argparse.ArgumentParser(description="Index Bethesda STRINGS files and print per-file entry counts.")
+    ap.add_argument("paths", nargs="+", help="STRINGS files or directories.")
+    ap.add_argument("--locale", help="Only include files whose name contains _<locale>.")
+    ap.add_argument("--decode", action="store_true", help="Also decode every string (for timing).")
+    ap.add_argument(
+        "--verify-roundtrip", action="store_true", help="Rebuild each file with the writer and report any byte differences."
+    )
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    files = 0
+    total = 0
+    mismatched = 0
+    for raw in args.paths:
+        path = Path(raw).expanduser()
+        paths = [path] if path.is_file() else list(iter_strings_files(path, args.locale))
+        for p in paths:
+            with open_strings_file(p) as table:
+                files += 1
+                total += len(table)
+                if args.decode:
+                    for _sid, _text in table.iter_items():
+                        pass
+                if args.verify_roundtrip and rebuild_strings(table, {}) != p.read_bytes():
+                    mismatched += 1
+                    print(f"[strings] round trip differs: {p}", file=sys.stderr)
+    backend = "numpy" if np is not None else "python"
+    print(f"[strings] files={files} entries={total} backend={backend} {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
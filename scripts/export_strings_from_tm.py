@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Export game-ready localized STRINGS files by applying a translation memory to source-language tables.
+
+Every string whose normalized source text has a TM entry is replaced; everything else (and the
+directory/sharing layout) is kept as-is, so files with no TM hits come out byte-identical.
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+try:
+    from bethesda_strings import iter_strings_files, open_strings_file, rebuild_strings, write_strings_file
+    from tm_output import normalize_tm_key
+except ModuleNotFoundError:
+    from scripts.bethesda_strings import iter_strings_files, open_strings_file, rebuild_strings, write_strings_file
+    from scripts.tm_output import normalize_tm_key
+
+
+def load_tm(path: Path) -> dict[str, str]:
+    """Normalized source key -> target text from a seed TSV or SQLite TM (first entry per key wins)."""
+    tm: dict[str, str] = {}
+    if path.suffix.lower() in (".sqlite", ".db"):
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            for key, dst in conn.execute("SELECT SrcKey, DstText FROM TranslationMemory"):
+                tm.setdefault(key, dst)
+        finally:
+            conn.close()
+        return tm
+    with path.open("r", encoding="utf-8-sig") as f:
+        for i, line in enumerate(f):
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 2 or not parts[0].strip() or not parts[1].strip():
+                continue
+            if i == 0 and parts[0].lower() == "source" and parts[1].lower() == "target":
+                continue
+            tm.setdefault(normalize_tm_key(parts[0]), parts[1].strip())
+    return tm
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(description="Write localized STRINGS/DLSTRINGS/ILSTRINGS by applying a TM to source files.")
+    ap.add_argument("--source-root", required=True, help="Directory containing the SOURCE language STRINGS files.")
+    ap.add_argument("--tm", required=True, help="TM as Source/Target TSV or the seed scripts' SQLite output.")
+    ap.add_argument("--out-dir", required=True, help="Output directory for the localized files.")
+    ap.add_argument("--source-locale", default="en", help="Locale suffix of the source files (default: en).")
+    ap.add_argument("--target-locale", default="ko", help="Locale suffix for the written files (default: ko).")
+    args = ap.parse_args(argv)
+
+    source_root = Path(args.source_root).expanduser()
+    out_dir = Path(args.out_dir).expanduser()
+    if not source_root.exists():
+        raise SystemExit(f"missing --source-root: {source_root}")
+    tm = load_tm(Path(args.tm).expanduser())
+    src_suffix = f"_{args.source_locale.lower()}."
+
+    files = 0
+    replaced_total = 0
+    for path in iter_strings_files(source_root, args.source_locale):
+        idx = path.name.lower().rfind(src_suffix)
+        out_name = f"{path.name[:idx]}_{args.target_locale}.{path.name[idx + len(src_suffix):]}"
+        with open_strings_file(path) as table:
+            replacements: dict[int, str] = {}
+            for sid, text in table.iter_items():
+                dst = tm.get(normalize_tm_key(text))
+                if dst is not None:
+                    replacements[sid] = dst
+            data = rebuild_strings(table, replacements)
+            total = len(table)
+        write_strings_file(out_dir / out_name, data)
+        files += 1
+        replaced_total += len(replacements)
+        print(f"[strings] {out_name}: replaced={len(replacements)}/{total}")
+
+    print(f"[strings] files={files} replaced={replaced_total} tm_entries={len(tm)} out={out_dir}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
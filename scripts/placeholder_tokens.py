@@ -0,0 +1,14 @@
+"""
+Placeholder tokens the translator masks before sending text to Gemini: line breaks, `<...>` tags
+(with an optional +/- sign), `[pagebreak]` and printf-style `%` formats.
+
+Kept dependency-free so the TM tools can share the masker's token set without pulling in `requests`.
+"""
+from __future__ import annotations
+
+import re
+
+PLACEHOLDER_RE = re.compile(
+    r"(\r\n|\r|\n|[+-]?<[^>]+>|\[pagebreak\]|%[-0-9.]*[A-Za-z])",
+    flags=re.IGNORECASE,
+)
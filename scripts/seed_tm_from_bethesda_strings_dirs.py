@@ -2,91 +2,102 @@
 from __future__ import annotations
 
 import argparse
+import os
 import re
-import struct
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import BinaryIO, Iterable
+
+try:
+    from bethesda_archive import Archive, is_archive_path, open_archive
+    from bethesda_strings import STRINGS_EXTENSIONS, StringsTable, iter_strings_files, open_strings_file, parse_strings_bytes
+    from tm_output import DEFAULT_MAX_IN_MEMORY, SortedPairSpool, output_paths, parse_formats, write_tm
+    from tm_quality import add_quality_arguments, quality_filter_from_args
+    from tm_seed_cache import SeedCache, default_seed_cache_dir
+except ModuleNotFoundError:
+    from scripts.bethesda_archive import Archive, is_archive_path, open_archive
+    from scripts.bethesda_strings import (
+        STRINGS_EXTENSIONS,
+        StringsTable,
+        iter_strings_files,
+        open_strings_file,
+        parse_strings_bytes,
+    )
+    from scripts.tm_output import DEFAULT_MAX_IN_MEMORY, SortedPairSpool, output_paths, parse_formats, write_tm
+    from scripts.tm_quality import add_quality_arguments, quality_filter_from_args
+    from scripts.tm_seed_cache import SeedCache, default_seed_cache_dir
 
 
 HANGUL_RE = re.compile(r"[가-힣]")
+LOCALE_NAME_RE = re.compile(r"^(?P<stem>.+)_(?P<locale>[a-z]+)\.(?P<ext>strings|dlstrings|ilstrings)$")
+KOREAN_LOCALES = ("ko", "kr", "korean")
+
+# ("file", path) or ("archive", archive_path, entry_name, use_cache): picklable, opened in workers.
+StringsSpec = tuple
+
+
+def _strings_specs(root: Path, locale: str | None, *, use_cache: bool) -> dict[str, tuple[str, StringsSpec]]:
+    """Lower-cased file name -> (display path, spec) for a STRINGS directory or a BSA/BA2 archive."""
+    out: dict[str, tuple[str, StringsSpec]] = {}
+    if is_archive_path(root):
+        suffix = f"_{locale.lower()}." if locale else None
+        with open_archive(root, use_cache=use_cache) as archive:
+            entries = sorted(archive.iter_entries(prefix="strings/", suffixes=STRINGS_EXTENSIONS), key=lambda e: e.name)
+        for e in entries:
+            name = e.name.rsplit("/", 1)[-1]
+            if (suffix and suffix not in name) or name in out:
+                continue
+            out[name] = (f"{root}:{e.name}", ("archive", str(root), e.name, use_cache))
+        return out
+    for p in iter_strings_files(root, locale):
+        out.setdefault(p.name.lower(), (str(p), ("file", str(p))))
+    return out
 
 
-def _normalize_tm_key(text: str) -> str:
-    return (text or "").strip().replace("\r\n", "\n").replace("\r", "\n").lower()
+_ARCHIVES: dict[str, Archive] = {}
 
 
-def _read_exact(f: BinaryIO, n: int) -> bytes:
-    b = f.read(n)
-    if len(b) != n:
-        raise EOFError(f"expected {n} bytes, got {len(b)}")
-    return b
+def _spec_archive(spec: StringsSpec) -> Archive:
+    _kind, archive_path, _entry_name, use_cache = spec
+    archive = _ARCHIVES.get(archive_path)
+    if archive is None:
+        # One open per process; the persisted index makes this cheap in pool workers.
+        archive = _ARCHIVES[archive_path] = open_archive(Path(archive_path), use_cache=use_cache)
+    return archive
 
 
-def _decode_bethesda_string(raw: bytes) -> str:
-    # These files are typically UTF-8, but some official assets may contain legacy encodings.
-    try:
-        return raw.decode("utf-8")
-    except UnicodeDecodeError:
-        return raw.decode("cp1252", errors="replace")
-
-
-def _parse_strings_file_bytes(file_name: str, data: bytes) -> dict[int, str]:
-    lower = file_name.lower()
-    is_sized = lower.endswith(".dlstrings") or lower.endswith(".ilstrings")
-    if len(data) < 8:
-        return {}
-
-    count, _data_size = struct.unpack_from("<II", data, 0)
-    dir_off = 8
-    data_off = 8 + count * 8
-    out: dict[int, str] = {}
-
-    for i in range(count):
-        sid, off = struct.unpack_from("<II", data, dir_off + i * 8)
-        start = data_off + off
-        if start < 0 or start >= len(data):
-            continue
+def _open_spec(spec: StringsSpec) -> StringsTable:
+    if spec[0] == "file":
+        return open_strings_file(Path(spec[1]))
+    entry_name = spec[2]
+    return parse_strings_bytes(entry_name.rsplit("/", 1)[-1], _spec_archive(spec).read(entry_name))
 
-        if is_sized:
-            if start + 4 > len(data):
-                continue
-            length = struct.unpack_from("<I", data, start)[0]
-            start += 4
-            end = min(len(data), start + max(0, length - 1))  # exclude NULL
-            raw = data[start:end]
-            out[sid] = _decode_bethesda_string(raw)
-            continue
 
-        # .strings: NULL-terminated
-        try:
-            end = data.index(b"\x00", start)
-        except ValueError:
-            continue
-        raw = data[start:end]
-        out[sid] = _decode_bethesda_string(raw)
+def _spec_ident(spec: StringsSpec) -> str:
+    return str(Path(spec[1]).resolve()) if spec[0] == "file" else f"{Path(spec[1]).resolve()}::{spec[2]}"
 
-    return out
 
+def _spec_fingerprint(cache: SeedCache, spec: StringsSpec) -> str:
+    if spec[0] == "file":
+        return cache.file_fingerprint(Path(spec[1]))
+    archive = _spec_archive(spec)
+    return cache.entry_fingerprint(archive, archive.entries[spec[2]])
+
+
+def _job_key(src_spec: StringsSpec, tgt_spec: StringsSpec, include_long: bool, require_hangul: bool) -> str:
+    return f"{_spec_ident(src_spec)}|{_spec_ident(tgt_spec)}|long={int(include_long)}|hangul={int(require_hangul)}"
 
-def _iter_strings_files(root: Path, source_locale: str | None) -> Iterable[Path]:
-    for p in sorted(root.rglob("*")):
-        if not p.is_file():
-            continue
-        low = p.name.lower()
-        if not low.endswith((".strings", ".dlstrings", ".ilstrings")):
-            continue
-        if source_locale:
-            suffix = f"_{source_locale.lower()}."
-            if suffix not in low:
-                continue
-        yield p
 
+def _open_seed_cache(args: argparse.Namespace) -> SeedCache | None:
+    if args.no_pair_cache:
+        return None
+    return SeedCache(Path(args.pair_cache_dir).expanduser() if args.pair_cache_dir else default_seed_cache_dir(), "dirs")
 
-def _should_keep_pair(source: str, target: str, include_long: bool) -> bool:
+
+def _should_keep_pair(source: str, target: str, include_long: bool, require_hangul: bool = True) -> bool:
     if not source or not target:
         return False
-    if not HANGUL_RE.search(target):
+    if require_hangul and not HANGUL_RE.search(target):
         return False
     if source == target:
         return False
@@ -98,97 +109,311 @@ def _should_keep_pair(source: str, target: str, include_long: bool) -> bool:
     return True
 
 
-def _write_tsv(path: Path, pairs: list[tuple[str, str]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8", newline="\n") as f:
-        f.write("Source\tTarget\n")
-        for src, dst in pairs:
-            # Basic TSV escaping: replace tabs/newlines.
-            src = src.replace("\t", " ").replace("\r", " ").replace("\n", " ").strip()
-            dst = dst.replace("\t", " ").replace("\r", " ").replace("\n", " ").strip()
-            if not src or not dst:
-                continue
-            f.write(src)
-            f.write("\t")
-            f.write(dst)
-            f.write("\n")
+def _join_locales(
+    job: tuple[str, StringsSpec, dict[str, StringsSpec], bool],
+) -> tuple[str, dict[str, list[tuple[str, str]]], list[str]]:
+    """Worker: decode one source file once and join it against every target locale's copy."""
+    group, src_spec, tgt_specs, include_long = job
+    errors: list[str] = []
+    out: dict[str, list[tuple[str, str]]] = {}
+    if not tgt_specs:
+        return group, out, errors
+    try:
+        with _open_spec(src_spec) as src_map:
+            src_texts = dict(src_map.iter_items())
+    except Exception as ex:  # noqa: BLE001
+        return group, out, [f"{group}: source: {ex}"]
+    if not src_texts:
+        return group, out, errors
+
+    for locale, spec in tgt_specs.items():
+        try:
+            tgt_map = _open_spec(spec)
+        except Exception as ex:  # noqa: BLE001
+            errors.append(f"{group}: {locale}: {ex}")
+            continue
+        require_hangul = locale in KOREAN_LOCALES
+        pairs: list[tuple[str, str]] = []
+        with tgt_map:
+            for sid, tgt_text in tgt_map.iter_items():
+                src_text = src_texts.get(sid)
+                if src_text is None:
+                    continue
+                if _should_keep_pair(src_text, tgt_text, include_long=include_long, require_hangul=require_hangul):
+                    pairs.append((src_text, tgt_text))
+        out[locale] = pairs
+    return group, out, errors
+
+
+def _group_by_locale(specs: dict[str, tuple[str, StringsSpec]]) -> dict[tuple[str, str], dict[str, StringsSpec]]:
+    """(stem, ext) -> {locale: spec} from names like `DLCCoast_de.STRINGS`."""
+    groups: dict[tuple[str, str], dict[str, StringsSpec]] = {}
+    for name, (_display, spec) in specs.items():
+        m = LOCALE_NAME_RE.match(name)
+        if m:
+            groups.setdefault((m.group("stem"), m.group("ext")), {})[m.group("locale")] = spec
+    return groups
+
+
+def _run_multi_locale(
+    args: argparse.Namespace, source_root: Path, target_root: Path, source_locale: str, formats: list[str]
+) -> int:
+    use_cache = not args.no_index_cache
+    src_groups = _group_by_locale(_strings_specs(source_root, None, use_cache=use_cache))
+    tgt_groups = src_groups if target_root == source_root else _group_by_locale(
+        _strings_specs(target_root, None, use_cache=use_cache)
+    )
+
+    available = sorted({loc for g in tgt_groups.values() for loc in g} - {source_locale})
+    wanted = [s.strip().lower() for s in args.target_locales.split(",") if s.strip()]
+    locales = available if wanted == ["all"] else [loc for loc in wanted if loc != source_locale]
+    unknown = [loc for loc in locales if loc not in available]
+    if unknown:
+        raise SystemExit(f"no STRINGS files for locale(s): {', '.join(unknown)} (available: {', '.join(available)})")
+
+    jobs: list[tuple[str, StringsSpec, dict[str, StringsSpec], bool]] = []
+    for (stem, ext), by_locale in sorted(src_groups.items()):
+        src_spec = by_locale.get(source_locale)
+        if src_spec is None:
+            continue
+        targets = tgt_groups.get((stem, ext), {})
+        tgt_specs = {loc: targets[loc] for loc in locales if loc in targets}
+        if tgt_specs:
+            jobs.append((f"{stem}_{source_locale}.{ext}", src_spec, tgt_specs, args.include_long))
+
+    # Per (job, locale): reuse the cached pairs when both files are unchanged, and only send the
+    # remaining locales to the workers. Only keys and digests are kept up front; the cached pairs are
+    # loaded one job at a time while consuming, so a fully cached re-run stays within the spool cap.
+    cache = _open_seed_cache(args)
+    cached: list[set[str]] = []
+    job_keys: list[dict[str, tuple[str, list[str]]]] = []
+    pending_jobs: list[tuple[str, StringsSpec, dict[str, StringsSpec], bool]] = []
+    for group, src_spec, tgt_specs, include_long in jobs:
+        hits: set[str] = set()
+        keys: dict[str, tuple[str, list[str]]] = {}
+        if cache is not None:
+            try:
+                src_digest = _spec_fingerprint(cache, src_spec)
+                for loc, spec in tgt_specs.items():
+                    key = _job_key(src_spec, spec, include_long, loc in KOREAN_LOCALES)
+                    keys[loc] = (key, [src_digest, _spec_fingerprint(cache, spec)])
+                    if cache.has(*keys[loc]):
+                        hits.add(loc)
+            except Exception as ex:  # noqa: BLE001
+                print(f"[seed-tm] failed fingerprinting {group}: {ex}", file=sys.stderr)
+                hits, keys = set(), {}
+        cached.append(hits)
+        job_keys.append(keys)
+        pending_jobs.append((group, src_spec, {loc: spec for loc, spec in tgt_specs.items() if loc not in hits}, include_long))
+
+    spools = {loc: SortedPairSpool(max_in_memory=args.max_pairs_in_memory) for loc in locales}
+    matched_by_locale: dict[str, int] = {loc: 0 for loc in locales}
+    workers = min(args.jobs or os.cpu_count() or 1, max(1, sum(1 for job in pending_jobs if job[2])))
+    if workers <= 1:
+        results = map(_join_locales, pending_jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_join_locales, pending_jobs)
+    try:
+        # Consumed in job order, so first-wins dedupe matches a sequential run.
+        for (group, src_spec, tgt_specs, include_long), hits, keys, (_g, per_locale, errors) in zip(
+            jobs, cached, job_keys, results
+        ):
+            pending = [loc for loc in tgt_specs if loc not in hits]
+            for loc in hits:
+                hit = cache.get(*keys[loc])  # type: ignore[union-attr]
+                if hit is None:
+                    # The cached pairs became unreadable since the check: join this locale here.
+                    _g, redo, redo_errors = _join_locales((group, src_spec, {loc: tgt_specs[loc]}, include_long))
+                    per_locale.update(redo)
+                    errors.extend(redo_errors)
+                    pending.append(loc)
+                    continue
+                matched, pairs = hit
+                matched_by_locale[loc] += matched
+                spool = spools[loc]
+                for src_text, tgt_text in pairs:
+                    spool.add(src_text, tgt_text)
+            for err in errors:
+                print(f"[seed-tm] failed reading: {err}", file=sys.stderr)
+            for loc, pairs in per_locale.items():
+                matched_by_locale[loc] += 1
+                spool = spools[loc]
+                for src_text, tgt_text in pairs:
+                    spool.add(src_text, tgt_text)
+            if cache is not None:
+                for loc in pending:
+                    if loc not in keys:
+                        continue
+                    if loc in per_locale:
+                        cache.put(*keys[loc], per_locale[loc])
+                    elif not errors:
+                        # Empty source table: nothing to join for any locale.
+                        cache.put(*keys[loc], [], matched=False)
+    finally:
+        if workers > 1:
+            pool.shutdown()
+    if cache is not None:
+        cache.save()
+        print(f"[seed-tm] pair cache: reused={cache.hits} parsed={sum(len(job[2]) for job in jobs) - cache.hits}")
+
+    out_dir = Path(args.out_dir).expanduser()
+    for loc in locales:
+        tm_path = out_dir / f"{source_locale}-{loc}.tsv"
+        paths = output_paths(tm_path, formats)
+        pairs = spools[loc].sorted_pairs()
+        quality = quality_filter_from_args(args, tm_path, korean_target=loc in KOREAN_LOCALES)
+        if quality is not None:
+            quality.fit(spools[loc].sorted_pairs(keep=True))
+            pairs = quality.filter(pairs)
+        n = write_tm(paths, pairs, source_lang=source_locale, dest_lang=loc)
+        out = ",".join(str(p) for p in paths.values())
+        dropped = f" low_quality_dropped={quality.dropped}" if quality is not None else ""
+        print(f"[seed-tm] {source_locale}->{loc} matched_files={matched_by_locale[loc]} pairs={n}{dropped} out={out}")
+    return 0
 
 
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser(
         description="Build Source->Target translation-memory TSV by matching Bethesda *.STRINGS files (by filename and string ID)."
     )
-    ap.add_argument("--source-root", required=True, help="Root directory containing the SOURCE language STRINGS files.")
-    ap.add_argument("--target-root", required=True, help="Root directory containing the TARGET language STRINGS files.")
+    ap.add_argument(
+        "--source-root", required=True, help="Directory (or BSA/BA2 archive) containing the SOURCE language STRINGS files."
+    )
+    ap.add_argument(
+        "--target-root",
+        help="Directory (or BSA/BA2 archive) containing the TARGET language STRINGS files. "
+        "Required for a single pair; defaults to --source-root with --target-locales.",
+    )
     ap.add_argument("--source-locale", default="en", help="Only include files whose name contains _<locale> (default: en).")
-    ap.add_argument("--out", required=True, help="Output TSV path.")
+    ap.add_argument("--out", help="Output TSV path (single pair); other --formats use the same stem.")
+    ap.add_argument(
+        "--target-locales",
+        help="Comma-separated locales (or 'all'): join <name>_<source>.* against <name>_<locale>.* for every "
+        "locale in one run and write <out-dir>/<source>-<locale>.tsv each. Only Korean targets require Hangul.",
+    )
+    ap.add_argument("--out-dir", help="Output directory for --target-locales.")
+    ap.add_argument("--jobs", type=int, default=0, help="Worker processes for --target-locales (0=cpu count).")
     ap.add_argument(
         "--include-long",
         action="store_true",
         help="Include long/multiline entries (default filters them out).",
     )
+    ap.add_argument("--no-index-cache", action="store_true", help="Re-parse archive record tables instead of using the cached index.")
+    ap.add_argument(
+        "--formats",
+        default="tsv",
+        help="Comma-separated TM outputs: tsv, sqlite (the app's TranslationMemory table + FTS5 over SrcText), parquet (needs pyarrow). "
+        "Non-TSV files are written next to the TSV path with their own suffix (default: tsv).",
+    )
+    ap.add_argument(
+        "--max-pairs-in-memory",
+        type=int,
+        default=DEFAULT_MAX_IN_MEMORY,
+        help=f"Unique pairs buffered before spilling a sorted run to a temp file (default: {DEFAULT_MAX_IN_MEMORY}).",
+    )
+    add_quality_arguments(ap)
+    ap.add_argument("--pair-cache-dir", help="Where per-file extracted pairs are cached between runs (default: user cache dir).")
+    ap.add_argument("--no-pair-cache", action="store_true", help="Re-parse every STRINGS file instead of reusing cached pairs.")
     args = ap.parse_args(argv)
+    formats = parse_formats(args.formats)
 
     source_root = Path(args.source_root).expanduser()
-    target_root = Path(args.target_root).expanduser()
-    out_path = Path(args.out).expanduser()
     source_locale = (args.source_locale or "").strip()
 
     if not source_root.exists():
         raise SystemExit(f"missing --source-root: {source_root}")
+
+    if args.target_locales:
+        if not args.out_dir:
+            raise SystemExit("--target-locales requires --out-dir")
+        if not source_locale:
+            raise SystemExit("--target-locales requires --source-locale")
+        target_root = Path(args.target_root).expanduser() if args.target_root else source_root
+        if not target_root.exists():
+            raise SystemExit(f"missing --target-root: {target_root}")
+        return _run_multi_locale(args, source_root, target_root, source_locale.lower(), formats)
+
+    if not args.target_root or not args.out:
+        raise SystemExit("--target-root and --out are required (or use --target-locales/--out-dir)")
+    target_root = Path(args.target_root).expanduser()
+    out_path = Path(args.out).expanduser()
     if not target_root.exists():
         raise SystemExit(f"missing --target-root: {target_root}")
 
-    target_by_name: dict[str, Path] = {}
-    for p in _iter_strings_files(target_root, source_locale=None):
-        key = p.name.lower()
-        target_by_name.setdefault(key, p)
+    use_cache = not args.no_index_cache
+    target_by_name = _strings_specs(target_root, None, use_cache=use_cache)
+    source_by_name = _strings_specs(source_root, source_locale or None, use_cache=use_cache)
 
-    pairs_by_key: dict[str, tuple[str, str]] = {}
+    cache = _open_seed_cache(args)
+    spool = SortedPairSpool(max_in_memory=args.max_pairs_in_memory)
     matched_files = 0
     missing_target_files = 0
 
-    for src_path in _iter_strings_files(source_root, source_locale=source_locale):
-        tgt_path = target_by_name.get(src_path.name.lower())
-        if tgt_path is None:
+    for name, (src_path, src_spec) in source_by_name.items():
+        target = target_by_name.get(name)
+        if target is None:
             missing_target_files += 1
             continue
+        tgt_path, tgt_spec = target
+
+        cache_key: tuple[str, list[str]] | None = None
+        if cache is not None:
+            try:
+                digests = [_spec_fingerprint(cache, src_spec), _spec_fingerprint(cache, tgt_spec)]
+                cache_key = (_job_key(src_spec, tgt_spec, args.include_long, True), digests)
+            except Exception as ex:  # noqa: BLE001
+                print(f"[seed-tm] failed fingerprinting: {src_path} / {tgt_path}: {ex}", file=sys.stderr)
+            hit = cache.get(*cache_key) if cache_key else None
+            if hit is not None:
+                matched, pairs = hit
+                matched_files += matched
+                for src_text, tgt_text in pairs:
+                    spool.add(src_text, tgt_text)
+                continue
 
+        # Each table gets its own context, so the source is closed even when the target fails to open.
         try:
-            src_bytes = src_path.read_bytes()
-            tgt_bytes = tgt_path.read_bytes()
-        except Exception as ex:
+            with _open_spec(src_spec) as src_map, _open_spec(tgt_spec) as tgt_map:
+                pairs = None
+                if src_map and tgt_map:
+                    pairs = [
+                        (src_text, tgt_text)
+                        for _sid, src_text, tgt_text in src_map.join(tgt_map)
+                        if _should_keep_pair(src_text, tgt_text, include_long=args.include_long)
+                    ]
+        except Exception as ex:  # noqa: BLE001
             print(f"[seed-tm] failed reading: {src_path} / {tgt_path}: {ex}", file=sys.stderr)
             continue
 
-        src_map = _parse_strings_file_bytes(src_path.name, src_bytes)
-        tgt_map = _parse_strings_file_bytes(tgt_path.name, tgt_bytes)
-        if not src_map or not tgt_map:
+        if pairs is None:
+            if cache_key:
+                cache.put(*cache_key, [], matched=False)
             continue
-
         matched_files += 1
-        for sid, src_text in src_map.items():
-            tgt_text = tgt_map.get(sid)
-            if tgt_text is None:
-                continue
-
-            if not _should_keep_pair(src_text, tgt_text, include_long=args.include_long):
-                continue
-
-            key = _normalize_tm_key(src_text)
-            if not key or key in pairs_by_key:
-                continue
-            pairs_by_key[key] = (src_text, tgt_text)
-
-    pairs = sorted(pairs_by_key.values(), key=lambda p: _normalize_tm_key(p[0]))
-    _write_tsv(out_path, pairs)
+        for src_text, tgt_text in pairs:
+            spool.add(src_text, tgt_text)
+        if cache_key:
+            cache.put(*cache_key, pairs)
+
+    if cache is not None:
+        cache.save()
+        print(f"[seed-tm] pair cache: reused={cache.hits} parsed={cache.misses}")
+
+    paths = output_paths(out_path, formats)
+    pairs = spool.sorted_pairs()
+    quality = quality_filter_from_args(args, out_path, korean_target=True)
+    if quality is not None:
+        quality.fit(spool.sorted_pairs(keep=True))
+        pairs = quality.filter(pairs)
+    n = write_tm(paths, pairs, source_lang=source_locale, dest_lang="korean")
+    dropped = f" low_quality_dropped={quality.dropped}" if quality is not None else ""
     print(
         f"[seed-tm] matched_files={matched_files} missing_target_files={missing_target_files} "
-        f"pairs={len(pairs)} out={out_path}"
+        f"pairs={n}{dropped} spilled_runs={spool.spilled_runs} out={','.join(str(p) for p in paths.values())}"
     )
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main(sys.argv[1:]))
-
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+try:
+    from bethesda_interface import read_translation_table
+    from tm_output import DEFAULT_MAX_IN_MEMORY, SortedPairSpool, output_paths, parse_formats, write_tm
+    from tm_quality import add_quality_arguments, quality_filter_from_args
+except ModuleNotFoundError:
+    from scripts.bethesda_interface import read_translation_table
+    from scripts.tm_output import DEFAULT_MAX_IN_MEMORY, SortedPairSpool, output_paths, parse_formats, write_tm
+    from scripts.tm_quality import add_quality_arguments, quality_filter_from_args
+
+HANGUL_RE = re.compile(r"[가-힣]")
+KOREAN_LANGUAGES = ("korean", "ko", "kr")
+
+
+def _should_keep_pair(source: str, target: str, require_hangul: bool) -> bool:
+    if not source or not target:
+        return False
+    if require_hangul and not HANGUL_RE.search(target):
+        return False
+    return source != target
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(
+        description="Build Source->Target translation-memory TSV by joining Interface translate_<language>.txt tables on $TOKEN."
+    )
+    ap.add_argument(
+        "--source",
+        required=True,
+        help="SOURCE language table: translate_<language>.txt, a directory containing it, or an archive (e.g. Skyrim - Interface.bsa).",
+    )
+    ap.add_argument("--target", required=True, help="TARGET language table (file, directory, or archive).")
+    ap.add_argument("--source-language", default="english", help="File name language of the source table (default: english).")
+    ap.add_argument(
+        "--target-language",
+        default="english",
+        help="File name language of the target table (default: english; Korean mods replace translate_english.txt).",
+    )
+    ap.add_argument("--dest-lang", default="korean", help="Language of the target text (Korean requires Hangul; default: korean).")
+    ap.add_argument("--out", required=True, help="Output TSV path; other --formats use the same stem.")
+    ap.add_argument(
+        "--formats",
+        default="tsv",
+        help="Comma-separated TM outputs: tsv, sqlite (the app's TranslationMemory table + FTS5 over SrcText), parquet (needs pyarrow). "
+        "Non-TSV files are written next to the TSV path with their own suffix (default: tsv).",
+    )
+    ap.add_argument(
+        "--max-pairs-in-memory",
+        type=int,
+        default=DEFAULT_MAX_IN_MEMORY,
+        help=f"Unique pairs buffered before spilling a sorted run to a temp file (default: {DEFAULT_MAX_IN_MEMORY}).",
+    )
+    add_quality_arguments(ap)
+    args = ap.parse_args(argv)
+    formats = parse_formats(args.formats)
+
+    source_path = Path(args.source).expanduser()
+    target_path = Path(args.target).expanduser()
+    out_path = Path(args.out).expanduser()
+    for flag, path in (("--source", source_path), ("--target", target_path)):
+        if not path.exists():
+            raise SystemExit(f"missing {flag}: {path}")
+
+    try:
+        source = read_translation_table(source_path, args.source_language)
+        target = read_translation_table(target_path, args.target_language)
+    except FileNotFoundError as ex:
+        raise SystemExit(str(ex)) from ex
+
+    korean = args.dest_lang.strip().lower() in KOREAN_LANGUAGES
+    spool = SortedPairSpool(max_in_memory=args.max_pairs_in_memory)
+    matched = 0
+    for token, src_text in source.items():
+        dst_text = target.get(token)
+        if dst_text is None:
+            continue
+        matched += 1
+        src_text, dst_text = src_text.strip(), dst_text.strip()
+        if _should_keep_pair(src_text, dst_text, require_hangul=korean):
+            spool.add(src_text, dst_text)
+
+    paths = output_paths(out_path, formats)
+    pairs = spool.sorted_pairs()
+    quality = quality_filter_from_args(args, out_path, korean_target=korean)
+    if quality is not None:
+        quality.fit(spool.sorted_pairs(keep=True))
+        pairs = quality.filter(pairs)
+    n = write_tm(paths, pairs, source_lang=args.source_language, dest_lang=args.dest_lang)
+    dropped = f" low_quality_dropped={quality.dropped}" if quality is not None else ""
+    print(
+        f"[seed-tm] source_tokens={len(source)} target_tokens={len(target)} matched_tokens={matched} "
+        f"pairs={n}{dropped} out={','.join(str(p) for p in paths.values())}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
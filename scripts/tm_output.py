@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Translation-memory output shared by the seed scripts.
+
+`SortedPairSpool` takes (source, target) pairs in discovery order and hands them back sorted by the
+normalized TM key with first-wins deduplication, in bounded memory: once `max_in_memory` unique keys
+are buffered, the buffer is sorted and spilled to a temporary run file, and the runs are k-way merged
+at the end. The normalized key is computed once per pair, when it is added.
+
+The sorted stream can be written as any of `TM_FORMATS`:
+- `tsv`: the `Source<TAB>Target` file the app imports (tabs/newlines flattened to spaces).
+- `sqlite`: the app's `TranslationMemory` table (same columns, language keys and unique index as
+  `ProjectDb`), plus an FTS5 index over `SrcText` and a `TmInfo` key/value table. Text is stored
+  verbatim; STRINGS locale suffixes (`en`, `ko`) are stored as the app's language names.
+- `parquet`: `key`/`source`/`target` string columns (requires `pyarrow`). Text is stored verbatim.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Protocol
+
+try:
+    import pyarrow as pa  # optional: --formats parquet
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    from bethesda_strings import STRINGS_LOCALE_LANGUAGES
+except ModuleNotFoundError:
+    from scripts.bethesda_strings import STRINGS_LOCALE_LANGUAGES
+
+DEFAULT_MAX_IN_MEMORY = 250_000
+TM_FORMATS = ("tsv", "sqlite", "parquet")
+TM_SUFFIXES = {"tsv": ".tsv", "sqlite": ".sqlite", "parquet": ".parquet"}
+_BATCH_ROWS = 50_000
+
+
+def normalize_tm_key(text: str) -> str:
+    return (text or "").strip().replace("\r\n", "\n").replace("\r", "\n").lower()
+
+
+def tm_language_key(lang: str) -> str:
+    """The app's `TranslationMemoryKey.NormalizeLanguage`, with STRINGS locale suffixes mapped to language names."""
+    key = (lang or "").strip().lower()
+    return STRINGS_LOCALE_LANGUAGES.get(key, key)
+
+
+class SortedPairSpool:
+    def __init__(self, *, max_in_memory: int = DEFAULT_MAX_IN_MEMORY, tmp_dir: Path | None = None) -> None:
+        self.max_in_memory = max(1, max_in_memory)
+        self.tmp_dir = tmp_dir
+        self.added = 0
+        self.spilled_runs = 0
+        self._seq = 0
+        self._buf: dict[str, tuple[int, str, str]] = {}
+        self._runs: list[Path] = []
+        self._tmp: tempfile.TemporaryDirectory[str] | None = None
+
+    def add(self, source: str, target: str) -> None:
+        key = normalize_tm_key(source)
+        if not key:
+            return
+        self.added += 1
+        self._seq += 1
+        if key in self._buf:
+            return
+        self._buf[key] = (self._seq, source, target)
+        if len(self._buf) >= self.max_in_memory:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="tm-runs-", dir=self.tmp_dir)
+        path = Path(self._tmp.name) / f"run{len(self._runs):05d}.jsonl"
+        with path.open("w", encoding="utf-8", newline="\n") as f:
+            for key in sorted(self._buf):
+                seq, src, dst = self._buf[key]
+                f.write(json.dumps([key, seq, src, dst], ensure_ascii=False))
+                f.write("\n")
+        self._runs.append(path)
+        self.spilled_runs += 1
+        self._buf = {}
+
+    def sorted_pairs(self, *, keep: bool = False) -> Iterator[tuple[str, str, str]]:
+        """(key, source, target) in key order; for duplicate keys the earliest added pair wins.
+
+        The spool is consumed unless `keep` is set, which leaves it readable for another pass.
+        """
+        if not self._runs:
+            buf = self._buf
+            if not keep:
+                self._buf = {}
+            for key in sorted(buf):
+                _seq, src, dst = buf[key]
+                yield key, src, dst
+            return
+
+        if self._buf:
+            self._spill()
+        files = [p.open("r", encoding="utf-8") for p in self._runs]
+        try:
+            # Runs are sorted by key and each key's sequence number is unique, so merging on
+            # (key, seq) puts the first-added pair for every key in front of its duplicates.
+            merged = heapq.merge(*((json.loads(line) for line in f) for f in files))
+            last = None
+            for key, _seq, src, dst in merged:
+                if key == last:
+                    continue
+                last = key
+                yield key, src, dst
+        finally:
+            for f in files:
+                f.close()
+            if not keep:
+                self.cleanup()
+
+    def cleanup(self) -> None:
+        self._runs = []
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+
+class TmWriter(Protocol):
+    def add(self, key: str, source: str, target: str) -> None: ...
+
+    def close(self) -> None: ...
+
+    def abort(self) -> None: ...
+
+
+class TsvTmWriter:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = path.open("w", encoding="utf-8", newline="\n")
+        self._f.write("Source\tTarget\n")
+
+    def add(self, key: str, source: str, target: str) -> None:
+        # Basic TSV escaping: replace tabs/newlines.
+        src = source.replace("\t", " ").replace("\r", " ").replace("\n", " ").strip()
+        dst = target.replace("\t", " ").replace("\r", " ").replace("\n", " ").strip()
+        if not src or not dst:
+            return
+        f = self._f
+        f.write(src)
+        f.write("\t")
+        f.write(dst)
+        f.write("\n")
+
+    def close(self) -> None:
+        self._f.close()
+
+    def abort(self) -> None:
+        self._f.close()
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE TmInfo (
+  Key TEXT PRIMARY KEY,
+  Value TEXT NOT NULL
+);
+
+CREATE TABLE TranslationMemory (
+  Id INTEGER PRIMARY KEY,
+  SourceLangKey TEXT NOT NULL,
+  DestLangKey TEXT NOT NULL,
+  SrcKey TEXT NOT NULL,
+  SrcText TEXT NOT NULL,
+  DstText TEXT NOT NULL,
+  UpdatedAt TEXT NOT NULL
+);
+
+CREATE UNIQUE INDEX UX_TranslationMemory_Key
+  ON TranslationMemory (SourceLangKey, DestLangKey, SrcKey);
+
+CREATE VIRTUAL TABLE TranslationMemoryFts USING fts5(
+  SrcText,
+  content='TranslationMemory',
+  content_rowid='Id'
+);
+"""
+
+
+class SqliteTmWriter:
+    """Builds the database next to `path` and swaps it in on `close()`, so readers never see a partial TM.
+
+    Rows arrive sorted by key, so the unique-key index is appended to in order; the FTS index is built
+    once at the end instead of per insert. The app opens the file like any `ProjectDb` (its schema setup
+    adds the other tables) and reads the rows for the matching language pair. The FTS index only covers
+    the seeded rows; the app does not maintain it.
+    """
+
+    def __init__(self, path: Path, *, source_lang: str = "", dest_lang: str = "") -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._tmp_path.unlink(missing_ok=True)
+        self._conn = sqlite3.connect(self._tmp_path)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        self._source_key = tm_language_key(source_lang)
+        self._dest_key = tm_language_key(dest_lang)
+        self._updated_at = datetime.now(timezone.utc).isoformat()
+        self._info = {
+            "SourceLangKey": self._source_key,
+            "DestLangKey": self._dest_key,
+            "CreatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self._rows: list[tuple[str, str, str, str, str, str]] = []
+        self._count = 0
+
+    def add(self, key: str, source: str, target: str) -> None:
+        # Same skip rule as the app's bulk upsert.
+        if not source.strip() or not target.strip():
+            return
+        self._rows.append((self._source_key, self._dest_key, key, source, target, self._updated_at))
+        if len(self._rows) >= _BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            self._conn.executemany(
+                "INSERT INTO TranslationMemory (SourceLangKey, DestLangKey, SrcKey, SrcText, DstText, UpdatedAt) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                self._rows,
+            )
+            self._count += len(self._rows)
+            self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        conn = self._conn
+        conn.execute("INSERT INTO TranslationMemoryFts(TranslationMemoryFts) VALUES ('rebuild')")
+        self._info["Pairs"] = str(self._count)
+        conn.executemany("INSERT INTO TmInfo (Key, Value) VALUES (?, ?)", sorted(self._info.items()))
+        conn.commit()
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._conn.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class ParquetTmWriter:
+    def __init__(self, path: Path) -> None:
+        if pa is None:
+            raise SystemExit("--formats parquet requires pyarrow (pip install pyarrow)")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._schema = pa.schema([("key", pa.string()), ("source", pa.string()), ("target", pa.string())])
+        self._writer = pq.ParquetWriter(str(path), self._schema, compression="zstd")
+        self._cols: tuple[list[str], list[str], list[str]] = ([], [], [])
+
+    def add(self, key: str, source: str, target: str) -> None:
+        keys, sources, targets = self._cols
+        keys.append(key)
+        sources.append(source)
+        targets.append(target)
+        if len(keys) >= _BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._cols[0]:
+            self._writer.write_batch(pa.record_batch(list(self._cols), schema=self._schema))
+            self._cols = ([], [], [])
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def abort(self) -> None:
+        self._writer.close()
+
+
+def parse_formats(text: str) -> list[str]:
+    formats = [s.strip().lower() for s in (text or "").split(",") if s.strip()]
+    unknown = [f for f in formats if f not in TM_FORMATS]
+    if unknown:
+        raise SystemExit(f"unknown TM format(s): {', '.join(unknown)} (choose from: {', '.join(TM_FORMATS)})")
+    if "parquet" in formats and pa is None:
+        raise SystemExit("--formats parquet requires pyarrow (pip install pyarrow)")
+    return formats or ["tsv"]
+
+
+def output_paths(base: Path, formats: Iterable[str]) -> dict[str, Path]:
+    """Output path per format: `base` itself for the TSV, `base` with the format's suffix otherwise."""
+    return {fmt: base if fmt == "tsv" else base.with_suffix(TM_SUFFIXES[fmt]) for fmt in formats}
+
+
+def write_tm(
+    paths: dict[str, Path],
+    pairs: Iterable[tuple[str, str, str]],
+    *,
+    source_lang: str = "",
+    dest_lang: str = "",
+) -> int:
+    """Stream (key, source, target) rows into every format in `paths` at once; returns the pair count."""
+    writers: list[TmWriter] = []
+    try:
+        for fmt, path in paths.items():
+            if fmt == "tsv":
+                writers.append(TsvTmWriter(path))
+            elif fmt == "sqlite":
+                writers.append(SqliteTmWriter(path, source_lang=source_lang, dest_lang=dest_lang))
+            elif fmt == "parquet":
+                writers.append(ParquetTmWriter(path))
+            else:
+                raise ValueError(f"unknown TM format: {fmt}")
+        n = 0
+        for key, src, dst in pairs:
+            n += 1
+            for w in writers:
+                w.add(key, src, dst)
+    except BaseException:
+        for w in writers:
+            w.abort()
+        raise
+    for w in writers:
+        w.close()
+    return n
+
+
+def write_tsv(path: Path, pairs: Iterable[tuple[str, str, str]]) -> int:
+    """Write (key, source, target) rows as a Source/Target TSV; returns the number of pairs consumed."""
+    return write_tm({"tsv": path}, pairs)
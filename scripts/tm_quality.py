@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Alignment quality scoring for seeded TM pairs.
+
+Each (source, target) pair gets five component scores in [0, 1]. The total is the weighted mean of the
+other four, scaled by `0.5 + 0.5 * placeholders`, so a pair whose placeholders disagree cannot pass a
+typical threshold on fluent-looking text alone:
+- length: log length ratio against the median ratio of the whole TM (robust z-score), so it adapts to
+  the language pair instead of assuming a fixed expansion factor. `QualityFilter.fit` collects the
+  median and spread in one streaming pass (a histogram of log ratios), so a pair's score does not
+  depend on which chunk it is scored in.
+- placeholders: multiset overlap (Dice) of `PLACEHOLDER_RE` tokens (tags, `%d`, `[pagebreak]`,
+  line breaks; case and a leading +/- sign ignored) between source and target.
+- numbers: multiset overlap of digit runs outside placeholders (at least 0.75 when only the target
+  has digits, since spelled-out source numbers are often rendered as digits).
+- hangul: Hangul share of the target's letters (placeholders excluded); Korean targets only.
+- punctuation: overlap of `? ! ( ) :` counts (full-width forms folded in) plus agreement of the
+  sentence-final mark; a dropped final period costs half as much as a `?`/`!` mismatch.
+
+Character-class counts are computed for a whole batch at once over one UTF-32 code-point array
+(numpy), and the regex passes only run for the strings that contain a placeholder or digit at all.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+try:
+    import numpy as np  # optional: required for scoring
+except ImportError:
+    np = None
+
+try:
+    from placeholder_tokens import PLACEHOLDER_RE
+except ModuleNotFoundError:
+    from scripts.placeholder_tokens import PLACEHOLDER_RE
+
+
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+SCORE_COMPONENTS = ("length", "placeholders", "numbers", "hangul", "punctuation")
+DEFAULT_WEIGHTS = {"length": 0.3, "numbers": 0.25, "hangul": 0.3, "punctuation": 0.15}
+DEFAULT_MIN_SCORE = 0.6
+DEFAULT_CHUNK = 200_000
+
+# Log length ratios are binned at this width over [-limit, limit] to get TM-wide statistics.
+_LOG_RATIO_BIN = 0.01
+_LOG_RATIO_LIMIT = 8.0
+_MIN_SPREAD = 0.25
+
+_PUNCT_CHARS = "?!():"
+_FULLWIDTH = {"?": "？", "!": "！", "(": "（", ")": "）", ":": "："}
+_FINAL_CLASS = {"?": "?", "？": "?", "!": "!", "！": "!", ".": ".", "。": ".", "…": "."}
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise SystemExit("TM quality scoring requires numpy (pip install numpy)")
+
+
+@dataclass
+class PairScores:
+    """Per-pair component scores (float arrays aligned with the input pairs) and the weighted total."""
+
+    length: Any
+    placeholders: Any
+    numbers: Any
+    hangul: Any
+    punctuation: Any
+    total: Any
+
+    def component(self, name: str) -> Any:
+        return getattr(self, name)
+
+
+_CLASSES = ("other", "hangul", "latin", "digit", "ph_start", *_PUNCT_CHARS)
+_FINALS = ("", ".", "?", "!")
+_CLASS_LUT = None
+_FINAL_LUT = None
+
+
+def _luts() -> tuple[Any, Any]:
+    """BMP code point -> character class id / sentence-final mark id (built once)."""
+    global _CLASS_LUT, _FINAL_LUT
+    if _CLASS_LUT is None:
+        cls = np.zeros(0x10000, dtype=np.uint8)
+        cls[0xAC00:0xD7A4] = cls[0x3131:0x318F] = _CLASSES.index("hangul")
+        cls[0x41:0x5B] = cls[0x61:0x7B] = _CLASSES.index("latin")
+        cls[0x30:0x3A] = _CLASSES.index("digit")
+        # Characters that can start a placeholder token: '<', '%', '[', CR, LF.
+        for ch in "<%[\r\n":
+            cls[ord(ch)] = _CLASSES.index("ph_start")
+        for ch in _PUNCT_CHARS:
+            cls[ord(ch)] = cls[ord(_FULLWIDTH[ch])] = _CLASSES.index(ch)
+        final = np.zeros(0x10000, dtype=np.uint8)
+        for ch, mark in _FINAL_CLASS.items():
+            final[ord(ch)] = _FINALS.index(mark)
+        _CLASS_LUT, _FINAL_LUT = cls, final
+    return _CLASS_LUT, _FINAL_LUT
+
+
+def _char_counts(texts: list[str]) -> tuple[dict[str, Any], Any, Any]:
+    """Per-text character-class counts, lengths and sentence-final mark ids, from one code-point array."""
+    cls_lut, final_lut = _luts()
+    n = len(texts)
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=n)
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype="<u4")
+    bmp = np.where(codes > 0xFFFF, 0, codes)
+    classes = cls_lut[bmp].astype(np.int64)
+    classes += np.repeat(np.arange(n, dtype=np.int64) * len(_CLASSES), lengths)
+    table = np.bincount(classes, minlength=n * len(_CLASSES)).reshape(n, len(_CLASSES))
+    counts = {name: table[:, i] for i, name in enumerate(_CLASSES)}
+
+    # Sentence-final mark from the last character; texts ending in whitespace fall back to rstrip().
+    ends = np.cumsum(lengths)
+    last = np.zeros(n, dtype=np.int64)
+    nonempty = lengths > 0
+    last[nonempty] = bmp[ends[nonempty] - 1]
+    finals = final_lut[last]
+    for i in np.flatnonzero(nonempty & np.isin(last, (0x20, 0x09, 0x0A, 0x0D, 0x3000))).tolist():
+        finals[i] = _FINALS.index(_final_mark(texts[i]))
+    return counts, lengths, finals
+
+
+def _dice(a: Counter, b: Counter) -> float:
+    total = sum(a.values()) + sum(b.values())
+    if not total:
+        return 1.0
+    return 2.0 * sum((a & b).values()) / total
+
+
+def _tokens(text: str) -> tuple[Counter, Counter, int]:
+    """(placeholder multiset, number multiset outside placeholders, Latin letters inside placeholders)."""
+    placeholders: Counter = Counter()
+    latin_inside = 0
+    if PLACEHOLDER_RE.search(text):
+        for m in PLACEHOLDER_RE.finditer(text):
+            tok = m.group(0)
+            placeholders["\n" if tok in ("\r\n", "\r") else tok.lstrip("+-").lower()] += 1
+            latin_inside += sum(1 for c in tok if c.isascii() and c.isalpha())
+        text = PLACEHOLDER_RE.sub(" ", text)
+    numbers = Counter(n.replace(",", "") for n in NUMBER_RE.findall(text))
+    return placeholders, numbers, latin_inside
+
+
+def _final_mark(text: str) -> str:
+    stripped = text.rstrip()
+    return _FINAL_CLASS.get(stripped[-1], "") if stripped else ""
+
+
+def _log_length_ratio(sources: list[str], targets: list[str]) -> Any:
+    src_len = np.fromiter((len(t) for t in sources), dtype=np.float64, count=len(sources))
+    tgt_len = np.fromiter((len(t) for t in targets), dtype=np.float64, count=len(targets))
+    return np.log((tgt_len + 1.0) / (src_len + 1.0))
+
+
+def _median_spread(log_ratio: Any) -> tuple[float, float]:
+    """Median and robust spread (scaled MAD, at least `_MIN_SPREAD`) of log length ratios."""
+    median = float(np.median(log_ratio))
+    return median, max(1.4826 * float(np.median(np.abs(log_ratio - median))), _MIN_SPREAD)
+
+
+def score_pairs(
+    sources: list[str],
+    targets: list[str],
+    *,
+    korean_target: bool = True,
+    weights: dict[str, float] | None = None,
+    length_stats: tuple[float, float] | None = None,
+) -> PairScores:
+    """Score aligned source/target lists in one batch. Returns float arrays of len(sources).
+
+    `length_stats` is the (median, spread) of the log length ratio to score against; without it the
+    statistics of this batch are used, so pass it whenever the batch is only part of a TM.
+    """
+    require_numpy()
+    n = len(sources)
+    weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+    if not korean_target:
+        weights["hangul"] = 0.0
+    if n == 0:
+        empty = np.zeros(0)
+        return PairScores(empty, empty, empty, empty, empty, empty)
+
+    src_counts, src_len, src_final = _char_counts(sources)
+    tgt_counts, tgt_len, tgt_final = _char_counts(targets)
+
+    # Length: robust z-score of the log ratio against the TM's (or this batch's) median.
+    log_ratio = np.log((tgt_len + 1.0) / (src_len + 1.0))
+    median, spread = _median_spread(log_ratio) if length_stats is None else length_stats
+    excess = np.maximum(np.abs(log_ratio - median) / spread - 1.0, 0.0)
+    length = np.exp(-0.5 * excess * excess)
+
+    # Placeholders / numbers: only strings with a candidate character go through the regexes.
+    placeholders = np.ones(n)
+    numbers = np.ones(n)
+    tgt_latin = tgt_counts["latin"].astype(np.float64)
+    needs_regex = (
+        (src_counts["ph_start"] + tgt_counts["ph_start"] + src_counts["digit"] + tgt_counts["digit"]) > 0
+    )
+    for i in np.flatnonzero(needs_regex).tolist():
+        src_ph, src_num, _ = _tokens(sources[i])
+        tgt_ph, tgt_num, tgt_latin_inside = _tokens(targets[i])
+        placeholders[i] = _dice(src_ph, tgt_ph)
+        numbers[i] = _dice(src_num, tgt_num) if src_num else (0.75 if tgt_num else 1.0)
+        tgt_latin[i] -= tgt_latin_inside
+
+    # Hangul share of the target's letters; 0.5 or more counts as fully Korean.
+    if korean_target:
+        letters = tgt_counts["hangul"] + tgt_latin
+        hangul_ratio = np.divide(tgt_counts["hangul"], letters, out=np.ones(n), where=letters > 0)
+        hangul = np.minimum(hangul_ratio / 0.5, 1.0)
+    else:
+        hangul = np.ones(n)
+
+    # Punctuation: Dice over `? ! ( ) :` counts, averaged with sentence-final mark agreement.
+    src_p = np.stack([src_counts[ch] for ch in _PUNCT_CHARS])
+    tgt_p = np.stack([tgt_counts[ch] for ch in _PUNCT_CHARS])
+    p_total = (src_p + tgt_p).sum(axis=0)
+    p_dice = np.divide(2.0 * np.minimum(src_p, tgt_p).sum(axis=0), p_total, out=np.ones(n), where=p_total > 0)
+    # Same final mark: 1; period vs none: 0.5; anything involving ? or !: 0.
+    final_match = np.where(src_final == tgt_final, 1.0, np.where((src_final <= 1) & (tgt_final <= 1), 0.5, 0.0))
+    punctuation = 0.5 * p_dice + 0.5 * final_match
+
+    parts = {"length": length, "numbers": numbers, "hangul": hangul, "punctuation": punctuation}
+    weight_sum = sum(weights.get(k, 0.0) for k in parts) or 1.0
+    total = sum(parts[k] * weights.get(k, 0.0) for k in parts) / weight_sum
+    total = total * (0.5 + 0.5 * placeholders)
+    return PairScores(total=total, placeholders=placeholders, **parts)
+
+
+class QualityFilter:
+    """Scores a (key, source, target) stream in chunks and passes on pairs with total >= `min_score`.
+
+    Call `fit` with the same pairs first so length is scored against the whole TM; an unfitted filter
+    falls back to fitting on the first chunk. Optionally writes every pair's scores (kept or not) to
+    `report_path` as TSV.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_score: float = DEFAULT_MIN_SCORE,
+        korean_target: bool = True,
+        report_path: Path | None = None,
+        chunk_size: int = DEFAULT_CHUNK,
+    ) -> None:
+        require_numpy()
+        self.min_score = min_score
+        self.korean_target = korean_target
+        self.report_path = report_path
+        self.chunk_size = max(1, chunk_size)
+        self.scored = 0
+        self.dropped = 0
+        self.length_stats: tuple[float, float] | None = None
+
+    def fit(self, pairs: Iterable[tuple[str, str, str]]) -> tuple[float, float]:
+        """One streaming pass: (median, spread) of the log length ratio over all pairs.
+
+        Only a fixed histogram is kept, so memory does not grow with the TM; the median is exact to
+        within half a bin (`_LOG_RATIO_BIN`).
+        """
+        n_bins = int(round(2 * _LOG_RATIO_LIMIT / _LOG_RATIO_BIN))
+        hist = np.zeros(n_bins, dtype=np.int64)
+        chunk: list[tuple[str, str, str]] = []
+
+        def add(rows: list[tuple[str, str, str]]) -> None:
+            log_ratio = _log_length_ratio([r[1] for r in rows], [r[2] for r in rows])
+            idx = np.floor((log_ratio + _LOG_RATIO_LIMIT) / _LOG_RATIO_BIN).astype(np.int64)
+            hist[:] += np.bincount(np.clip(idx, 0, n_bins - 1), minlength=n_bins)
+
+        for row in pairs:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                add(chunk)
+                chunk = []
+        if chunk:
+            add(chunk)
+
+        total = int(hist.sum())
+        if not total:
+            self.length_stats = (0.0, _MIN_SPREAD)
+            return self.length_stats
+        centers = -_LOG_RATIO_LIMIT + (np.arange(n_bins) + 0.5) * _LOG_RATIO_BIN
+        median = float(centers[np.searchsorted(np.cumsum(hist), (total + 1) / 2)])
+        deviation = np.abs(centers - median)
+        order = np.argsort(deviation, kind="stable")
+        mad = float(deviation[order][np.searchsorted(np.cumsum(hist[order]), (total + 1) / 2)])
+        self.length_stats = (median, max(1.4826 * mad, _MIN_SPREAD))
+        return self.length_stats
+
+    def filter(self, pairs: Iterable[tuple[str, str, str]]) -> Iterator[tuple[str, str, str]]:
+        report = None
+        if self.report_path is not None:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            report = self.report_path.open("w", encoding="utf-8", newline="\n")
+            report.write("\t".join(["Source", "Target", "score", *SCORE_COMPONENTS, "kept"]) + "\n")
+        try:
+            chunk: list[tuple[str, str, str]] = []
+            for row in pairs:
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    yield from self._flush(chunk, report)
+                    chunk = []
+            if chunk:
+                yield from self._flush(chunk, report)
+        finally:
+            if report is not None:
+                report.close()
+
+    def _flush(self, chunk: list[tuple[str, str, str]], report: Any) -> Iterator[tuple[str, str, str]]:
+        sources = [r[1] for r in chunk]
+        targets = [r[2] for r in chunk]
+        if self.length_stats is None:
+            self.length_stats = _median_spread(_log_length_ratio(sources, targets))
+        scores = score_pairs(sources, targets, korean_target=self.korean_target, length_stats=self.length_stats)
+        keep = scores.total >= self.min_score
+        self.scored += len(chunk)
+        self.dropped += int((~keep).sum())
+        if report is not None:
+            columns = [scores.total.tolist(), *(scores.component(k).tolist() for k in SCORE_COMPONENTS)]
+            for i, (_key, src, dst) in enumerate(chunk):
+                flat_src = src.replace("\t", " ").replace("\r", " ").replace("\n", " ")
+                flat_dst = dst.replace("\t", " ").replace("\r", " ").replace("\n", " ")
+                values = "\t".join(f"{col[i]:.3f}" for col in columns)
+                report.write(f"{flat_src}\t{flat_dst}\t{values}\t{int(keep[i])}\n")
+        for row, k in zip(chunk, keep.tolist()):
+            if k:
+                yield row
+
+
+def add_quality_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument(
+        "--min-quality",
+        type=float,
+        help=f"Score pairs for alignment quality and drop those below this total (0-1, e.g. {DEFAULT_MIN_SCORE}). "
+        "Requires numpy. Off by default.",
+    )
+    ap.add_argument(
+        "--quality-report",
+        action="store_true",
+        help="With --min-quality, also write every pair's scores to <tm>.quality.tsv next to each TM.",
+    )
+
+
+def quality_filter_from_args(args: argparse.Namespace, tm_path: Path, *, korean_target: bool) -> QualityFilter | None:
+    if args.min_quality is None:
+        if args.quality_report:
+            raise SystemExit("--quality-report requires --min-quality")
+        return None
+    report_path = tm_path.with_suffix(".quality.tsv") if args.quality_report else None
+    return QualityFilter(min_score=args.min_quality, korean_target=korean_target, report_path=report_path)
+
+
+def _read_tsv_pairs(path: Path) -> list[tuple[str, str, str]]:
+    rows: list[tuple[str, str, str]] = []
+    with path.open("r", encoding="utf-8-sig") as f:
+        for i, line in enumerate(f):
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 2:
+                continue
+            if i == 0 and parts[0].lower() == "source" and parts[1].lower() == "target":
+                continue
+            rows.append(("", parts[0], parts[1]))
+    return rows
+
+
+def main(argv: list[str]) -> int:
+    try:
+        from tm_output import write_tsv
+    except ModuleNotFoundError:
+        from scripts.tm_output import write_tsv
+
+    ap = argparse.ArgumentParser(description="Score Source/Target TM TSV pairs for alignment quality and filter them.")
+    ap.add_argument("tsv", help="Input Source<TAB>Target TSV.")
+    ap.add_argument("--min-score", type=float, default=DEFAULT_MIN_SCORE, help=f"Keep pairs scoring at least this (default: {DEFAULT_MIN_SCORE}).")
+    ap.add_argument("--out", help="Write the kept pairs to this TSV.")
+    ap.add_argument("--scores-out", help="Write every pair's scores to this TSV.")
+    ap.add_argument("--not-korean", action="store_true", help="Target is not Korean (disables the Hangul component).")
+    args = ap.parse_args(argv)
+
+    rows = _read_tsv_pairs(Path(args.tsv).expanduser())
+    qf = QualityFilter(
+        min_score=args.min_score,
+        korean_target=not args.not_korean,
+        report_path=Path(args.scores_out).expanduser() if args.scores_out else None,
+    )
+    t0 = time.perf_counter()
+    qf.fit(rows)
+    kept = list(qf.filter(rows))
+    elapsed = time.perf_counter() - t0
+    if args.out:
+        write_tsv(Path(args.out).expanduser(), kept)
+    print(f"[tm-quality] scored={qf.scored} kept={len(kept)} dropped={qf.dropped} {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
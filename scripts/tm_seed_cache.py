@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Incremental cache for the seed-TM scripts.
+
+A seed run is a list of jobs (one STRINGS file joined against another). For each job the cache keeps the
+filtered (source, target) pairs it produced, addressed by the job key plus the fingerprints of its
+inputs. A manifest records each input's (size, mtime_ns, sha1): when size and mtime are unchanged the
+stored hash is trusted without reading the file, otherwise the content is re-hashed, so a touched but
+identical file still hits. Re-runs after a game patch therefore only re-parse the files that changed;
+everything else is replayed from the cache and re-merged in the original job order.
+
+Archive entries are fingerprinted by their stored (still compressed) record, not by the whole archive.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+try:
+    from bethesda_archive import Archive, ArchiveEntry
+except ModuleNotFoundError:
+    from scripts.bethesda_archive import Archive, ArchiveEntry
+
+SEED_CACHE_FORMAT = 1
+
+Pairs = list[tuple[str, str]]
+
+
+def default_seed_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or str(Path.home() / ".cache")
+    return Path(base) / "xtranslator-ai" / "seed-tm"
+
+
+def _sha1_file(path: Path) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class SeedCache:
+    """Per-job pair cache under `cache_dir`; `namespace` separates the scripts' manifests."""
+
+    def __init__(self, cache_dir: Path, namespace: str) -> None:
+        self.cache_dir = cache_dir
+        self.pairs_dir = cache_dir / "pairs"
+        self.manifest_path = cache_dir / f"{namespace}.manifest.json"
+        self.hits = 0
+        self.misses = 0
+        self._inputs: dict[str, list] = {}
+        self._jobs: dict[str, str] = {}
+        self._dirty = False
+        try:
+            payload = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            payload = {}
+        if payload.get("format") == SEED_CACHE_FORMAT:
+            self._inputs = payload.get("inputs", {})
+            self._jobs = payload.get("jobs", {})
+
+    def _fingerprint(self, ident: str, st: os.stat_result, extra: str, compute) -> str:
+        known = self._inputs.get(ident)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns and known[2] == extra:
+            return known[3]
+        digest = compute()
+        self._inputs[ident] = [st.st_size, st.st_mtime_ns, extra, digest]
+        self._dirty = True
+        return digest
+
+    def file_fingerprint(self, path: Path) -> str:
+        path = path.resolve()
+        return self._fingerprint(str(path), path.stat(), "", lambda: _sha1_file(path))
+
+    def entry_fingerprint(self, archive: Archive, entry: ArchiveEntry) -> str:
+        st = archive.path.stat()
+        extra = f"{entry.offset}:{entry.size}"
+        return self._fingerprint(
+            f"{archive.path}::{entry.name}", st, extra, lambda: hashlib.sha1(archive.read_stored(entry)).hexdigest()
+        )
+
+    def _pairs_file(self, job_key: str, digests: list[str]) -> str:
+        return hashlib.sha1("\0".join([job_key, *digests]).encode("utf-8")).hexdigest() + ".json"
+
+    def has(self, job_key: str, digests: list[str]) -> bool:
+        """Whether pairs are stored for this job and these inputs; cheap, the pairs are not loaded."""
+        name = self._pairs_file(job_key, digests)
+        return self._jobs.get(job_key) == name and (self.pairs_dir / name).is_file()
+
+    def get(self, job_key: str, digests: list[str]) -> tuple[bool, Pairs] | None:
+        """(matched, pairs) stored for this job and these inputs, or None on a miss."""
+        name = self._pairs_file(job_key, digests)
+        if self._jobs.get(job_key) != name:
+            self.misses += 1
+            return None
+        try:
+            payload = json.loads((self.pairs_dir / name).read_text(encoding="utf-8"))
+            matched = bool(payload["matched"])
+            pairs = [(src, dst) for src, dst in payload["pairs"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return matched, pairs
+
+    def put(self, job_key: str, digests: list[str], pairs: Pairs, *, matched: bool = True) -> None:
+        """Store a job's pairs; `matched=False` records that the job's tables had nothing to join."""
+        name = self._pairs_file(job_key, digests)
+        old = self._jobs.get(job_key)
+        try:
+            self.pairs_dir.mkdir(parents=True, exist_ok=True)
+            (self.pairs_dir / name).write_text(
+                json.dumps({"matched": matched, "pairs": pairs}, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+            )
+        except OSError as ex:
+            print(f"[seed-tm] pair cache not written ({name}): {ex}", file=sys.stderr)
+            return
+        if old and old != name:
+            (self.pairs_dir / old).unlink(missing_ok=True)
+        self._jobs[job_key] = name
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        payload = {"format": SEED_CACHE_FORMAT, "inputs": self._inputs, "jobs": self._jobs}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.manifest_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(self.manifest_path)
+        except OSError as ex:
+            # Best-effort: an unwritable cache only costs the next run a full re-parse.
+            print(f"[seed-tm] pair cache manifest not written ({self.manifest_path}): {ex}", file=sys.stderr)
+        self._dirty = False
@@ -238,8 +238,14 @@ def main(argv: list[str]) -> int:
     )
 
     p_qa = sub.add_parser("qa", help="Placeholder QA for xTranslator XML.")
-    p_qa.add_argument("xml_path")
+    p_qa.add_argument("xml_paths", nargs="+", help="XML file(s) or directories.")
     p_qa.add_argument("--limit", type=int, default=80)
+    p_qa.add_argument("--jobs", type=int, default=0, help="Worker processes (0=cpu count).")
+
+    p_lqa = sub.add_parser("lqa", help="LQA rule scan for xTranslator XML (mirrors the app's LQA tab).")
+    p_lqa.add_argument("xml_paths", nargs="+", help="XML file(s) or directories.")
+    p_lqa.add_argument("--glossary", action="append", default=[], help="Glossary file (TSV or JSON-style); repeatable.")
+    p_lqa.add_argument("--limit", type=int, default=80)
 
     p_pack = sub.add_parser("pack", help="Generate a compact context pack for LLMs.")
     p_pack.add_argument("--scope", choices=["staged", "changed", "path", "recent"], default="staged")
@@ -364,7 +370,11 @@ def main(argv: list[str]) -> int:
         return _run(brain / "check_boundaries.py", bound_args)
 
     if args.cmd == "qa":
-        return _run(brain / "qa_placeholders.py", [args.xml_path, f"--limit={args.limit}"])
+        return _run(brain / "qa_placeholders.py", [*args.xml_paths, f"--limit={args.limit}", f"--jobs={args.jobs}"])
+
+    if args.cmd == "lqa":
+        glossary_args = [f"--glossary={g}" for g in args.glossary]
+        return _run(brain / "lqa_scan.py", [*args.xml_paths, *glossary_args, f"--limit={args.limit}"])
 
     if args.cmd == "precommit":
         pre_args: list[str] = []
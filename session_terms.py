@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+In-run term memory, the CLI counterpart of the app's `TranslationService.SessionTermMemory`.
+
+Translations are learned from completed pairs and fed back into later prompts, so a proper noun is
+spelled the same way across batches:
+
+- Only name records (`*:FULL`, `*:NAME`, `*:NAM*`, `*:TITLE`, the app's `IsSessionTermRec`) are learned
+  from; other records only count as counter-evidence. Inputs without record types rely on the text alone.
+- Definition-like sources (short names such as `Iron Sword` or `Sovngarde`) map to their whole translation.
+- Capitalized n-grams inside longer sources are aligned once the pairs containing the term agree on exactly
+  one target span (whole words, trailing Korean particles allowed to differ) that does not also show up in
+  recent targets whose sources lack the term.
+
+Lookups use a word-level trie, so finding the known terms in a batch costs one walk per word. Learned
+terms are appended to a JSONL file next to the translation cache and reloaded on the next run. Within a
+run the first mapping for a term wins, as in the app, and learning never replaces a loaded term. To fix a
+term, append `{"src": "Whiterun", "dst": "화이트런"}` to the file (a later line overrides an earlier one);
+`"dst": ""` forgets it. Deleting the file (or `--reset-term-memory`) starts over.
+"""
+from __future__ import annotations
+
+import json
+import re
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Iterable
+
+DEFAULT_MAX_NEW_TERMS = 200  # learned per run; terms loaded from the file are not counted
+MAX_TERMS_PER_PROMPT = 60
+MAX_PENDING_CANDIDATES = 5000
+
+# Runs of capitalized words, glued only by name-internal connectors ("Hall of the Dead", "Bleak Falls Barrow").
+# Unlike the app's EnglishPhraseRegex, and/to/in/... end a run, so "Farengar in Dragonsreach" yields two terms.
+_CAPITAL_RUN_RE = re.compile(
+    r"\b[A-Z][A-Za-z0-9'’\-]*(?:\s+(?:(?:of|the|de|la|le|du|van|von)\s+)*[A-Z][A-Za-z0-9'’\-]*)*"
+)
+_WORD_RE = re.compile(r"[A-Za-z0-9'’\-]+")
+_ARTICLE_RE = re.compile(r"^(?:the|an|a)\s+", re.IGNORECASE)
+_TRAILING_CONNECTOR_RE = re.compile(r"(?:\s+(?:of|the|and|or|to|a|an|in|on|for|with|from|at|by|de|la|le|du|van|von))+$")
+_CONNECTORS = frozenset(("of", "the", "de", "la", "le", "du", "van", "von"))
+_DEFINITION_CHAR_RE = re.compile(r"^[\w '’\-]+$")
+_MARKER_RE = re.compile(r"__XT_|\{[MDN]?\d+\}")
+_TOKEN_PUNCT = "\"'“”‘’()[]«».,!?:;…"
+
+# Particles that may follow a noun in Korean text; stripped when comparing target spans.
+_KOREAN_PARTICLES = sorted(
+    ["의", "을", "를", "이", "가", "은", "는", "과", "와", "으로", "로", "에", "에게", "에서", "에는", "도", "만", "과의", "와의", "이라는", "라는"],
+    key=len,
+    reverse=True,
+)
+
+# Sentence-initial verbs/adverbs that look like title words but are never terms.
+_STOP_WORDS = frozenset(
+    "the this that these those there then when while your you its his her their our increases decreases "
+    "reduces restores absorbs deals does causes targets nearby lasts can cannot will for and but with from".split()
+)
+
+
+def normalize_term(term: str) -> str:
+    """Case-insensitive key: trimmed, without a leading article or trailing connector words."""
+    s = _ARTICLE_RE.sub("", " ".join(term.split()))
+    return _TRAILING_CONNECTOR_RE.sub("", s).lower()
+
+
+def terms_path_for_cache(cache_path: Path) -> Path:
+    name = cache_path.name
+    if name.endswith(".gemini_cache.jsonl"):
+        return cache_path.with_name(name[: -len(".gemini_cache.jsonl")] + ".gemini_terms.jsonl")
+    return cache_path.with_name(name + ".terms.jsonl")
+
+
+def is_session_term_rec(rec: str | None) -> bool:
+    """Name-like record types (`WEAP:FULL`, `NPC_:NAME`, `*:NAM*`, `*:TITLE`), matching the app's `IsSessionTermRec`."""
+    rec = (rec or "").upper()
+    return any(part in rec for part in (":FULL", ":NAME", ":NAM", ":TITLE"))
+
+
+def is_definition_text(source: str) -> bool:
+    """Short name-like source (no sentence punctuation or markup) whose whole translation is the term."""
+    s = source.strip()
+    if not 3 <= len(s) <= 60 or "\n" in s or "\r" in s or not _DEFINITION_CHAR_RE.match(s):
+        return False
+    words = s.split()
+    if len(words) == 1:
+        return s[0].isupper() and s[0].isascii() and any(c.islower() for c in s) and s.lower() not in _STOP_WORDS
+    return sum(1 for w in words if w[0].isupper()) >= max(2, len(words) // 2 + 1)
+
+
+def is_term_translation(target: str) -> bool:
+    t = target.strip()
+    return 1 <= len(t) <= 80 and "\n" not in t and "\r" not in t and not _MARKER_RE.search(t)
+
+
+def _strip_particle(token: str) -> str:
+    for particle in _KOREAN_PARTICLES:
+        if token.endswith(particle) and len(token) - len(particle) >= 2:
+            return token[: -len(particle)]
+    return token
+
+
+def _target_tokens(text: str) -> list[str]:
+    return [t for t in (w.strip(_TOKEN_PUNCT) for w in text.split()) if t]
+
+
+class TermTrie:
+    """Word-level trie over lowercased terms; `find` returns the longest term starting at each word."""
+
+    _END = ""
+
+    def __init__(self) -> None:
+        self._root: dict[str, dict] = {}
+
+    def add(self, key: str) -> None:
+        node = self._root
+        for word in key.split():
+            node = node.setdefault(word, {})
+        node[self._END] = {}
+
+    def find(self, text: str) -> set[str]:
+        words = [w.lower() for w in _WORD_RE.findall(text)]
+        found: set[str] = set()
+        for start in range(len(words)):
+            node = self._root
+            longest = None
+            for end in range(start, len(words)):
+                node = node.get(words[end])  # type: ignore[assignment]
+                if node is None:
+                    break
+                if self._END in node:
+                    longest = end
+            if longest is not None:
+                found.add(" ".join(words[start : longest + 1]))
+        return found
+
+
+class SessionTermMemory:
+    def __init__(self, path: Path | None = None, *, max_new_terms: int = DEFAULT_MAX_NEW_TERMS) -> None:
+        self.path = path
+        self.max_new_terms = max_new_terms
+        self.terms: dict[str, tuple[str, str]] = {}  # key -> (source as first seen, target)
+        self.loaded = 0
+        self._trie = TermTrie()
+        self._evidence: dict[str, list[str]] = {}
+        self._recent: deque[tuple[str, str]] = deque(maxlen=64)
+
+    @classmethod
+    def load(
+        cls, path: Path, *, max_new_terms: int = DEFAULT_MAX_NEW_TERMS, persist: bool = True, reset: bool = False
+    ) -> "SessionTermMemory":
+        """
+        Terms saved by earlier runs, later lines overriding earlier ones (an empty `dst` forgets the term).
+
+        With `persist=False` (dry runs) new terms are kept in memory only; `reset=True` discards the file first.
+        """
+        memory = cls(path if persist else None, max_new_terms=max_new_terms)
+        if reset and persist:
+            path.unlink(missing_ok=True)
+        saved: dict[str, tuple[str, str]] = {}
+        if path.exists() and not reset:
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        obj = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if not isinstance(obj, dict) or not isinstance(obj.get("src"), str):
+                        continue
+                    key = normalize_term(obj["src"])
+                    dst = obj.get("dst")
+                    if isinstance(dst, str) and dst.strip():
+                        saved.pop(key, None)  # re-insert so the latest mapping also decides the order
+                        saved[key] = (obj["src"], dst)
+                    elif dst is None or isinstance(dst, str):
+                        saved.pop(key, None)
+        for source, target in saved.values():
+            memory._add(source, target, persist=False)
+        memory.loaded = len(memory.terms)
+        return memory
+
+    @property
+    def learned(self) -> int:
+        return len(self.terms) - self.loaded
+
+    def _add(self, source: str, target: str, *, persist: bool = True) -> bool:
+        key = normalize_term(source)
+        if len(key) < 3 or key in self.terms or (persist and self.learned >= self.max_new_terms):
+            return False
+        self.terms[key] = (source.strip(), target.strip())
+        self._trie.add(key)
+        self._evidence.pop(key, None)
+        if persist and self.path is not None:
+            try:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps({"src": source.strip(), "dst": target.strip()}, ensure_ascii=False) + "\n")
+            except OSError as ex:
+                # Best-effort: the term still applies to this run.
+                print(f"[terms] not written ({self.path}): {ex}", file=sys.stderr)
+        return True
+
+    def learn(self, source: str, target: str, rec: str | None = None) -> int:
+        """
+        Learn from one completed pair; returns how many new terms it produced.
+
+        `rec` is the record type (`WEAP:FULL`); only name records are learned from, as in the app. Other
+        records only serve as counter-evidence for `_align`. `None` means the input has no record types (raw
+        strings, STRINGS files) and the text alone decides.
+        """
+        if self.learned >= self.max_new_terms or not source.strip() or not target.strip():
+            return 0
+        if rec is not None and not is_session_term_rec(rec):
+            self._recent.append((source.lower(), target))
+            return 0
+        if is_definition_text(source):
+            return int(is_term_translation(target) and self._add(source, target))
+
+        learned = 0
+        source_lower = source.lower()
+        for candidate in self._candidates(source):
+            key = normalize_term(candidate)
+            if key in self.terms or (key not in self._evidence and len(self._evidence) >= MAX_PENDING_CANDIDATES):
+                continue
+            evidence = self._evidence.setdefault(key, [])
+            if target in evidence:
+                continue
+            evidence.append(target)
+            if len(evidence) >= 2:
+                span = self._align(key, evidence)
+                if span is not None and self._add(candidate, span):
+                    learned += 1
+                elif len(evidence) >= 4:
+                    evidence.pop(0)
+        self._recent.append((source_lower, target))
+        return learned
+
+    @staticmethod
+    def _candidates(source: str) -> list[str]:
+        out: dict[str, str] = {}
+        for match in _CAPITAL_RUN_RE.finditer(source):
+            words = match.group(0).split()
+            before = source[: match.start()].rstrip()
+            variants = [words]
+            if not before or before[-1] in ".!?:\n":
+                # The first word may only be capitalized because it starts the sentence.
+                variants = [words, words[1:]] if len(words) > 1 else []
+            for variant in variants:
+                while variant and variant[0] in _CONNECTORS:
+                    variant = variant[1:]
+                term = " ".join(variant)
+                key = normalize_term(term)
+                if 3 <= len(key) <= 60 and key not in _STOP_WORDS:
+                    out.setdefault(key, term)
+        return list(out.values())
+
+    def _align(self, key: str, evidence: list[str]) -> str | None:
+        """
+        The whole-word span of the first target that every other target shares and unrelated ones lack.
+
+        Shared phrasing (`수 있습니다` in two sentences about Whiterun) is as common as the name itself, so
+        when more than one unrelated span survives the answer is ambiguous and nothing is learned until a
+        further pair, or an unrelated target containing the phrase, rules the others out.
+        """
+        tokens = _target_tokens(evidence[0])
+        spans: list[str] = []
+        for n in range(min(4, len(tokens)), 0, -1):
+            for start in range(len(tokens) - n + 1):
+                words = tokens[start : start + n]
+                # Prefer the span without a trailing particle; keep the particle only if the bare form is not shared.
+                for span in (" ".join(words[:-1] + [_strip_particle(words[-1])]), " ".join(words)):
+                    if len(span) < 2 or not any(c.isalpha() for c in span) or _MARKER_RE.search(span):
+                        continue
+                    if all(span in other for other in evidence[1:]) and not self._seen_elsewhere(key, span):
+                        # Longer spans come first; a span inside one already kept is the same candidate.
+                        if not any(span in kept for kept in spans):
+                            spans.append(span)
+                        break
+        return spans[0] if len(spans) == 1 else None
+
+    def _seen_elsewhere(self, key: str, span: str) -> bool:
+        return any(span in target for source_lower, target in self._recent if key not in source_lower)
+
+    def pairs_for(self, texts: Iterable[str]) -> list[tuple[str, str]]:
+        """Known (source, target) terms that occur in `texts`, longest first, at most MAX_TERMS_PER_PROMPT."""
+        if not self.terms:
+            return []
+        found: set[str] = set()
+        for text in texts:
+            found |= self._trie.find(text)
+        keys = sorted(found, key=lambda k: (-len(k), k))[:MAX_TERMS_PER_PROMPT]
+        return [self.terms[k] for k in keys]
+
+    def report_line(self) -> str:
+        return f"[terms] known={len(self.terms)} (learned this run: {self.learned})"
@@ -0,0 +1,70 @@
+"""Synthetic BSA/BA2 archives for the reader tests (the real game archives are not redistributable)."""
+import struct
+import zlib
+
+import lz4.frame
+
+
+def build_bsa(files, *, version=104, compress=True, embed_names=False, invert=()):
+    """`files`: {"folder/name.ext": bytes}; `invert` lists paths stored opposite to the archive default."""
+    folders = {}
+    for path, data in files.items():
+        folder, _sep, name = path.rpartition("/")
+        folders.setdefault(folder.replace("/", "\\"), []).append((path, name, data))
+
+    folder_fmt = "<QIIQ" if version == 105 else "<QII"
+    names_block = b"".join(name.encode() + b"\0" for entries in folders.values() for _p, name, _d in entries)
+    folder_blocks_size = sum(1 + len(folder) + 1 + 16 * len(entries) for folder, entries in folders.items())
+    data_off = 36 + struct.calcsize(folder_fmt) * len(folders) + folder_blocks_size + len(names_block)
+
+    records = {}
+    data = bytearray()
+    for entries in folders.values():
+        for path, _name, payload in entries:
+            compressed = compress != (path in invert)
+            record = bytearray()
+            if embed_names:
+                full = path.replace("/", "\\").encode()
+                record += bytes([len(full)]) + full
+            if compressed:
+                packed = lz4.frame.compress(payload) if version == 105 else zlib.compress(payload)
+                record += struct.pack("<I", len(payload)) + packed
+            else:
+                record += payload
+            size = len(record) | (0x40000000 if path in invert else 0)
+            records[path] = (size, data_off + len(data))
+            data += record
+
+    out = bytearray(b"BSA\0")
+    flags = 0x1 | 0x2 | (0x4 if compress else 0) | (0x100 if embed_names else 0)
+    total_folder_name_len = sum(len(folder) + 1 for folder in folders)
+    out += struct.pack(
+        "<IIIIIIIHH", version, 36, flags, len(folders), len(files), total_folder_name_len, len(names_block), 0, 0
+    )
+    for i, entries in enumerate(folders.values()):
+        out += struct.pack(folder_fmt, i, len(entries), 0, 0) if version == 105 else struct.pack(folder_fmt, i, len(entries), 0)
+    for folder, entries in folders.items():
+        out += bytes([len(folder) + 1]) + folder.encode() + b"\0"
+        for j, (path, _name, _payload) in enumerate(entries):
+            size, offset = records[path]
+            out += struct.pack("<QII", j, size, offset)
+    out += names_block
+    assert len(out) == data_off
+    return bytes(out + data)
+
+
+def build_ba2(files, *, version=1, compress=True):
+    """Fallout 4 GNRL archive with zlib-packed (or stored) entries."""
+    names = list(files)
+    data_off = 24 + 36 * len(names)
+    records = bytearray()
+    data = bytearray()
+    for i, name in enumerate(names):
+        payload = files[name]
+        stored = zlib.compress(payload) if compress else payload
+        offset = data_off + len(data)
+        records += struct.pack("<I4sIIQIII", i, b"strs", 0, 0, offset, len(stored) if compress else 0, len(payload), 0xBAADF00D)
+        data += stored
+    name_table = b"".join(struct.pack("<H", len(n)) + n.replace("/", "\\").encode() for n in names)
+    header = b"BTDX" + struct.pack("<I", version) + b"GNRL" + struct.pack("<IQ", len(names), data_off + len(data))
+    return header + bytes(records) + bytes(data) + name_table
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The CLI modules live at the repository root (and import `scripts.*` from there).
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+from archive_builders import build_ba2, build_bsa
+
+from scripts import bethesda_archive
+from scripts.bethesda_archive import ArchiveFormatError, open_archive
+
+FILES = {
+    "strings/skyrim_english.strings": b"\x02\x00\x00\x00" + bytes(range(256)) * 8,
+    "strings/skyrim_english.dlstrings": "Iron Sword\0철검\0".encode() * 50,
+    "interface/translations/translate_english.txt": b"\xff\xfe" + "$Sword\tSword\r\n".encode("utf-16-le"),
+}
+
+
+# Embedded file names (archive flag 0x100) exist from v104 on.
+@pytest.mark.parametrize("version,embed_names", [(103, False), (104, False), (104, True), (105, False), (105, True)])
+def test_compressed_bsa_round_trip(tmp_path, version, embed_names):
+    path = tmp_path / "test.bsa"
+    # One entry stored opposite to the archive default (the per-file compression toggle bit).
+    invert = ("strings/skyrim_english.dlstrings",)
+    path.write_bytes(build_bsa(FILES, version=version, compress=True, embed_names=embed_names, invert=invert))
+    with open_archive(path, cache_dir=tmp_path / "idx") as archive:
+        assert (archive.kind, archive.version) == ("BSA", version)
+        assert sorted(archive.entries) == sorted(FILES)
+        assert {name: archive.read(name) for name in FILES} == FILES
+        codecs = {e.name: e.codec for e in archive.iter_entries()}
+        assert codecs["strings/skyrim_english.dlstrings"] == "none"
+        assert codecs["strings/skyrim_english.strings"] == ("lz4" if version == 105 else "zlib")
+        entries = list(archive.iter_entries(prefix="strings/"))
+        assert [(e.name, data) for e, data in archive.read_many(entries, jobs=2)] == [(e.name, FILES[e.name]) for e in entries]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_ba2_round_trip(tmp_path, compress):
+    path = tmp_path / "test.ba2"
+    path.write_bytes(build_ba2(FILES, compress=compress))
+    with open_archive(path, use_cache=False) as archive:
+        assert archive.kind == "BA2"
+        assert {name: archive.read(name) for name in FILES} == FILES
+        assert archive.read("Strings\\Skyrim_English.STRINGS") == FILES["strings/skyrim_english.strings"]
+
+
+def test_index_cache_is_reused_until_the_archive_changes(tmp_path, monkeypatch):
+    path = tmp_path / "test.bsa"
+    path.write_bytes(build_bsa(FILES, version=105))
+    with open_archive(path, cache_dir=tmp_path / "idx") as first:
+        assert not first.from_cache
+    monkeypatch.setattr(bethesda_archive, "_parse_bsa", lambda *a: pytest.fail("re-parsed a cached index"))
+    with open_archive(path, cache_dir=tmp_path / "idx") as cached:
+        assert cached.from_cache
+        assert cached.read("strings/skyrim_english.strings") == FILES["strings/skyrim_english.strings"]
+    monkeypatch.undo()
+
+    files = dict(FILES, **{"strings/update_english.strings": b"new"})
+    path.write_bytes(build_bsa(files, version=105))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    with open_archive(path, cache_dir=tmp_path / "idx") as changed:
+        assert not changed.from_cache and changed.read("strings/update_english.strings") == b"new"
+
+
+def test_corrupt_entries_are_reported(tmp_path):
+    path = tmp_path / "test.bsa"
+    data = bytearray(build_bsa(FILES, version=104))
+    data[-20:] = b"\0" * 20  # damage the tail of the last zlib stream
+    path.write_bytes(bytes(data))
+    with open_archive(path, use_cache=False) as archive:
+        results = dict((e.name, r) for e, r in archive.read_many(list(archive.iter_entries())))
+    assert isinstance(results["interface/translations/translate_english.txt"], Exception)
+    (tmp_path / "x.bsa").write_bytes(b"nope" * 10)
+    with pytest.raises(ArchiveFormatError, match="not a BSA/BA2"):
+        open_archive(tmp_path / "x.bsa", use_cache=False)
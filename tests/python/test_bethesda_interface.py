@@ -0,0 +1,47 @@
+import pytest
+from archive_builders import build_ba2, build_bsa
+
+from scripts.bethesda_interface import parse_translation_bytes, read_translation_table
+
+LINES = ["$Iron Sword\tIron Sword", "$QUEST_Tip\tPress <b>E</b>\tto use", "$Empty\t", "$Iron Sword\tDuplicate", "not a token"]
+TEXT = "\r\n".join(LINES) + "\r\n"
+EXPECTED = {"$Iron Sword": "Iron Sword", "$QUEST_Tip": "Press <b>E</b>\tto use", "$Empty": ""}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"\xff\xfe" + TEXT.encode("utf-16-le"),
+        TEXT.encode("utf-16-le"),
+        b"\xfe\xff" + TEXT.encode("utf-16-be"),
+        b"\xef\xbb\xbf" + TEXT.encode("utf-8"),
+        TEXT.replace("\r\n", "\n").encode("utf-8"),
+    ],
+    ids=["utf16le-bom", "utf16le-no-bom", "utf16be-bom", "utf8-bom", "utf8-lf"],
+)
+def test_tokens_parse_in_every_encoding_and_the_first_duplicate_wins(data):
+    table = parse_translation_bytes(data)
+    assert table == EXPECTED
+    assert list(table) == ["$Iron Sword", "$QUEST_Tip", "$Empty"]
+
+
+def test_korean_text_without_bom():
+    assert parse_translation_bytes("$Sword\t검\r\n".encode("utf-16-le")) == {"$Sword": "검"}
+
+
+def test_reads_from_a_directory_and_from_archives(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    data = b"\xff\xfe" + TEXT.encode("utf-16-le")
+    nested = tmp_path / "Data" / "Interface" / "Translations"
+    nested.mkdir(parents=True)
+    (nested / "Translate_English.txt").write_bytes(data)
+    assert read_translation_table(tmp_path / "Data") == EXPECTED
+
+    bsa = tmp_path / "Skyrim - Interface.bsa"
+    bsa.write_bytes(build_bsa({"interface/translations/translate_english.txt": data}, version=105))
+    assert read_translation_table(bsa) == EXPECTED
+    ba2 = tmp_path / "Fallout4 - Interface.ba2"
+    ba2.write_bytes(build_ba2({"interface/translate_korean.txt": data}))
+    assert read_translation_table(ba2, "korean") == EXPECTED
+    with pytest.raises(FileNotFoundError):
+        read_translation_table(ba2, "english")
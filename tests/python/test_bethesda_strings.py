@@ -0,0 +1,92 @@
+import struct
+
+import pytest
+
+from scripts import bethesda_strings
+from scripts.bethesda_strings import (
+    build_strings_bytes,
+    iter_strings_files,
+    open_strings_dir,
+    open_strings_file,
+    parse_strings_bytes,
+    rebuild_strings,
+)
+
+
+def _raw_table(name, directory, blobs):
+    """A table laid out by hand: `directory` is (id, offset) pairs into the concatenated `blobs`."""
+    sized = name.lower().endswith((".dlstrings", ".ilstrings"))
+    data = b"".join((struct.pack("<I", len(b) + 1) if sized else b"") + b + b"\0" for b in blobs)
+    head = struct.pack("<II", len(directory), len(data)) + b"".join(struct.pack("<II", sid, off) for sid, off in directory)
+    return head + data
+
+
+def _official_layout(name):
+    # Ids 1 and 3 share one copy; id 4 repeats the text of id 1 in a separate copy, as some official files do.
+    prefix = 4 if name.lower().endswith((".dlstrings", ".ilstrings")) else 0
+    a, b = "Iron Sword".encode(), "Stählerner Bogen".encode()
+    off_b = prefix + len(a) + 1
+    off_a2 = off_b + prefix + len(b) + 1
+    return _raw_table(name, [(3, 0), (1, 0), (2, off_b), (4, off_a2)], [a, b, a])
+
+
+@pytest.mark.parametrize("name", ["skyrim_en.STRINGS", "skyrim_en.DLSTRINGS", "skyrim_en.ILSTRINGS"])
+def test_unchanged_rebuild_is_byte_identical(tmp_path, name):
+    data = _official_layout(name)
+    path = tmp_path / name
+    path.write_bytes(data)
+    with open_strings_file(path) as table:
+        assert dict(table) == {1: "Iron Sword", 2: "Stählerner Bogen", 3: "Iron Sword", 4: "Iron Sword"}
+        assert rebuild_strings(table, {}) == data
+
+
+@pytest.mark.parametrize("name", ["skyrim_en.STRINGS", "skyrim_en.DLSTRINGS"])
+def test_replacing_one_shared_id_keeps_the_others(name):
+    table = parse_strings_bytes(name, _official_layout(name))
+    rebuilt = parse_strings_bytes(name, rebuild_strings(table, {1: "철검", 2: "철검"}))
+    assert dict(rebuilt) == {1: "철검", 2: "철검", 3: "Iron Sword", 4: "Iron Sword"}
+    offsets = {sid: off for sid, off, _raw in rebuilt.directory()}
+    # Directory order is kept, replaced texts share by content, untouched ids keep their own sharing.
+    assert [sid for sid, _off, _raw in rebuilt.directory()] == [3, 1, 2, 4]
+    assert offsets[1] == offsets[2] and offsets[3] != offsets[4] and offsets[3] != offsets[1]
+
+
+def test_build_stores_identical_strings_once():
+    data = build_strings_bytes("x_en.STRINGS", [(5, "Bow"), (2, "Arrow"), (9, "Bow")])
+    table = parse_strings_bytes("x_en.STRINGS", data)
+    assert table.directory() == [(5, 0, b"Bow"), (2, 4, b"Arrow"), (9, 0, b"Bow")]
+    assert struct.unpack_from("<II", data) == (3, len("Bow\0Arrow\0"))
+    assert list(table.join(parse_strings_bytes("x_ko.STRINGS", build_strings_bytes("x_ko.STRINGS", [(9, "활")])))) == [(9, "Bow", "활")]
+
+
+def test_null_bytes_are_rejected():
+    with pytest.raises(ValueError, match="NULL byte"):
+        build_strings_bytes("x_en.STRINGS", [(1, "a\0b")])
+
+
+@pytest.mark.parametrize("name", ["dlc_en.STRINGS", "dlc_en.ILSTRINGS"])
+def test_numpy_and_python_indexes_agree(monkeypatch, name):
+    entries = [(sid, f"text {sid % 50}" if sid % 7 else "") for sid in range(1000, 0, -3)]
+    data = build_strings_bytes(name, entries)
+    other = build_strings_bytes(name, [(sid, "x") for sid in range(0, 1000, 5)])
+    vectorised = parse_strings_bytes(name, data)
+    expected_join = list(vectorised.join(parse_strings_bytes(name, other)))
+    monkeypatch.setattr(bethesda_strings, "np", None)
+    plain = parse_strings_bytes(name, data)
+    assert list(plain.iter_items()) == list(vectorised.iter_items()) == sorted((sid, text) for sid, text in entries)
+    assert list(plain.join(parse_strings_bytes(name, other))) == expected_join
+    assert 997 in plain and 998 not in plain and plain.get(4) == "text 4"
+
+
+def test_strings_dir_keys_by_lower_cased_name_and_first_path_wins(tmp_path):
+    for rel, text in [("a/Skyrim_EN.STRINGS", "first"), ("b/skyrim_en.strings", "second"), ("b/skyrim_de.STRINGS", "de")]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(build_strings_bytes(path.name, [(1, text)]))
+    assert [p.name for p in iter_strings_files(tmp_path, "EN")] == ["Skyrim_EN.STRINGS", "skyrim_en.strings"]
+    tables = open_strings_dir(tmp_path, "en")
+    try:
+        assert {name: table[1] for name, table in tables.items()} == {"skyrim_en.strings": "first"}
+    finally:
+        for table in tables.values():
+            table.close()
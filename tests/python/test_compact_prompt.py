@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from translate_xtranslator_xml_gemini import (
+    TranslationError,
+    _finalize_translation,
+    build_batch_prompt,
+    mask_placeholders,
+    translate_batch,
+)
+
+
+def _input_items(prompt):
+    return json.loads(prompt.split("Input:\n", 1)[1])["items"]
+
+
+def test_compact_markers_round_trip():
+    masked, placeholders = mask_placeholders("Deals <mag> damage for <dur> seconds.\n<font color='red'>", compact=True)
+    assert masked == "Deals {M0} damage for {D1} seconds.{2}{3}"
+    it = {"id": 7, "src": "Deals <mag> damage for <dur> seconds.\n<font color='red'>", "placeholders": placeholders}
+    out = _finalize_translation(it, "{D1}초 동안 {M0}의 피해를 준다.{2}{3}")
+    assert out == "<dur>초 동안 <mag>의 피해를 준다.\n<font color='red'>"
+
+
+def test_missing_compact_marker_is_rejected():
+    masked, placeholders = mask_placeholders("Deals <mag> damage.", compact=True)
+    it = {"id": 3, "src": "Deals <mag> damage.", "placeholders": placeholders}
+    with pytest.raises(TranslationError, match=r"string index 3: Missing placeholder marker in translation: \{M0\}"):
+        _finalize_translation(it, "피해를 준다.")
+
+
+def test_text_with_braces_keeps_long_markers():
+    masked, placeholders = mask_placeholders("Press {Activate} to absorb <mag> points.", compact=True)
+    assert masked == "Press {Activate} to absorb __XT_PH_MAG_0000__ points."
+    assert placeholders == {"__XT_PH_MAG_0000__": "<mag>"}
+    prompt = build_batch_prompt(src_lang="english", dst_lang="korean", items=[{"id": 0, "text": masked}], compact=True)
+    assert "__XT_PH_…__ token" in prompt
+    plain = build_batch_prompt(src_lang="english", dst_lang="korean", items=[{"id": 0, "text": "{M0} points"}], compact=True)
+    assert "__XT_PH_" not in plain
+
+
+class LocalIdClient:
+    """Answers with the prompt's ids, in reverse order, plus one id outside the batch."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_text(self, *, prompt, **_kwargs):
+        self.prompts.append(prompt)
+        items = _input_items(prompt)
+        out = [{"id": it["id"], "text": "번역 " + it["text"]} for it in reversed(items)]
+        out.append({"id": len(items), "text": "extra"})
+        return json.dumps({"translations": out}, ensure_ascii=False)
+
+
+def test_batch_local_ids_map_back_to_the_original_ids():
+    client = LocalIdClient()
+    batch = [{"id": 1041, "text": "Iron Sword"}, {"id": 7, "text": "{M0} points"}, {"id": 300, "text": "Bow"}]
+    result = translate_batch(
+        client=client, src_lang="english", dst_lang="korean", batch=batch,
+        temperature=0.0, max_output_tokens=256, retries=0, compact=True,
+    )
+    assert [it["id"] for it in _input_items(client.prompts[0])] == [0, 1, 2]
+    assert result == {1041: "번역 Iron Sword", 7: "번역 {M0} points", 300: "번역 Bow"}
+    assert len(client.prompts) == 1
@@ -0,0 +1,37 @@
+from scripts import export_strings_from_tm as export
+from scripts.bethesda_strings import build_strings_bytes, open_strings_file
+from scripts.tm_output import normalize_tm_key, output_paths, write_tm
+
+
+def _tables(root):
+    root.mkdir()
+    (root / "skyrim_en.STRINGS").write_bytes(
+        build_strings_bytes("skyrim_en.STRINGS", [(1, "Iron Sword"), (2, " Steel SWORD "), (3, "Unknown"), (4, "Iron Sword")])
+    )
+    (root / "update_en.DLSTRINGS").write_bytes(build_strings_bytes("update_en.DLSTRINGS", [(7, "No hits here.")]))
+
+
+def _read(path):
+    with open_strings_file(path) as table:
+        return dict(table)
+
+
+def test_applies_a_tsv_tm_and_keeps_files_without_hits(tmp_path):
+    _tables(tmp_path / "en")
+    tm = tmp_path / "tm.tsv"
+    tm.write_text("Source\tTarget\nIron Sword\t철검\nsteel sword\t강철 검\nsteel sword\t무시됨\n", encoding="utf-8")
+    out = tmp_path / "out"
+    assert export.main(["--source-root", str(tmp_path / "en"), "--tm", str(tm), "--out-dir", str(out)]) == 0
+    assert sorted(p.name for p in out.iterdir()) == ["skyrim_ko.STRINGS", "update_ko.DLSTRINGS"]
+    assert _read(out / "skyrim_ko.STRINGS") == {1: "철검", 2: "강철 검", 3: "Unknown", 4: "철검"}
+    assert (out / "update_ko.DLSTRINGS").read_bytes() == (tmp_path / "en" / "update_en.DLSTRINGS").read_bytes()
+
+
+def test_reads_the_seed_scripts_sqlite_tm(tmp_path):
+    _tables(tmp_path / "en")
+    paths = output_paths(tmp_path / "tm.tsv", ["sqlite"])
+    write_tm(paths, [(normalize_tm_key("Iron Sword"), "Iron Sword", "철검")], source_lang="en", dest_lang="ko")
+    out = tmp_path / "out"
+    argv = ["--source-root", str(tmp_path / "en"), "--tm", str(paths["sqlite"]), "--out-dir", str(out), "--target-locale", "kr"]
+    assert export.main(argv) == 0
+    assert _read(out / "skyrim_kr.STRINGS")[1] == "철검"
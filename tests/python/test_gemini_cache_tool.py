@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+
+import pytest
+
+from gemini_cache_tool import compact_cache, promote
+from translate_xtranslator_xml_gemini import Cache, _cache_key, validate_translation
+
+
+def _write(path, records):
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "mod.xml.gemini_cache.jsonl"
+
+
+def test_compact_keeps_last_write_and_own_beats_fallback(cache_path):
+    _write(
+        cache_path,
+        [
+            {"key": "a", "dst": "첫 번역"},
+            {"key": "b", "dst": "자체 번역"},
+            {"key": "a", "dst": "다시 번역"},
+            {"key": "b", "dst": "다른 모델", "fallback": "old-model"},
+            {"key": "c", "dst": "대체", "fallback": "old-model"},
+            {"key": "c", "dst": "새 번역"},
+            {"broken": True},
+        ],
+    )
+    lines, kept, _before, after = compact_cache(cache_path)
+    assert (lines, kept) == (7, 3)
+    assert _lines(cache_path) == [{"key": "b", "dst": "자체 번역"}, {"key": "a", "dst": "다시 번역"}, {"key": "c", "dst": "새 번역"}]
+    assert cache_path.stat().st_size == after
+    assert not list(cache_path.parent.glob("*.tmp")) and not list(cache_path.parent.glob("*.lock"))
+
+
+def test_compact_dry_run_leaves_the_file(cache_path):
+    _write(cache_path, [{"key": "a", "dst": "1"}, {"key": "a", "dst": "2"}])
+    original = cache_path.read_bytes()
+    assert compact_cache(cache_path, dry_run=True)[:2] == (2, 1)
+    assert cache_path.read_bytes() == original
+
+
+def test_compact_keeps_a_half_written_line_for_the_locked_step(cache_path):
+    cache_path.write_text('{"key": "a", "dst": "1"}\n{"key": "a", "dst": "2"}\n{"key": "b", "dst"', encoding="utf-8")
+    compact_cache(cache_path)
+    assert cache_path.read_text(encoding="utf-8") == '{"key": "a", "dst": "2"}\n{"key": "b", "dst"\n'
+
+
+def test_compact_while_appending_loses_nothing(cache_path):
+    _write(cache_path, [{"key": f"old{i % 50}", "dst": str(i)} for i in range(2000)])
+    cache = Cache.load(cache_path)
+    stop = threading.Event()
+    written = []
+
+    def translator():
+        n = 0
+        while not stop.is_set():
+            cache.append(key=f"new{n}", dst=f"번역 {n}")
+            written.append(n)
+            n += 1
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=translator)
+    thread.start()
+    try:
+        for _ in range(20):
+            compact_cache(cache_path)
+    finally:
+        stop.set()
+        thread.join()
+    loaded = Cache.load(cache_path)
+    assert all(loaded.items.get(f"new{n}") == f"번역 {n}" for n in written)
+    assert loaded.items["old49"] == "1999"
+
+
+def test_promote_adds_validated_fallbacks(cache_path):
+    texts = ["Iron Sword", "Deals <mag> damage.", "Uncached"]
+    old = {t: _cache_key(model="old", src_lang="english", dst_lang="korean", source_text=t) for t in texts}
+    _write(cache_path, [{"key": old["Iron Sword"], "dst": "철검"}, {"key": old["Deals <mag> damage."], "dst": "피해를 준다."}])
+    counts = promote(cache_path, from_cache_path=cache_path, texts=texts, src_lang="english", dst_lang="korean", from_model="old", model="new")
+    assert counts == {"promoted": 1, "already": 0, "missing": 1, "rejected": 1}
+    cache = Cache.load(cache_path)
+    new_key = _cache_key(model="new", src_lang="english", dst_lang="korean", source_text="Iron Sword")
+    assert cache.lookup(new_key, "Iron Sword") == ("철검", True)
+    cache.append(key=new_key, dst="무쇠 검")
+    assert Cache.load(cache_path).lookup(new_key, "Iron Sword") == ("무쇠 검", False)
+
+
+@pytest.mark.parametrize(
+    "src,dst,reason",
+    [
+        ("Iron Sword", "철검", None),
+        ("Iron Sword", "  ", "empty translation"),
+        ("Line one\nLine two", "한 줄", "line break count differs"),
+        ("Deals <mag> damage.", "피해를 준다.", "placeholders differ"),
+    ],
+)
+def test_validate_translation(src, dst, reason):
+    assert validate_translation(src, dst) == reason
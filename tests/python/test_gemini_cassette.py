@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+import gemini_cassette
+from gemini_cassette import Cassette, CassetteMiss, request_hash
+from translate_xtranslator_xml_gemini import GeminiClient
+
+ANSWER = '{"translations":[{"id":0,"text":"철검"}]}'
+
+
+def _candidate(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}], "usageMetadata": {"totalTokenCount": 42}}
+
+
+class FakeResponse:
+    def __init__(self, body, lines=None):
+        self.status_code = 200
+        self.text = body
+        self.headers = {}
+        self.encoding = None
+        self._lines = lines or []
+        self.closed = False
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self._lines
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Answers like the Gemini API: one JSON body, or an SSE stream split into two deltas."""
+
+    def __init__(self):
+        self.posts = []
+
+    def post(self, url, *, stream=False, **_kwargs):
+        self.posts.append(url)
+        if stream:
+            half = len(ANSWER) // 2
+            events = [f"data: {json.dumps(_candidate(part))}" for part in (ANSWER[:half], ANSWER[half:])]
+            lines = [events[0], "", events[1], ""]
+            return FakeResponse("", lines)
+        return FakeResponse(json.dumps(_candidate(ANSWER)))
+
+
+class NoNetwork:
+    def post(self, *args, **kwargs):
+        pytest.fail("replay touched the network")
+
+
+def _client(cassette, session):
+    client = GeminiClient(api_key="key-secret1234", model="gemini-test", cassette=cassette)
+    client._session = session
+    return client
+
+
+def _ask(client, stream, prompt="Translate: Iron Sword"):
+    if stream:
+        return "".join(client.stream_text(prompt=prompt, temperature=0.0, max_output_tokens=64))
+    return client.generate_text(prompt=prompt, temperature=0.0, max_output_tokens=64)
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    cassette = Cassette(tmp_path / "cassette", replay=False)
+    session = FakeSession()
+    client = _client(cassette, session)
+    assert _ask(client, stream=False) == ANSWER
+    assert _ask(client, stream=True) == ANSWER
+    assert len(session.posts) == 2 and cassette.recorded == 2
+    return tmp_path / "cassette"
+
+
+def test_recording_stores_requests_by_hash_without_the_key(recorded):
+    files = sorted(recorded.iterdir())
+    assert len(files) == 2
+    payload = GeminiClient._build_payload(prompt="Translate: Iron Sword", temperature=0.0, max_output_tokens=64)
+    assert (recorded / f"{request_hash('generate', 'gemini-test', payload)}.jsonl").exists()
+    assert (recorded / f"{request_hash('stream', 'gemini-test', payload)}.jsonl").exists()
+    assert not any("key-secret" in p.read_text(encoding="utf-8") for p in files)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_replay_answers_without_the_network(recorded, stream, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(gemini_cassette.time, "sleep", sleeps.append)
+    cassette = Cassette(recorded, replay=True, latency_scale=0.0)
+    assert _ask(_client(cassette, NoNetwork()), stream) == ANSWER
+    assert cassette.hits == 1 and sleeps == []
+
+
+def test_replay_latency_follows_the_recording(recorded, monkeypatch):
+    for path in recorded.iterdir():
+        record = json.loads(path.read_text(encoding="utf-8"))
+        record.update(latency_s=2.0, first_chunk_s=0.5)
+        path.write_text(json.dumps(record) + "\n", encoding="utf-8")
+    sleeps = []
+    monkeypatch.setattr(gemini_cassette.time, "sleep", sleeps.append)
+    client = _client(Cassette(recorded, replay=True, latency_scale=0.5), NoNetwork())
+    _ask(client, stream=False)
+    assert sleeps == [1.0]
+    sleeps.clear()
+    _ask(client, stream=True)
+    # Time to first chunk, then the rest spread over the remaining lines.
+    assert sleeps[0] == 0.25 and sum(sleeps) == pytest.approx(1.0)
+
+
+def test_unrecorded_request_is_a_miss(recorded):
+    cassette = Cassette(recorded, replay=True)
+    client = _client(cassette, NoNetwork())
+    with pytest.raises(CassetteMiss):
+        _ask(client, stream=False, prompt="Translate: Steel Sword")
+    with pytest.raises(CassetteMiss):
+        _ask(client, stream=True, prompt="Translate: Steel Sword")
+    assert cassette.misses == 2
+    assert cassette.report_line() == f"[cassette] replayed=0 missing=2 from {recorded}"
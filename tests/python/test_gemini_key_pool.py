@@ -0,0 +1,94 @@
+import json
+import time
+
+import pytest
+
+import gemini_key_pool
+from gemini_key_pool import DEFAULT_COOLDOWN_S, KeyPool, parse_retry_after, split_api_keys
+
+
+@pytest.mark.parametrize(
+    "headers,body,expected",
+    [
+        ({"Retry-After": "7"}, "", 7.0),
+        ({}, json.dumps({"error": {"details": [{"@type": "RetryInfo", "retryDelay": "12s"}]}}), 12.0),
+        ({}, "Quota exceeded. Please retry in 3.5s.", 3.5),
+        ({"Retry-After": "5"}, json.dumps({"error": {"details": [{"retryDelay": "30s"}]}}), 30.0),
+        ({"Retry-After": "soon"}, "not json", None),
+        (None, "", None),
+    ],
+)
+def test_parse_retry_after(headers, body, expected):
+    assert parse_retry_after(headers, body) == expected
+
+
+def test_split_api_keys(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEYS", "env1,env2")
+    assert split_api_keys(["a, b", "a", "c"]) == ["a", "b", "c"]
+    assert split_api_keys(None) == ["env1", "env2"]
+
+
+def test_rate_limited_key_cools_down_and_the_other_key_is_used():
+    pool = KeyPool(["key-aaaa1111", "key-bbbb2222"])
+    first, ticket = pool.acquire(10)
+    pool.release(first, ticket, status=429, retry_after=60)
+    assert first.cooldown_until - time.monotonic() > 55
+    for _ in range(3):
+        state, ticket = pool.acquire(10)
+        assert state is not first
+        pool.release(state, ticket, status=200)
+
+
+def test_cooldown_backs_off_without_retry_after_and_resets_on_success():
+    pool = KeyPool(["key-aaaa1111"])
+    state = pool.keys[0]
+    for expected in (DEFAULT_COOLDOWN_S, 2 * DEFAULT_COOLDOWN_S, 4 * DEFAULT_COOLDOWN_S):
+        state.cooldown_until = 0.0
+        _state, ticket = pool.acquire(1)
+        pool.release(state, ticket, status=429)
+        assert state.cooldown_until - time.monotonic() == pytest.approx(expected, abs=1)
+    state.cooldown_until = 0.0
+    _state, ticket = pool.acquire(1)
+    pool.release(state, ticket, status=200)
+    assert state.rate_limit_streak == 0
+
+
+def test_acquire_waits_for_the_soonest_key(monkeypatch):
+    pool = KeyPool(["key-aaaa1111"])
+    pool.keys[0].cooldown_until = time.monotonic() + 30
+    waits = []
+
+    def fake_sleep(seconds):
+        waits.append(seconds)
+        pool.keys[0].cooldown_until = 0.0
+
+    monkeypatch.setattr(gemini_key_pool.time, "sleep", fake_sleep)
+    pool.acquire(1)
+    assert len(waits) == 1 and 29 < waits[0] <= 30
+
+
+def test_daily_quota_stops_the_run():
+    pool = KeyPool(["key-aaaa1111"], daily_requests=2)
+    for _ in range(2):
+        state, ticket = pool.acquire(1)
+        pool.release(state, ticket, status=200)
+    with pytest.raises(SystemExit):
+        pool.acquire(1)
+
+
+def test_usage_from_processes_sharing_a_key_adds_up(tmp_path):
+    usage = tmp_path / "key-usage.json"
+    a = KeyPool(["shared-key-1234"], usage_path=usage)
+    b = KeyPool(["shared-key-1234"], usage_path=usage)
+    for pool, n in ((a, 3), (b, 5)):
+        for _ in range(n):
+            state, ticket = pool.acquire(1)
+            pool.release(state, ticket, status=200)
+    a.save_usage()
+    b.save_usage()
+    a.save_usage()  # nothing new: must not count a's requests twice
+    key_id = a.keys[0].key_id
+    assert json.loads(usage.read_text(encoding="utf-8"))[key_id][1] == 8
+    assert a.keys[0].day_requests == 8
+    assert KeyPool(["shared-key-1234"], usage_path=usage).keys[0].day_requests == 8
+    assert not usage.with_name(usage.name + ".lock").exists()
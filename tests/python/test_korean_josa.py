@@ -0,0 +1,93 @@
+import pytest
+
+from korean_josa import (
+    FINAL,
+    FINAL_RIEUL,
+    NO_FINAL,
+    JosaFixer,
+    choose_directional_particle,
+    choose_object_particle,
+    choose_particle,
+    final_class,
+)
+
+
+@pytest.mark.parametrize(
+    "word,cls",
+    [
+        ("검", FINAL),
+        ("매지카", NO_FINAL),
+        ("활", FINAL_RIEUL),
+        ("1", FINAL_RIEUL),
+        ("2", NO_FINAL),
+        ("3", FINAL),
+        ("10", FINAL),
+        ("1000", FINAL),
+        ("25%", NO_FINAL),
+        ("Tiber", NO_FINAL),
+        ("Skyrim", FINAL),
+        ("Whiterun", FINAL),
+        ("Aela", NO_FINAL),
+        ("Solitude", None),  # silent -e
+        ("Riverwood", None),
+        ("검'", FINAL),
+        ("", None),
+    ],
+)
+def test_final_class(word, cls):
+    assert final_class(word) == cls
+
+
+def test_table_covers_every_hangul_syllable():
+    assert final_class("가") == NO_FINAL
+    assert final_class("각") == FINAL
+    assert final_class("갈") == FINAL_RIEUL
+    assert final_class("힣") == FINAL
+
+
+@pytest.mark.parametrize(
+    "word,particle,expected",
+    [
+        ("검", "를", "을"),
+        ("매지카", "을", "를"),
+        ("활", "으로", "로"),
+        ("검", "로", "으로"),
+        ("3", "가", "이"),
+        ("Solitude", "을", "를"),  # unknown -> vowel form unless a default is given
+    ],
+)
+def test_choose_particle(word, particle, expected):
+    assert choose_particle(word, particle) == expected
+
+
+def test_hangul_choosers_default_to_vowel_form_for_non_hangul():
+    assert choose_object_particle("검") == "을"
+    assert choose_object_particle("Sword") == "를"
+    assert choose_directional_particle("활") == "로"
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("<23>를 얻었다.", "<23>을 얻었다."),
+        ("<2>을 얻었다.", "<2>를 얻었다."),
+        ("<25%>이 증가합니다.", "<25%>가 증가합니다."),
+        ("3가 필요합니다.", "3이 필요합니다."),
+        ("Skyrim를 탐험합니다.", "Skyrim을 탐험합니다."),
+        ("<mag>를 흡수합니다.", "<mag>를 흡수합니다."),
+        # Silent -e: the reading is unknown, so the translator's particle is kept either way.
+        ("Dragonstone을 얻었다.", "Dragonstone을 얻었다."),
+        ("Rune를 새겼다.", "Rune를 새겼다."),
+        ("Blade을 들었다.", "Blade을 들었다."),
+        ("Flame이 타오른다.", "Flame이 타오른다."),
+    ],
+)
+def test_josa_fixer(text, expected):
+    assert JosaFixer().fix(text) == expected
+
+
+def test_josa_fixer_resolves_masking_markers():
+    fixer = JosaFixer()
+    out = fixer.fix("__XT_PH_NUM_0000__를 얻고 {M1}를 잃는다.", {"__XT_PH_NUM_0000__": "<10>"})
+    assert out == "__XT_PH_NUM_0000__을 얻고 {M1}를 잃는다."
+    assert (fixer.hits, fixer.unresolved) == (1, 1)
@@ -0,0 +1,92 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The QA scanners live with the repo tooling and import their siblings directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / ".vibe" / "brain"))
+
+import lqa_scan  # noqa: E402
+from lqa_scan import DuplicateSourceConsistencyRule, GlossaryTerm, LqaEngine, LqaEntry, default_rules, read_entries  # noqa: E402
+
+# LqaScannerCharacterizationFixture.BuildRepresentativeEntries (tests/XTranslatorAi.Tests/TestSupport):
+# (order index, EDID, REC, source, dest).
+REPRESENTATIVE = [
+    (10, "INFO_TM_001", "INFO:000001", "Saarthal Amulet", "Saarthal Amulet"),
+    (20, "MGEF_TOKEN_001", "MGEF:000002", "Absorb <mag> points [pagebreak] __XT_ONE__.", "매지카 을(를) 흡수합니다."),
+    (30, "MESG_LONG_001", "MESG:000003", "Quest objective updated", "가" * 180 + "다"),
+    (40, "MGEF_ROMAN_001", "MGEF:000004", "Meet Aela", "Aela을 (테스트"),
+    (50, "NPC_GREETING_001", "DIAL:000101", "Hello.", "안내합니다."),
+    (51, "NPC_GREETING_002", "DIAL:000102", "Hello.", "설명합니다."),
+    (52, "NPC_GREETING_003", "INFO:000103", "Hello.", "정리합니다."),
+    (53, "NPC_GREETING_004", "DIAL:000104", "Hello.", "이제 가요."),
+]
+
+# LqaScannerCharacterizationFixture.AssertRepresentativeIssues, without the app-only tm_fallback issue
+# (TM fallback notes come from the project DB): (order index, severity, code, message fragments).
+EXPECTED = [
+    (20, "Error", "token_mismatch", ("태그·토큰", "[pagebreak]", "__XT_*__")),
+    (10, "Warn", "untranslated", ("원문과 동일", "미번역")),
+    (20, "Warn", "glossary_missing", ("용어 누락", "points", "포인트")),
+    (20, "Warn", "particle_marker", ("조사 표기", "괄호/슬래시")),
+    (30, "Warn", "length_risk", ("길이 위험", "src=23", "dst=181", ", x7.87")),
+    (30, "Warn", "rec_tone", ("UI/퀘스트 톤", "합니다체", "PlainDa")),
+    (40, "Warn", "bracket_mismatch", ("괄호/대괄호", "짝")),
+    (40, "Warn", "english_residue", ("영문",)),
+    (40, "Warn", "particle_roman_mismatch", ("로마자", "Aela을", "Aela를")),
+    (53, "Warn", "tone_inconsistent", ("대사 그룹", "말투", "majority=Hamnida")),
+]
+
+
+def _entries():
+    return [LqaEntry("fixture.xml", order, edid, rec, src, dst) for order, edid, rec, src, dst in REPRESENTATIVE]
+
+
+def _app_rules():
+    # DuplicateSourceConsistencyRule is a Python-only addition with no LqaScanner counterpart.
+    rules = default_rules([GlossaryTerm(source="points", target="포인트")])
+    return [r for r in rules if not isinstance(r, DuplicateSourceConsistencyRule)]
+
+
+def test_representative_vectors_match_the_app_characterization():
+    issues = LqaEngine("ko-KR", _app_rules()).scan(_entries())
+    assert [(i.order_index, i.severity, i.code) for i in issues] == [e[:3] for e in EXPECTED]
+    for issue, (_order, _severity, _code, fragments) in zip(issues, EXPECTED):
+        assert all(f in issue.message for f in fragments), issue.message
+
+
+def test_duplicate_source_rule_flags_the_minority_variants():
+    issues = LqaEngine("ko-KR", default_rules([GlossaryTerm("points", "포인트")])).scan(_entries())
+    extra = [i.order_index for i in issues if i.code == "source_inconsistent"]
+    assert extra == [51, 52, 53]
+
+
+def test_korean_only_rules_are_dropped_for_other_targets():
+    codes = {i.code for i in LqaEngine("de", _app_rules()).scan(_entries())}
+    assert codes == {"token_mismatch", "length_risk", "rec_tone", "bracket_mismatch", "tone_inconsistent"}
+
+
+XML = """<?xml version="1.0" encoding="UTF-8"?>
+<SSTXMLRessources>
+  <Params><Source>english</Source><Dest>korean</Dest></Params>
+  <Content>
+    <String><EDID>A</EDID><REC>MGEF:FULL</REC><Source>Saarthal Amulet</Source><Dest>Saarthal Amulet</Dest></String>
+    <String><EDID>B</EDID><REC>MGEF:DNAM</REC><Source>Deals &lt;mag&gt; damage for &lt;dur&gt; seconds.</Source><Dest></Dest></String>
+    <String><EDID>C</EDID><REC>MGEF:DNAM</REC><Source>Deals &lt;mag&gt; damage for &lt;dur&gt; seconds.</Source><Dest>&lt;dur&gt;%의 &lt;mag&gt;초 피해</Dest></String>
+  </Content>
+</SSTXMLRessources>
+"""
+
+
+def test_entries_without_a_translation_are_not_scanned(tmp_path):
+    # The XML counterpart of ScanAsync_Characterization_SkipsPendingEntries: an empty Dest is not scanned.
+    path = tmp_path / "mod.xml"
+    path.write_text(XML, encoding="utf-8")
+    dest_lang, entries = read_entries(path)
+    assert dest_lang == "korean" and [e.edid for e in entries] == ["A", "C"]
+    assert ("A", "untranslated") in [(i.edid, i.code) for i in LqaEngine(dest_lang).scan(entries)]
+
+
+@pytest.mark.parametrize("lang,expected", [("ko-KR", True), ("korean", True), ("한국어", True), ("de", False), ("", False)])
+def test_is_korean_language(lang, expected):
+    assert lqa_scan.is_korean_language(lang) is expected
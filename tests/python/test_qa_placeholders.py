@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / ".vibe" / "brain"))
+
+import qa_placeholders  # noqa: E402
+
+XML = """<?xml version="1.0" encoding="UTF-8"?>
+<SSTXMLRessources>
+  <Params><Source>english</Source><Dest>korean</Dest></Params>
+  <Content>
+    <String><EDID>A</EDID><REC>MGEF:FULL</REC><Source>Saarthal Amulet</Source><Dest>Saarthal Amulet</Dest></String>
+    <String><EDID>B</EDID><REC>MGEF:DNAM</REC><Source>Deals &lt;mag&gt; damage for &lt;dur&gt; seconds.</Source><Dest></Dest></String>
+    <String><EDID>C</EDID><REC>MGEF:DNAM</REC><Source>Deals &lt;mag&gt; damage for &lt;dur&gt; seconds.</Source><Dest>&lt;dur&gt;%의 &lt;mag&gt;초 피해</Dest></String>
+  </Content>
+</SSTXMLRessources>
+"""
+
+
+def test_placeholder_qa_scans_every_file_of_a_library(tmp_path):
+    library = tmp_path / "mods"
+    (library / "b").mkdir(parents=True)
+    (library / "a.xml").write_text(XML, encoding="utf-8")
+    (library / "b" / "broken.xml").write_text("<SSTXMLRessources>", encoding="utf-8")
+    paths, missing = qa_placeholders._collect_xml_paths([str(library), "nope.xml"], tmp_path)
+    assert [p.name for p in paths] == ["a.xml", "broken.xml"] and missing == ["nope.xml"]
+
+    jobs = [(str(p), qa_placeholders.MAG_FORBIDDEN_UNITS, qa_placeholders.DUR_FORBIDDEN_UNITS) for p in paths]
+    (_path, total, findings, error), (_p2, _t2, broken_findings, broken_error) = map(qa_placeholders._scan_file, jobs)
+    assert error is None and total == 3
+    assert [f.kind for f in findings] == ["placeholder_mismatch", "mag_bad_unit", "dur_bad_unit"]
+    assert findings[1].note == "'<mag>' followed by: 초" and findings[2].note == "'<dur>' followed by: %"
+    assert broken_findings == [] and broken_error
@@ -0,0 +1,133 @@
+import pytest
+
+from scripts import seed_tm_from_bethesda_strings_dirs as seed
+from scripts.bethesda_strings import build_strings_bytes
+from scripts.tm_seed_cache import SeedCache
+
+TEXTS = {
+    "en": {1: "Iron Sword", 2: "Steel Sword", 3: "Only English", 4: "Septim"},
+    # Untranslated in the Korean table: only Korean targets must contain Hangul.
+    "ko": {1: "철검", 2: "강철 검", 4: "Septims"},
+    "de": {1: "Eisenschwert", 3: "Nur Englisch", 4: "Septime"},
+}
+
+
+def _write_tables(root, stem, texts_by_locale):
+    root.mkdir(parents=True, exist_ok=True)
+    for locale, texts in texts_by_locale.items():
+        (root / f"{stem}_{locale}.STRINGS").write_bytes(build_strings_bytes(f"{stem}_{locale}.STRINGS", sorted(texts.items())))
+
+
+def _read_tsv(path):
+    return path.read_text(encoding="utf-8").splitlines()[1:]
+
+
+@pytest.fixture
+def strings_dir(tmp_path):
+    root = tmp_path / "strings"
+    _write_tables(root, "skyrim", TEXTS)
+    _write_tables(root, "dawnguard", {"en": {7: "Crossbow"}, "ko": {7: "석궁"}, "de": {7: "Armbrust"}})
+    return root
+
+
+def _multi(strings_dir, tmp_path, *extra):
+    argv = ["--source-root", str(strings_dir), "--target-locales", "ko", "--out-dir", str(tmp_path / "out"),
+            "--pair-cache-dir", str(tmp_path / "cache"), "--jobs", "1", *extra]
+    assert seed.main(argv) == 0
+
+
+def test_cached_rerun_loads_pairs_one_job_at_a_time(strings_dir, tmp_path, monkeypatch):
+    _multi(strings_dir, tmp_path)
+    first = _read_tsv(tmp_path / "out" / "en-ko.tsv")
+    assert first == ["Crossbow\t석궁", "Iron Sword\t철검", "Steel Sword\t강철 검"]
+
+    events = []
+    real_get, real_add = SeedCache.get, seed.SortedPairSpool.add
+    monkeypatch.setattr(SeedCache, "get", lambda self, *a: events.append("get") or real_get(self, *a))
+    monkeypatch.setattr(seed.SortedPairSpool, "add", lambda self, *a: events.append("add") or real_add(self, *a))
+    real_join = seed._join_locales
+    monkeypatch.setattr(seed, "_join_locales", lambda job: pytest.fail(f"re-parsed {job[0]}") if job[2] else real_join(job))
+    _multi(strings_dir, tmp_path)
+    # Each job's pairs are fetched right before they are spooled, never all up front.
+    assert events == ["get", "add", "get", "add", "add"]
+    assert _read_tsv(tmp_path / "out" / "en-ko.tsv") == first
+
+
+def test_unreadable_cached_pairs_are_joined_again(strings_dir, tmp_path):
+    _multi(strings_dir, tmp_path)
+    first = _read_tsv(tmp_path / "out" / "en-ko.tsv")
+    for pairs_file in (tmp_path / "cache" / "pairs").iterdir():
+        pairs_file.write_text("not json", encoding="utf-8")
+    _multi(strings_dir, tmp_path)
+    assert _read_tsv(tmp_path / "out" / "en-ko.tsv") == first
+
+
+def test_each_locale_is_joined_with_its_own_filter(strings_dir, tmp_path):
+    _multi(strings_dir, tmp_path, "--target-locales", "ko,de")
+    assert _read_tsv(tmp_path / "out" / "en-ko.tsv") == ["Crossbow\t석궁", "Iron Sword\t철검", "Steel Sword\t강철 검"]
+    assert _read_tsv(tmp_path / "out" / "en-de.tsv") == [
+        "Crossbow\tArmbrust", "Iron Sword\tEisenschwert", "Only English\tNur Englisch", "Septim\tSeptime",
+    ]
+
+
+def test_all_target_locales(strings_dir, tmp_path):
+    _multi(strings_dir, tmp_path, "--target-locales", "all")
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["en-de.tsv", "en-ko.tsv"]
+    assert _read_tsv(tmp_path / "out" / "en-de.tsv")[0] == "Crossbow\tArmbrust"
+
+
+def test_empty_tables_are_cached_as_unmatched(strings_dir, tmp_path, monkeypatch, capsys):
+    _write_tables(strings_dir, "empty", {"en": {}, "ko": {}})
+    _multi(strings_dir, tmp_path)
+    assert "matched_files=2 " in capsys.readouterr().out
+
+    monkeypatch.setattr(seed, "_join_locales", lambda job: pytest.fail(f"re-parsed {job[0]}") if job[2] else (job[0], {}, []))
+    _multi(strings_dir, tmp_path)
+    out = capsys.readouterr().out
+    assert "reused=3 parsed=0" in out and "matched_files=2 " in out
+
+
+@pytest.fixture
+def pair_dirs(tmp_path):
+    en, ko = tmp_path / "en", tmp_path / "ko"
+    for root, texts in ((en, TEXTS["en"]), (ko, TEXTS["ko"])):
+        root.mkdir()
+        (root / "skyrim_en.STRINGS").write_bytes(build_strings_bytes("skyrim_en.STRINGS", sorted(texts.items())))
+        (root / "empty_en.STRINGS").write_bytes(build_strings_bytes("empty_en.STRINGS", []))
+    return en, ko
+
+
+def _single(pair_dirs, tmp_path):
+    en, ko = pair_dirs
+    argv = ["--source-root", str(en), "--target-root", str(ko), "--out", str(tmp_path / "tm.tsv"),
+            "--pair-cache-dir", str(tmp_path / "cache")]
+    assert seed.main(argv) == 0
+    return _read_tsv(tmp_path / "tm.tsv")
+
+
+def test_single_pair_reuses_cached_and_unmatched_entries(pair_dirs, tmp_path, monkeypatch, capsys):
+    first = _single(pair_dirs, tmp_path)
+    assert first == ["Iron Sword\t철검", "Steel Sword\t강철 검"]
+    assert "matched_files=1 " in capsys.readouterr().out
+
+    monkeypatch.setattr(seed, "_open_spec", lambda spec: pytest.fail(f"re-opened {spec[1]}"))
+    assert _single(pair_dirs, tmp_path) == first
+    out = capsys.readouterr().out
+    assert "reused=2 parsed=0" in out and "matched_files=1 " in out
+
+
+def test_single_pair_closes_the_source_when_the_target_fails(pair_dirs, tmp_path, monkeypatch, capsys):
+    opened = []
+    real_open = seed._open_spec
+
+    def open_spec(spec):
+        if "/ko/" in spec[1].replace("\\", "/"):
+            raise OSError("locked")
+        table = real_open(spec)
+        opened.append(table)
+        return table
+
+    monkeypatch.setattr(seed, "_open_spec", open_spec)
+    assert _single(pair_dirs, tmp_path) == []
+    assert len(opened) == 2 and all(len(table) == 0 for table in opened)
+    assert capsys.readouterr().err.count("failed reading") == 2
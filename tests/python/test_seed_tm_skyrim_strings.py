@@ -0,0 +1,49 @@
+import pytest
+from archive_builders import build_bsa
+
+from scripts import seed_tm_from_skyrim_strings as seed
+from scripts.bethesda_strings import build_strings_bytes
+from scripts.tm_seed_cache import SeedCache
+
+
+@pytest.fixture
+def inputs(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    official = {
+        "strings/skyrim_english.strings": build_strings_bytes("skyrim_english.strings", [(1, "Iron Sword"), (2, "Whiterun")]),
+        "strings/update_english.strings": build_strings_bytes("update_english.strings", [(5, "Crossbow")]),
+    }
+    bsa = tmp_path / "Skyrim - Interface.bsa"
+    bsa.write_bytes(build_bsa(official, version=104, compress=True))
+    community = tmp_path / "community"
+    community.mkdir()
+    (community / "skyrim_english.strings").write_bytes(build_strings_bytes("skyrim_english.strings", [(1, "철검"), (2, "화이트런")]))
+    (community / "update_english.strings").write_bytes(build_strings_bytes("update_english.strings", [(5, "석궁")]))
+    return bsa, community
+
+
+def _run(tmp_path, bsa, community):
+    argv = ["--interface-bsa", str(bsa), "--community-root", str(community), "--out", str(tmp_path / "tm.tsv"),
+            "--pair-cache-dir", str(tmp_path / "cache")]
+    assert seed.main(argv) == 0
+    return (tmp_path / "tm.tsv").read_text(encoding="utf-8").splitlines()[1:]
+
+
+def test_cached_rerun_loads_pairs_one_job_at_a_time(tmp_path, monkeypatch, inputs):
+    first = _run(tmp_path, *inputs)
+    assert first == ["Crossbow\t석궁", "Iron Sword\t철검", "Whiterun\t화이트런"]
+
+    events = []
+    real_get, real_add = SeedCache.get, seed.SortedPairSpool.add
+    monkeypatch.setattr(SeedCache, "get", lambda self, *a: events.append("get") or real_get(self, *a))
+    monkeypatch.setattr(seed.SortedPairSpool, "add", lambda self, *a: events.append("add") or real_add(self, *a))
+    monkeypatch.setattr(seed, "parse_strings_bytes", lambda *a: pytest.fail("re-parsed a cached job"))
+    assert _run(tmp_path, *inputs) == first
+    assert events == ["get", "add", "add", "get", "add"]
+
+
+def test_unreadable_cached_pairs_are_parsed_again(tmp_path, inputs):
+    first = _run(tmp_path, *inputs)
+    for pairs_file in (tmp_path / "cache" / "pairs").iterdir():
+        pairs_file.write_text("not json", encoding="utf-8")
+    assert _run(tmp_path, *inputs) == first
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from session_terms import SessionTermMemory, is_definition_text, is_session_term_rec, normalize_term
+
+
+@pytest.mark.parametrize(
+    "rec,expected",
+    [("WEAP:FULL", True), ("NPC_:NAME", True), ("FACT:MNAM", False), ("ARMO:NAM1", True), ("BOOK:TITLE", True),
+     ("weap:full", True), ("BOOK:DESC", False), ("INFO:NAM1", True), ("", False), (None, False)],
+)
+def test_is_session_term_rec_matches_the_app(rec, expected):
+    assert is_session_term_rec(rec) is expected
+
+
+def test_definition_text():
+    assert is_definition_text("Iron Sword")
+    assert is_definition_text("Sovngarde")
+    assert not is_definition_text("Deals damage.")
+    assert not is_definition_text("the")
+    assert normalize_term("The Hall of the Dead") == "hall of the dead"
+
+
+def test_only_name_records_are_learned_whole():
+    memory = SessionTermMemory()
+    assert memory.learn("Iron Sword", "철검", "BOOK:DESC") == 0
+    assert memory.learn("Iron Sword", "철검", "") == 0
+    assert memory.learn("Iron Sword", "철검", "WEAP:FULL") == 1
+    # Inputs without record types (raw strings, STRINGS files) fall back to the text heuristic.
+    assert memory.learn("Steel Sword", "강철 검", None) == 1
+    assert memory.pairs_for(["An Iron Sword and a Steel Sword"]) == [("Steel Sword", "강철 검"), ("Iron Sword", "철검")]
+
+
+def test_capitalized_runs_are_aligned_from_two_agreeing_pairs():
+    memory = SessionTermMemory()
+    assert memory.learn("Travel to Bleak Falls Barrow at once.", "즉시 블리크 폴스 바로우로 가라.") == 0
+    assert memory.learn("Bleak Falls Barrow is cold.", "블리크 폴스 바로우는 춥다.") == 1
+    assert memory.terms["bleak falls barrow"][1] == "블리크 폴스 바로우"
+
+
+WHITERUN = [
+    ("You can travel to Whiterun today.", "오늘 화이트런으로 여행할 수 있습니다."),
+    ("Guards in Whiterun will help you.", "화이트런의 경비병이 당신을 도울 수 있습니다."),
+]
+
+
+def test_sentences_of_other_records_are_never_learned(tmp_path):
+    memory = SessionTermMemory(tmp_path / "x.gemini_terms.jsonl")
+    for source, target in WHITERUN:
+        assert memory.learn(source, target, "BOOK:DESC") == 0
+    assert memory.terms == {}
+    assert memory.pairs_for(["Whiterun"]) == []
+    assert not (tmp_path / "x.gemini_terms.jsonl").exists()
+
+
+def test_a_shared_ending_does_not_beat_the_name():
+    memory = SessionTermMemory()
+    for source, target in WHITERUN:
+        assert memory.learn(source, target) == 0
+    assert "whiterun" not in memory.terms
+    # A third pair without the common ending settles it.
+    assert memory.learn("Go to Whiterun now.", "지금 화이트런으로 가라.") == 1
+    assert memory.terms["whiterun"][1] == "화이트런"
+
+
+def test_unrelated_targets_rule_out_a_shared_phrase():
+    memory = SessionTermMemory()
+    memory.learn("Riften is cold.", "리프트에 갈 수 있습니다.", "BOOK:DESC")
+    memory.learn(*WHITERUN[0])
+    assert memory.learn(*WHITERUN[1]) == 1
+    assert memory.terms["whiterun"][1] == "화이트런"
+
+
+def test_cap_counts_only_terms_learned_this_run(tmp_path):
+    path = tmp_path / "x.gemini_terms.jsonl"
+    path.write_text("".join(json.dumps({"src": f"Name{i}", "dst": f"이름{i}"}) + "\n" for i in range(5)), encoding="utf-8")
+    memory = SessionTermMemory.load(path, max_new_terms=2)
+    assert memory.loaded == 5
+    assert memory.learn("Iron Sword", "철검", "WEAP:FULL") == 1
+    assert memory.learn("Steel Sword", "강철 검", "WEAP:FULL") == 1
+    assert memory.learn("Ebony Sword", "흑단 검", "WEAP:FULL") == 0
+    assert len(memory.terms) == 7 and memory.learned == 2
+
+
+def test_later_lines_override_and_empty_dst_forgets(tmp_path):
+    path = tmp_path / "x.gemini_terms.jsonl"
+    lines = [
+        {"src": "Whiterun", "dst": "화이트론"},
+        {"src": "Riften", "dst": "리프텐"},
+        {"src": "Whiterun", "dst": "화이트런"},
+        {"src": "Riften", "dst": ""},
+    ]
+    path.write_text("".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines), encoding="utf-8")
+    memory = SessionTermMemory.load(path)
+    assert memory.terms == {"whiterun": ("Whiterun", "화이트런")}
+    # Learning never replaces a loaded term, and a forgotten term can be learned again.
+    assert memory.learn("Whiterun", "화이트 런", "WRLD:FULL") == 0
+    assert memory.learn("Riften", "리프튼", "CELL:FULL") == 1
+    assert SessionTermMemory.load(path).terms["riften"] == ("Riften", "리프튼")
+
+
+def test_reset_discards_the_file(tmp_path):
+    path = tmp_path / "x.gemini_terms.jsonl"
+    path.write_text(json.dumps({"src": "Whiterun", "dst": "화이트론"}) + "\n", encoding="utf-8")
+    memory = SessionTermMemory.load(path, reset=True)
+    assert memory.terms == {} and not path.exists()
+    memory.learn("Whiterun", "화이트런", "WRLD:FULL")
+    assert SessionTermMemory.load(path).terms == {"whiterun": ("Whiterun", "화이트런")}
+
+
+def test_dry_run_keeps_terms_in_memory(tmp_path):
+    path = tmp_path / "x.gemini_terms.jsonl"
+    memory = SessionTermMemory.load(path, persist=False, reset=True)
+    assert memory.learn("Iron Sword", "철검", "WEAP:FULL") == 1
+    assert not path.exists()
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from translate_xtranslator_xml_gemini import StreamingTranslationsParser
+
+BODY = json.dumps(
+    {
+        "translations": [
+            {"id": 0, "text": "철검"},
+            {"id": 1, "text": 'a "quoted" {brace} [bracket] \\ back'},
+            {"id": 2, "text": "줄\n바꿈"},
+        ]
+    },
+    ensure_ascii=False,
+)
+EXPECTED = [(0, "철검"), (1, 'a "quoted" {brace} [bracket] \\ back'), (2, "줄\n바꿈")]
+
+
+def _feed_all(chunks):
+    parser = StreamingTranslationsParser()
+    out = []
+    for chunk in chunks:
+        out.extend(parser.feed(chunk))
+    return out
+
+
+def test_whole_body():
+    assert _feed_all([BODY]) == EXPECTED
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16])
+def test_any_chunk_split(size):
+    assert _feed_all(BODY[i : i + size] for i in range(0, len(BODY), size)) == EXPECTED
+
+
+def test_split_inside_escape():
+    cut = BODY.index('\\"quoted') + 1  # right after the backslash
+    assert _feed_all([BODY[:cut], BODY[cut:]]) == EXPECTED
+
+
+def test_items_are_returned_as_soon_as_they_close():
+    parser = StreamingTranslationsParser()
+    first_end = BODY.index("}") + 1
+    assert parser.feed(BODY[:first_end]) == [(0, "철검")]
+    assert parser.feed(BODY[first_end:]) == EXPECTED[1:]
+
+
+def test_truncated_tail_keeps_finished_items():
+    cut = BODY.index('{"id": 2')
+    assert _feed_all([BODY[: cut + 12]]) == EXPECTED[:2]
+
+
+def test_malformed_items_are_skipped():
+    body = '{"translations":[{"id":"x","text":"a"},{"id":1},{"id":2,"text":"ok"}]}'
+    assert _feed_all([body]) == [(2, "ok")]
@@ -0,0 +1,57 @@
+import sqlite3
+
+from scripts.tm_output import SortedPairSpool, normalize_tm_key, output_paths, write_tm
+
+
+def test_spool_sorts_and_keeps_first_pair_per_key_across_spills(tmp_path):
+    spool = SortedPairSpool(max_in_memory=2, tmp_dir=tmp_path)
+    for src, dst in [("Sword", "검"), ("axe", "도끼"), ("SWORD", "칼"), ("Bow", "활"), ("Axe ", "손도끼")]:
+        spool.add(src, dst)
+    assert list(spool.sorted_pairs()) == [("axe", "axe", "도끼"), ("bow", "Bow", "활"), ("sword", "Sword", "검")]
+    assert spool.spilled_runs >= 2
+
+
+def test_external_merge_matches_an_in_memory_sort(tmp_path):
+    pairs = [(f"Item {n % 37}", f"아이템 {n}") for n in range(200)]
+    spilled = SortedPairSpool(max_in_memory=2, tmp_dir=tmp_path)
+    in_memory = SortedPairSpool(max_in_memory=10_000, tmp_dir=tmp_path)
+    for src, dst in pairs:
+        spilled.add(src, dst)
+        in_memory.add(src, dst)
+    assert in_memory.spilled_runs == 0 and spilled.spilled_runs == 100
+    merged = list(spilled.sorted_pairs())
+    assert merged == list(in_memory.sorted_pairs())
+    # 37 distinct keys, each with the first target added for it.
+    assert len(merged) == 37 and dict((k, dst) for k, _src, dst in merged)["item 5"] == "아이템 5"
+    # The run files are removed once the merge has been consumed.
+    assert not list(tmp_path.iterdir())
+    assert write_tm(output_paths(tmp_path / "tm.tsv", ["tsv"]), iter(merged), source_lang="en", dest_lang="ko") == 37
+
+
+def test_sqlite_uses_the_app_translation_memory_schema(tmp_path):
+    paths = output_paths(tmp_path / "tm.tsv", ["tsv", "sqlite"])
+    pairs = [(normalize_tm_key(s), s, d) for s, d in [("Iron Sword", "강철 검"), ("Blank", " ")]]
+    assert write_tm(paths, pairs, source_lang="en", dest_lang="ko") == 2
+
+    conn = sqlite3.connect(paths["sqlite"])
+    try:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(TranslationMemory)")]
+        assert columns == ["Id", "SourceLangKey", "DestLangKey", "SrcKey", "SrcText", "DstText", "UpdatedAt"]
+        # The query ProjectDb.GetTranslationMemoryAsync runs.
+        rows = conn.execute(
+            "SELECT SrcKey, DstText FROM TranslationMemory WHERE SourceLangKey=? AND DestLangKey=? "
+            "ORDER BY UpdatedAt DESC, Id DESC",
+            ("english", "korean"),
+        ).fetchall()
+        assert rows == [("iron sword", "강철 검")]
+        hits = conn.execute("SELECT SrcText FROM TranslationMemoryFts WHERE TranslationMemoryFts MATCH 'iron'").fetchall()
+        assert hits == [("Iron Sword",)]
+        # Upserts keyed like the app's bulk upsert.
+        conn.execute(
+            "INSERT INTO TranslationMemory (SourceLangKey, DestLangKey, SrcKey, SrcText, DstText, UpdatedAt) "
+            "VALUES ('english', 'korean', 'iron sword', 'Iron Sword', '철검', 'x') "
+            "ON CONFLICT(SourceLangKey, DestLangKey, SrcKey) DO UPDATE SET DstText=excluded.DstText"
+        )
+        assert conn.execute("SELECT COUNT(*) FROM TranslationMemory").fetchone() == (1,)
+    finally:
+        conn.close()
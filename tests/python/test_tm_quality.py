@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+import translate_xtranslator_xml_gemini as tx
+from scripts import tm_quality
+from scripts.tm_output import SortedPairSpool
+from scripts.tm_quality import QualityFilter, score_pairs
+
+
+def test_uses_the_maskers_token_set():
+    assert tm_quality.PLACEHOLDER_RE is tx.PLACEHOLDER_RE
+
+
+def test_placeholder_mismatch_fails_fluent_text():
+    scores = score_pairs(["Deals <mag> damage.", "Deals <mag> damage."], ["<mag>의 피해를 준다.", "피해를 준다."])
+    assert scores.placeholders.tolist() == [1.0, 0.0]
+    assert scores.total[0] >= 0.6 > scores.total[1]
+
+
+def _rows(n):
+    # Mostly well-aligned names, with a few padded or truncated targets.
+    rows = []
+    for i in range(n):
+        src = f"Item number {i}"
+        dst = f"아이템 {i}번" if i % 7 else f"아이템 {i}번 " + "긴 설명 " * (i % 5 + 1)
+        rows.append((f"k{i:04d}", src, dst))
+    return rows
+
+
+def _report(qf, rows, tmp_path, name):
+    qf.report_path = tmp_path / name
+    qf.fit(rows)
+    kept = list(qf.filter(rows))
+    return kept, qf.report_path.read_text(encoding="utf-8")
+
+
+def test_length_score_does_not_depend_on_the_chunk(tmp_path):
+    rows = _rows(300)
+    whole = _report(QualityFilter(chunk_size=1000), rows, tmp_path, "whole.tsv")
+    chunked = _report(QualityFilter(chunk_size=7), rows, tmp_path, "chunked.tsv")
+    assert chunked == whole
+    # A skewed chunk on its own would have moved the reference ratio.
+    skewed = [r for r in rows if int(r[0][1:]) % 7 == 0]
+    qf = QualityFilter(chunk_size=1000)
+    qf.fit(rows)
+    assert qf.length_stats != QualityFilter(chunk_size=1000).fit(skewed)
+    by_chunk = score_pairs([r[1] for r in skewed], [r[2] for r in skewed])
+    by_tm = score_pairs([r[1] for r in skewed], [r[2] for r in skewed], length_stats=qf.length_stats)
+    assert not np.allclose(by_chunk.length, by_tm.length)
+
+
+def test_fit_matches_the_exact_statistics_within_a_bin():
+    rows = _rows(301)
+    log_ratio = np.log((np.array([len(r[2]) for r in rows]) + 1.0) / (np.array([len(r[1]) for r in rows]) + 1.0))
+    median = float(np.median(log_ratio))
+    spread = max(1.4826 * float(np.median(np.abs(log_ratio - median))), 0.25)
+    fitted = QualityFilter(chunk_size=50).fit(rows)
+    assert fitted == pytest.approx((median, spread), abs=0.02)
+
+
+def test_spool_can_be_read_twice_for_fit_and_filter(tmp_path):
+    spool = SortedPairSpool(max_in_memory=2, tmp_dir=tmp_path)
+    for _key, src, dst in _rows(10):
+        spool.add(src, dst)
+    first = list(spool.sorted_pairs(keep=True))
+    assert list(spool.sorted_pairs()) == first and len(first) == 10
+    assert list(spool.sorted_pairs()) == []
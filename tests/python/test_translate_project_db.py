@@ -0,0 +1,131 @@
+import json
+import sqlite3
+
+import pytest
+
+import translate_project_db_gemini as project_db
+from translate_project_db_gemini import (
+    STATUS_DONE,
+    STATUS_ERROR,
+    STATUS_IN_PROGRESS,
+    STATUS_PENDING,
+    claim_pending,
+    open_project_db,
+    reset_in_progress,
+    write_results,
+)
+
+# Project (columns the worker reads) and StringEntry as created by the app's ProjectDb.
+SCHEMA = """
+CREATE TABLE Project (
+  Id INTEGER PRIMARY KEY,
+  SourceLang TEXT NOT NULL,
+  DestLang TEXT NOT NULL,
+  ModelName TEXT NOT NULL
+);
+INSERT INTO Project (Id, SourceLang, DestLang, ModelName) VALUES (1, 'english', 'korean', 'gemini-test');
+CREATE TABLE StringEntry (
+  Id INTEGER PRIMARY KEY,
+  OrderIndex INTEGER NOT NULL,
+  ListAttr TEXT,
+  PartialAttr TEXT,
+  AttributesJson TEXT,
+  EDID TEXT,
+  REC TEXT,
+  SourceText TEXT NOT NULL,
+  DestText TEXT NOT NULL,
+  Status INTEGER NOT NULL,
+  ErrorMessage TEXT,
+  RawStringXml TEXT NOT NULL,
+  UpdatedAt TEXT NOT NULL
+);
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "project.sqlite"
+    setup = sqlite3.connect(path)
+    setup.executescript(SCHEMA)
+    setup.executemany(
+        "INSERT INTO StringEntry (Id, OrderIndex, REC, SourceText, DestText, Status, ErrorMessage, RawStringXml, UpdatedAt) "
+        "VALUES (?, ?, 'WEAP:FULL', ?, '', ?, ?, '', '')",
+        [
+            (1, 2, "Iron Sword", STATUS_PENDING, None),
+            (2, 1, "Steel Sword", STATUS_PENDING, None),
+            (3, 3, "Dwarven Bow", STATUS_IN_PROGRESS, "timeout"),
+        ],
+    )
+    setup.commit()
+    setup.close()
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    db = open_project_db(db_path)
+    yield db
+    db.close()
+
+
+def _row(conn, row_id):
+    return conn.execute("SELECT Status, ErrorMessage, DestText FROM StringEntry WHERE Id=?", (row_id,)).fetchone()
+
+
+def test_reset_in_progress_clears_the_error(conn):
+    assert reset_in_progress(conn) == 1
+    assert _row(conn, 3) == (STATUS_PENDING, None, "")
+
+
+def test_claim_pending_in_order_index_order(conn):
+    assert claim_pending(conn, 1) == [(2, "Steel Sword", "WEAP:FULL")]
+    assert _row(conn, 2)[0] == STATUS_IN_PROGRESS
+    assert claim_pending(conn, 5) == [(1, "Iron Sword", "WEAP:FULL")]
+
+
+def test_write_results_skips_rows_the_app_changed(conn):
+    claim_pending(conn, 2)
+    conn.execute("UPDATE StringEntry SET Status=? WHERE Id=1", (STATUS_PENDING,))
+    write_results(conn, [(1, "철검", STATUS_DONE, None), (2, "", STATUS_ERROR, "blocked")])
+    assert _row(conn, 1) == (STATUS_PENDING, None, "")
+    assert _row(conn, 2) == (STATUS_ERROR, "blocked", "")
+
+
+class FailingClient:
+    """Translates every item except those containing "Steel", which the model keeps leaving out."""
+
+    calls = 0
+
+    def __init__(self, **_kwargs):
+        pass
+
+    @classmethod
+    def _reply(cls, prompt):
+        cls.calls += 1
+        items = json.loads(prompt.split("Input JSON:\n", 1)[1])["items"]
+        out = [{"id": it["id"], "text": "번역 " + it["text"]} for it in items if "Steel" not in it["text"]]
+        return json.dumps({"translations": out}, ensure_ascii=False)
+
+    def generate_text(self, *, prompt, **_kwargs):
+        return self._reply(prompt)
+
+    def stream_text(self, *, prompt, **_kwargs):
+        yield self._reply(prompt)
+
+
+@pytest.mark.parametrize("mode", [[], ["--stream"]])
+def test_one_failing_row_does_not_fail_its_batch(db_path, monkeypatch, mode):
+    monkeypatch.setattr(project_db, "GeminiClient", FailingClient)
+    FailingClient.calls = 0
+    argv = ["--db", str(db_path), "--api-key", "key-test1234", "--retries", "0", "--no-term-memory", "--reset-in-progress", *mode]
+    assert project_db.main(argv) == 0
+    db = open_project_db(db_path)
+    try:
+        assert _row(db, 1) == (STATUS_DONE, None, "번역 Iron Sword")
+        assert _row(db, 3) == (STATUS_DONE, None, "번역 Dwarven Bow")
+        status, error, dest = _row(db, 2)
+        assert (status, dest) == (STATUS_ERROR, "") and "Failed to translate batch" in error
+    finally:
+        db.close()
+    # One request for the batch, then one per half after the split; the good rows are not re-sent alone.
+    assert FailingClient.calls <= 3
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import translate_xtranslator_xml_gemini as tx
+from scripts.bethesda_strings import build_strings_bytes, open_strings_file
+
+
+class FakeClient:
+    texts: list[str] = []
+
+    def __init__(self, **_kwargs):
+        pass
+
+    def generate_text(self, *, prompt, **_kwargs):
+        items = json.loads(prompt.split("Input JSON:\n", 1)[1])["items"]
+        FakeClient.texts += [it["text"] for it in items]
+        return json.dumps({"translations": [{"id": it["id"], "text": "번역 " + it["text"]} for it in items]}, ensure_ascii=False)
+
+
+def _write(path, entries):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(build_strings_bytes(path.name, entries))
+
+
+def _read(path):
+    with open_strings_file(path) as table:
+        return dict(table)
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    monkeypatch.setattr(tx, "GeminiClient", FakeClient)
+    FakeClient.texts = []
+
+    def run(*extra):
+        argv = ["--input", str(tmp_path / "en"), "--output", str(tmp_path / "out"), "--cache", str(tmp_path / "cache.jsonl"),
+                "--api-key", "key-test1234", "--no-term-memory", "--no-post-edit", *extra]
+        assert tx.main(argv) == 0
+
+    return run
+
+
+def test_only_missing_ids_are_translated(tmp_path, run):
+    _write(tmp_path / "en" / "skyrim_en.STRINGS", [(1, "Iron Sword"), (2, "Steel Sword"), (3, ""), (4, "Bow")])
+    _write(tmp_path / "en" / "update_en.DLSTRINGS", [(9, "A long description.")])
+    # The existing Korean table already has id 1; id 4 is still the English text.
+    _write(tmp_path / "en" / "skyrim_ko.STRINGS", [(1, "철검"), (4, "Bow")])
+    run()
+    assert sorted(FakeClient.texts) == ["A long description.", "Bow", "Steel Sword"]
+    assert _read(tmp_path / "out" / "skyrim_ko.STRINGS") == {1: "철검", 2: "번역 Steel Sword", 3: "", 4: "번역 Bow"}
+    assert _read(tmp_path / "out" / "update_ko.DLSTRINGS") == {9: "번역 A long description."}
+
+
+def test_existing_tables_from_another_directory(tmp_path, run):
+    _write(tmp_path / "en" / "skyrim_en.STRINGS", [(1, "Iron Sword"), (2, "Steel Sword")])
+    _write(tmp_path / "old" / "skyrim_kr.STRINGS", [(2, "강철 검")])
+    run("--target-locale", "kr", "--existing", str(tmp_path / "old"))
+    assert FakeClient.texts == ["Iron Sword"]
+    assert _read(tmp_path / "out" / "skyrim_kr.STRINGS") == {1: "번역 Iron Sword", 2: "강철 검"}
+
+
+def test_file_names_must_carry_the_source_locale(tmp_path, run):
+    _write(tmp_path / "en" / "skyrim.STRINGS", [(1, "Iron Sword")])
+    with pytest.raises(SystemExit, match="expected a _en.<ext> STRINGS file name"):
+        run("--input", str(tmp_path / "en" / "skyrim.STRINGS"))
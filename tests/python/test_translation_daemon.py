@@ -0,0 +1,100 @@
+import argparse
+import http.client
+import json
+import stat
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import translation_daemon
+from translation_daemon import _Handler, daemon_token_path, read_daemon_token, serve, submit_job
+
+
+class FakeDaemon:
+    def __init__(self):
+        self.jobs = []
+
+    def run_job(self, job, emit):
+        self.jobs.append(job)
+        emit({"event": "exit", "code": 0})
+
+
+@pytest.fixture
+def server():
+    fake = FakeDaemon()
+    handler = type("Handler", (_Handler,), {"daemon": fake, "token": "secret-token"})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1], fake
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _post(port, headers, body=b'{"argv": ["--help"]}'):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("POST", "/jobs", body=body, headers=headers)
+    resp = conn.getresponse()
+    status, data = resp.status, resp.read()
+    conn.close()
+    return status, data
+
+
+AUTH = {"Authorization": "Bearer secret-token"}
+JSON = {"Content-Type": "application/json"}
+
+
+def test_job_with_token_and_json_runs(server):
+    port, fake = server
+    status, data = _post(port, {**AUTH, **JSON})
+    assert status == 200
+    assert json.loads(data.splitlines()[-1]) == {"event": "exit", "code": 0}
+    assert fake.jobs == [{"argv": ["--help"]}]
+
+
+@pytest.mark.parametrize(
+    "headers,expected",
+    [
+        (JSON, 401),
+        ({**JSON, "Authorization": "Bearer wrong"}, 401),
+        ({**AUTH, "Content-Type": "text/plain"}, 415),
+        (AUTH, 415),
+        ({**AUTH, **JSON, "Origin": "https://example.com"}, 403),
+    ],
+)
+def test_rejected_requests_never_run_a_job(server, headers, expected):
+    port, fake = server
+    status, _data = _post(port, headers)
+    assert status == expected
+    assert fake.jobs == []
+
+
+def test_status_requires_token(server):
+    port, _fake = server
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/status")
+    assert conn.getresponse().status == 401
+    conn.close()
+
+
+def test_serve_rejects_non_loopback_listen(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    with pytest.raises(SystemExit, match="loopback"):
+        serve(argparse.Namespace(listen="0.0.0.0:8765"))
+    assert not daemon_token_path("0.0.0.0:8765").exists()
+
+
+def test_token_file_is_user_only_and_read_by_client(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    path = daemon_token_path("127.0.0.1:8765")
+    assert path == daemon_token_path(":8765")
+    token = translation_daemon._write_token(path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert read_daemon_token("127.0.0.1:8765") == token
+
+
+def test_client_without_token_file_fails_clearly(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    with pytest.raises(SystemExit, match="no access token"):
+        submit_job("127.0.0.1:1", {"argv": []}, lambda event: None)
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+
+import pytest
+
+from translation_job_queue import JobQueue
+
+BATCHES = [[{"id": 0, "src": "Iron Sword"}], [{"id": 1, "src": "Steel Sword"}]]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(tmp_path / "queue")
+    assert q.create({"input": "x.xml"}, BATCHES)
+    return q
+
+
+def _lease_file(q, n):
+    return q.leases_dir / f"{n:06d}.lease"
+
+
+def _expire(q, n, worker="dead"):
+    _lease_file(q, n).write_text(json.dumps({"worker": worker, "expires": time.time() - 1}), encoding="utf-8")
+
+
+def test_create_is_first_wins(queue):
+    assert queue.load_manifest()["batches"] == 2
+    assert not JobQueue(queue.queue_dir).create({"input": "other.xml"}, [])
+    assert queue.batch(1) == BATCHES[1]
+
+
+def test_live_lease_is_exclusive(queue):
+    assert queue.try_lease(0, "a", 60)
+    assert not queue.try_lease(0, "b", 60)
+    queue.release(0, "b")  # not the holder: no effect
+    assert not queue.try_lease(0, "b", 60)
+    queue.release(0, "a")
+    assert queue.try_lease(0, "b", 60)
+
+
+def test_expired_lease_is_reclaimed(queue):
+    _expire(queue, 0)
+    assert queue.try_lease(0, "b", 60)
+    assert json.loads(_lease_file(queue, 0).read_text(encoding="utf-8"))["worker"] == "b"
+    assert not list(queue.leases_dir.glob("*.stale-*"))
+
+
+def test_expired_lease_of_a_done_batch_is_not_retaken(queue):
+    queue.try_lease(0, "a", 60)
+    assert queue.complete(0, "a", {0: "철검"})
+    _expire(queue, 0)
+    assert not queue.try_lease(0, "b", 60)
+
+
+def test_reclaim_of_the_same_expired_lease_happens_once(queue):
+    _expire(queue, 0)
+    lease = _lease_file(queue, 0)
+    expired = lease.read_text(encoding="utf-8")
+    assert queue.try_lease(0, "b", 60)
+    # c still sees the expired lease (read before b replaced it): the takeover is already claimed.
+    lease.write_text(expired, encoding="utf-8")
+    assert not queue.try_lease(0, "c", 60)
+
+
+def test_half_written_lease_is_not_taken_over(queue):
+    # What a reader saw mid-write before leases were created atomically.
+    _lease_file(queue, 0).write_text("", encoding="utf-8")
+    assert not queue.try_lease(0, "b", 60)
+    assert queue.try_lease(0, "b", 0)
+
+
+def test_expired_lease_is_not_released_under_a_takeover(queue):
+    queue.try_lease(0, "a", 60)
+    _expire(queue, 0, worker="a")
+    queue.release(0, "a")
+    assert _lease_file(queue, 0).exists()
+    assert queue.try_lease(0, "b", 60)
+
+
+def test_concurrent_reclaim_has_one_winner(queue):
+    _expire(queue, 0)
+    barrier = threading.Barrier(8)
+    wins = []
+
+    def worker(name):
+        barrier.wait()
+        if queue.try_lease(0, name, 60):
+            wins.append(name)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(wins) == 1
+    assert json.loads(_lease_file(queue, 0).read_text(encoding="utf-8"))["worker"] == wins[0]
+
+
+def test_first_result_is_final(queue):
+    assert queue.complete(1, "a", {1: "강철 검"})
+    assert not queue.complete(1, "b", {1: "다른 번역"})
+    assert queue.results() == {1: "강철 검"}
+    assert queue.pending(2) == [0]
+    assert queue.try_finalize("a") and not queue.try_finalize("b")
+    assert queue.finalized_by() == "a"
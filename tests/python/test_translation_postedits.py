@@ -0,0 +1,72 @@
+import pytest
+
+from translation_postedits import PostEditPipeline, PostEditRule
+
+# Same inputs/expectations as KoreanTranslationFixerTests.cs, so the CLI and the app stay in step.
+CASES = [
+    ("체력 을(를) 흡수합니다.", "체력을 흡수합니다."),
+    ("매지카을(를) 흡수합니다.", "매지카를 흡수합니다."),
+    ("매지카(을)를 흡수합니다.", "매지카를 흡수합니다."),
+    ("체력은(는) 회복됩니다.", "체력은 회복됩니다."),
+    ("Aela은(는) 동료입니다.", "Aela는 동료입니다."),
+    ("매지카을 흡수합니다.", "매지카를 흡수합니다."),
+    ("블러드 을 흡수합니다.", "블러드를 흡수합니다."),
+    ("방패은 부서집니다.", "방패는 부서집니다."),
+    ("아니요. 저는은 솔리튜드에서 삽니다.", "아니요. 저는 솔리튜드에서 삽니다."),
+    ("체력에게 <mag>포인트의 피해를 입힙니다.", "체력에 <mag>포인트의 피해를 입힙니다."),
+    ("지구력에게서 <mag>포인트를 흡수합니다.", "지구력에서 <mag>포인트를 흡수합니다."),
+    ("늑대인간초 동안 <150>초 의 형상을 취합니다.", "<150>초 동안 늑대인간의 형상을 취합니다."),
+    (
+        "피해를 입으면 <25%> <5>초 동안 확률로 투명화 상태가 됩니다.",
+        "피해를 입으면 <25%> 확률로 <5>초 동안 투명화 상태가 됩니다.",
+    ),
+    (
+        "피해를 입으면 <25%> <5>초 동안 확률로 투명화하기 상태가 됩니다.",
+        "피해를 입으면 <25%> 확률로 <5>초 동안 투명화 상태가 됩니다.",
+    ),
+    (
+        "피해를 입을 시 <25%> 확률로 <5>초 동안 투명화하기 합니다.",
+        "피해를 입을 시 <25%> 확률로 <5>초 동안 투명화합니다.",
+    ),
+    ("습격이다! 무기를 물건 전달!", "습격이다! 무기를 내려!"),
+    (
+        "<15>포인트 체력포인트를 흡수하고 <7><3>초 동안 포인트초포인트의 출혈 피해를 입힙니다.",
+        "<15>포인트 체력을 흡수하고 <3>초 동안 <7>포인트의 출혈 피해를 입힙니다.",
+    ),
+    ("치명적인 마법부여 효과 효과가 적을 비틀거리게 합니다.", "치명적인 마법부여 효과가 적을 비틀거리게 합니다."),
+]
+
+
+@pytest.mark.parametrize("dest,expected", CASES)
+def test_matches_app_fixer(dest, expected):
+    assert PostEditPipeline("korean").fix("", dest) == expected
+
+
+def test_separated_subject_particle_before_value():
+    out = PostEditPipeline("korean").fix("", "중갑 가 <mag>포인트 강화됩니다.")
+    assert "중갑이" in out and "중갑 가" not in out
+
+
+def test_attributive_neun_is_not_a_topic_particle():
+    out = PostEditPipeline("korean").fix("", "달이 떠있는 동안 <mag> 의 피해를 입힙니다.")
+    assert "떠있는 동안" in out
+
+
+def test_non_korean_target_is_untouched():
+    assert PostEditPipeline("japanese").fix("", "매지카을 흡수합니다.") == "매지카을 흡수합니다."
+
+
+def test_fix_all_counts_changed_strings():
+    pipeline = PostEditPipeline("ko")
+    out = pipeline.fix_all([("", "방패은 부서집니다."), ("", "검을 듭니다."), ("", "Iron Sword")])
+    assert out == ["방패는 부서집니다.", "검을 듭니다.", "Iron Sword"]
+    assert pipeline.strings_changed == 1
+    assert pipeline.stats["korean_particles"].hits == 1
+
+
+def test_rules_must_implement_apply():
+    class NoApply(PostEditRule):
+        name = "no_apply"
+
+    with pytest.raises(TypeError):
+        NoApply()
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+import translate_xtranslator_xml_gemini as tx
+from translation_schedule import (
+    BACKGROUND_PRIORITY,
+    DEFAULT_PRIORITY,
+    ScheduleCheckpoint,
+    checkpoint_path_for_cache,
+    parse_priority_rules,
+    priority_for,
+    schedule_work,
+)
+
+
+def test_parse_priority_rules_puts_user_rules_first():
+    rules = parse_priority_rules(["mesg:desc=1, *:CNAM=9", "BOOK:DESC=3"])
+    assert rules[:3] == [("MESG:DESC", 1), ("*:CNAM", 9), ("BOOK:DESC", 3)]
+    assert priority_for("BOOK:DESC", rules) == 3
+    assert priority_for("weap:full", rules) == 0
+    assert priority_for("NPC_:DESC", rules) == DEFAULT_PRIORITY
+
+
+@pytest.mark.parametrize("value", ["BOOK:DESC", "=3", "BOOK:DESC=x"])
+def test_parse_priority_rules_rejects_bad_items(value):
+    with pytest.raises(SystemExit):
+        parse_priority_rules([value])
+
+
+def _item(idx, rec, src="text"):
+    return {"id": idx, "rec": rec, "src": src}
+
+
+def test_schedule_work_is_stable_and_sends_long_text_to_the_background():
+    work = [
+        _item(0, "BOOK:DESC"),
+        _item(1, "NPC_:DESC"),
+        _item(2, "WEAP:FULL"),
+        _item(3, "MESG:DESC", "x" * 50),
+        _item(4, "ARMO:FULL"),
+        _item(5, "SPEL:DESC"),
+    ]
+    ordered = schedule_work(work, parse_priority_rules(None), long_text_chars=40)
+    assert [it["id"] for it in ordered] == [2, 4, 5, 1, 0, 3]
+    assert [it["background"] for it in ordered] == [False, False, False, False, True, True]
+    assert ordered[-1]["priority"] == BACKGROUND_PRIORITY
+
+
+def test_chunk_work_never_mixes_priorities():
+    work = schedule_work(
+        [_item(i, rec) for i, rec in enumerate(["WEAP:FULL", "NPC_:DESC", "ARMO:FULL", "BOOK:DESC"])],
+        parse_priority_rules(None),
+        long_text_chars=0,
+    )
+    for it in work:
+        it["masked"] = it["src"]
+    batches = list(tx.chunk_work(work, batch_size=10, max_chars=10_000))
+    assert [[it["id"] for it in batch] for batch in batches] == [[0, 2], [1], [3]]
+
+
+def test_checkpoint_counts_by_priority_and_record(tmp_path):
+    path = checkpoint_path_for_cache(tmp_path / "mod.xml.gemini_cache.jsonl")
+    assert path.name == "mod.xml.gemini_progress.json"
+    work = schedule_work([_item(0, "WEAP:FULL"), _item(1, "BOOK:DESC"), _item(2, "")], parse_priority_rules(None), long_text_chars=0)
+    checkpoint = ScheduleCheckpoint(path, work, source="mod.xml", interval_s=3600)
+    checkpoint.mark_done(work[0])
+    checkpoint.save("interrupted")
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["status"] == "interrupted"
+    assert (saved["done"], saved["total"]) == (1, 3)
+    assert saved["priorities"] == {"0": [1, 1], "5": [0, 1], "9": [0, 1]}
+    assert saved["records"] == {"?": [0, 1], "BOOK:DESC": [0, 1], "WEAP:FULL": [1, 1]}
+    assert checkpoint.summary_line() == "[schedule] p0=1/1 p5=0/1 p9=0/1"
+
+
+class FakeClient:
+    calls: list[str] = []
+
+    def __init__(self, **_kwargs):
+        pass
+
+    @staticmethod
+    def _reply(prompt):
+        items = json.loads(prompt.split("Input JSON:\n", 1)[1])["items"]
+        return json.dumps({"translations": [{"id": it["id"], "text": "번역 " + it["text"]} for it in items]}, ensure_ascii=False)
+
+    def generate_text(self, *, prompt, **_kwargs):
+        self.calls.append("generate")
+        return self._reply(prompt)
+
+    def stream_text(self, *, prompt, **_kwargs):
+        self.calls.append("stream")
+        yield self._reply(prompt)
+
+
+XML = """<?xml version="1.0" encoding="UTF-8"?>
+<SSTXMLRessources>
+  <Params><Source>english</Source><Dest>korean</Dest></Params>
+  <Content>
+    <String><REC>BOOK:DESC</REC><Source>A long book.</Source><Dest>A long book.</Dest></String>
+    <String><REC>WEAP:FULL</REC><Source>Iron Sword</Source><Dest>Iron Sword</Dest></String>
+  </Content>
+</SSTXMLRessources>
+"""
+
+
+def test_queue_worker_streams_background_batches(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(tx, "GeminiClient", FakeClient)
+    FakeClient.calls = []
+    source = tmp_path / "mod.xml"
+    source.write_text(XML, encoding="utf-8")
+    argv = ["--input", str(source), "--queue", str(tmp_path / "queue"), "--api-key", "key-test1234", "--no-term-memory"]
+    assert tx.main(argv) == 0
+    rows = [row for path in sorted((tmp_path / "queue" / "batches").iterdir()) for row in json.loads(path.read_text("utf-8"))]
+    assert [(row["rec"], row["priority"], row["background"]) for row in rows] == [("WEAP:FULL", 0, False), ("BOOK:DESC", 9, True)]
+    assert FakeClient.calls == ["generate", "stream"]
+    assert "번역 A long book." in (tmp_path / "mod.xml.translated.xml").read_text("utf-8")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Headless worker for the app's project database (`ProjectDb`, SQLite).
+
+Pending `StringEntry` rows are claimed in batches (Pending -> InProgress inside one short write
+transaction), translated with the same pipeline as `translate_xtranslator_xml_gemini.py` (placeholder
+masking, JSONL cache, validation, Korean post-edits), and written back with one `executemany` per batch.
+The connection uses the app's pragmas (WAL, busy_timeout=5000, synchronous=NORMAL), and no transaction
+is held open across an API call, so the GUI can keep reading and editing the same project meanwhile.
+The schema is never created or altered here.
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from korean_josa import JosaFixer
+from session_terms import SessionTermMemory, terms_path_for_cache
+from translate_xtranslator_xml_gemini import (
+    Cache,
+    GeminiClient,
+    KeyPool,
+    TranslationError,
+    _cache_key,
+    _finalize_translation,
+    add_cassette_arguments,
+    add_key_pool_arguments,
+    cassette_from_args,
+    chunk_work,
+    key_pool_from_args,
+    mask_placeholders,
+    report_key_pool,
+    translate_batch,
+    translate_batch_streaming,
+)
+from translation_postedits import PostEditPipeline, is_korean_language
+
+# XTranslatorAi.Core.Models.StringEntryStatus
+STATUS_PENDING = 0
+STATUS_IN_PROGRESS = 1
+STATUS_DONE = 2
+STATUS_SKIPPED = 3
+STATUS_ERROR = 4
+STATUS_EDITED = 5
+
+DEFAULT_MODEL = "gemini-2.5-flash-lite"
+
+
+def _utc_now() -> str:
+    """UTC timestamp in .NET's round-trip ("O") format, as the app writes UpdatedAt."""
+    now = datetime.now(timezone.utc)
+    return f"{now:%Y-%m-%dT%H:%M:%S}.{now.microsecond:06d}0+00:00"
+
+
+def open_project_db(path: Path) -> sqlite3.Connection:
+    if not path.is_file():
+        raise SystemExit(f"missing project db: {path}")
+    # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE and kept short.
+    conn = sqlite3.connect(path, isolation_level=None, timeout=5.0)
+    conn.execute("PRAGMA busy_timeout=5000;")
+    try:
+        conn.execute("PRAGMA journal_mode=WAL;")
+    except sqlite3.OperationalError:
+        conn.execute("PRAGMA journal_mode=DELETE;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='StringEntry'").fetchone() is None:
+        conn.close()
+        raise SystemExit(f"not a project db (no StringEntry table): {path}")
+    return conn
+
+
+def read_project_settings(conn: sqlite3.Connection) -> tuple[str, str, str | None]:
+    """(SourceLang, DestLang, ModelName) of the project row, with the CLI's defaults when absent."""
+    row = conn.execute("SELECT SourceLang, DestLang, ModelName FROM Project WHERE Id=1").fetchone()
+    if row is None:
+        return "english", "korean", None
+    src_lang, dst_lang, model = row
+    return src_lang or "english", dst_lang or "korean", model or None
+
+
+def count_by_status(conn: sqlite3.Connection) -> dict[int, int]:
+    return dict(conn.execute("SELECT Status, COUNT(*) FROM StringEntry GROUP BY Status").fetchall())
+
+
+def reset_in_progress(conn: sqlite3.Connection) -> int:
+    """InProgress -> Pending for rows left behind by a killed run (same as the app's ResetInProgressToPendingAsync)."""
+    cur = conn.execute(
+        "UPDATE StringEntry SET Status=?, ErrorMessage=NULL, UpdatedAt=? WHERE Status=?",
+        (STATUS_PENDING, _utc_now(), STATUS_IN_PROGRESS),
+    )
+    return cur.rowcount
+
+
+def claim_pending(conn: sqlite3.Connection, limit: int) -> list[tuple[int, str, str]]:
+    """Atomically move up to `limit` Pending rows (in OrderIndex order) to InProgress and return (Id, SourceText, REC)."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute(
+            "SELECT Id, SourceText, COALESCE(REC, '') FROM StringEntry WHERE Status=? ORDER BY OrderIndex LIMIT ?",
+            (STATUS_PENDING, limit),
+        ).fetchall()
+        now = _utc_now()
+        conn.executemany(
+            "UPDATE StringEntry SET Status=?, ErrorMessage=NULL, UpdatedAt=? WHERE Id=? AND Status=?",
+            [(STATUS_IN_PROGRESS, now, row_id, STATUS_PENDING) for row_id, _src, _rec in rows],
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return rows
+
+
+def write_results(conn: sqlite3.Connection, results: list[tuple[int, str, int, str | None]]) -> None:
+    """Write (Id, DestText, Status, ErrorMessage) rows in one transaction; rows the app changed meanwhile are left alone."""
+    if not results:
+        return
+    now = _utc_now()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "UPDATE StringEntry SET DestText=?, Status=?, ErrorMessage=?, UpdatedAt=? WHERE Id=? AND Status=?",
+            [(dst, status, err, now, row_id, STATUS_IN_PROGRESS) for row_id, dst, status, err in results],
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def release_claimed(conn: sqlite3.Connection, ids: list[int]) -> None:
+    """Return still-InProgress rows to Pending (interrupted run)."""
+    if not ids:
+        return
+    now = _utc_now()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "UPDATE StringEntry SET Status=?, UpdatedAt=? WHERE Id=? AND Status=?",
+            [(STATUS_PENDING, now, row_id, STATUS_IN_PROGRESS) for row_id in ids],
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Translate Pending strings of a Tullius Translator project DB (SQLite) using Gemini, without the GUI.",
+    )
+    parser.add_argument("--db", required=True, type=Path, help="Project database file (*.sqlite) created by the app")
+    parser.add_argument("--model", default=None, help=f"Gemini model name (default: the project's model, else {DEFAULT_MODEL})")
+    add_key_pool_arguments(parser)
+    add_cassette_arguments(parser)
+    parser.add_argument("--claim-size", type=int, default=200, help="Pending rows claimed per transaction")
+    parser.add_argument("--batch-size", type=int, default=20, help="Strings per API request")
+    parser.add_argument("--max-chars", type=int, default=12000, help="Max characters per API request")
+    parser.add_argument("--max-output-tokens", type=int, default=8192, help="Gemini max output tokens")
+    parser.add_argument("--temperature", type=float, default=0.2, help="Gemini temperature")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per batch")
+    parser.add_argument("--sleep", type=float, default=0.0, help="Sleep seconds between API requests")
+    parser.add_argument("--limit", type=int, default=0, help="Translate at most N rows in this run (0=all)")
+    parser.add_argument("--cache", type=Path, default=None, help="JSONL cache file path (default: <db>.gemini_cache.jsonl)")
+    parser.add_argument(
+        "--reset-in-progress",
+        action="store_true",
+        help="First return InProgress rows left by a killed run to Pending (do not use while another worker runs)",
+    )
+    parser.add_argument("--no-post-edit", action="store_true", help="Write raw model output (skip the Korean post-edit fixers)")
+    parser.add_argument("--josa", action="store_true", help="Fix Korean particles after numeric placeholders/numbers/names")
+    parser.add_argument("--stream", action="store_true", help="Use streamGenerateContent and re-queue only missing ids")
+    parser.add_argument("--compact-prompt", action="store_true", help="Short markers, batch-local ids and minimal JSON per request")
+    parser.add_argument("--no-term-memory", action="store_true", help="Do not learn term translations or add them to later prompts")
+    parser.add_argument("--reset-term-memory", action="store_true", help="Delete the saved terms file before the run and start over")
+    parser.add_argument("--dry-run", action="store_true", help="Report status counts, but do not claim rows or call the API")
+    args = parser.parse_args(argv)
+
+    cassette = cassette_from_args(args)
+    key_pool = KeyPool(["replay"], rpm=args.rpm, tpm=args.tpm) if cassette and cassette.replay else key_pool_from_args(args)
+    if key_pool is None and not args.dry_run:
+        print("Missing Gemini API key. Set GEMINI_API_KEY or pass --api-key.", file=sys.stderr)
+        return 2
+
+    conn = open_project_db(args.db)
+    src_lang, dst_lang, project_model = read_project_settings(conn)
+    model = args.model or project_model or DEFAULT_MODEL
+    counts = count_by_status(conn)
+    print(
+        f"Loaded {args.db} ({sum(counts.values())} strings, {src_lang} -> {dst_lang}, model {model}). "
+        f"Pending: {counts.get(STATUS_PENDING, 0)}. InProgress: {counts.get(STATUS_IN_PROGRESS, 0)}. "
+        f"Done: {counts.get(STATUS_DONE, 0) + counts.get(STATUS_EDITED, 0)}. Error: {counts.get(STATUS_ERROR, 0)}.",
+        file=sys.stderr,
+    )
+    if args.dry_run:
+        conn.close()
+        return 0
+
+    if args.reset_in_progress:
+        print(f"Reset {reset_in_progress(conn)} InProgress row(s) to Pending.", file=sys.stderr)
+
+    cache_path = args.cache or args.db.with_suffix(args.db.suffix + ".gemini_cache.jsonl")
+    cache = Cache.load(cache_path)
+    terms = None
+    if not args.no_term_memory:
+        terms = SessionTermMemory.load(terms_path_for_cache(cache_path), reset=args.reset_term_memory)
+    client = GeminiClient(model=model, key_pool=key_pool, cassette=cassette)
+    josa = JosaFixer() if args.josa and is_korean_language(dst_lang) else None
+    pipeline = None if args.no_post_edit else PostEditPipeline(dst_lang)
+    if pipeline is not None and not pipeline.enabled:
+        pipeline = None
+
+    translated = from_cache = failed = 0
+    claimed: list[int] = []
+    try:
+        while not args.limit or translated + from_cache + failed < args.limit:
+            claim = args.claim_size
+            if args.limit:
+                claim = min(claim, args.limit - (translated + from_cache + failed))
+            rows = claim_pending(conn, claim)
+            if not rows:
+                break
+            claimed = [row_id for row_id, _src, _rec in rows]
+
+            # row id -> (DestText, Status, ErrorMessage); filled from the cache first, then from the API.
+            done: dict[int, tuple[str, int, str | None]] = {}
+            sources = {row_id: src_text for row_id, src_text, _rec in rows}
+            work: list[dict[str, Any]] = []
+            for row_id, src_text, rec in rows:
+                if not src_text.strip():
+                    done[row_id] = (src_text, STATUS_SKIPPED, None)
+                    continue
+                key = _cache_key(model=model, src_lang=src_lang, dst_lang=dst_lang, source_text=src_text)
+                cached, _promoted = cache.lookup(key, src_text)
+                if cached is not None:
+                    done[row_id] = (cached, STATUS_DONE, None)
+                    from_cache += 1
+                    if terms is not None:
+                        terms.learn(src_text, cached, rec)
+                    continue
+                masked, placeholder_map = mask_placeholders(src_text, compact=args.compact_prompt)
+                work.append(
+                    {"id": row_id, "src": src_text, "rec": rec, "key": key, "masked": masked, "placeholders": placeholder_map}
+                )
+
+            for batch_items in chunk_work(work, batch_size=args.batch_size, max_chars=args.max_chars):
+                by_id = {it["id"]: it for it in batch_items}
+                payload_items = [{"id": it["id"], "text": it["masked"]} for it in batch_items]
+
+                def accept(item_id: int, raw_t: str) -> None:
+                    nonlocal translated
+                    it = by_id[item_id]
+                    out_t = _finalize_translation(it, raw_t, josa=josa)
+                    cache.append(key=it["key"], dst=out_t)
+                    done[item_id] = (out_t, STATUS_DONE, None)
+                    translated += 1
+                    if terms is not None:
+                        terms.learn(it["src"], out_t, it["rec"])
+
+                def reject(item_id: int, e: TranslationError) -> None:
+                    # Only this row is marked Error; the rest of the batch is still translated.
+                    done[item_id] = ("", STATUS_ERROR, str(e))
+
+                try:
+                    if args.stream:
+                        translate_batch_streaming(
+                            client=client,
+                            src_lang=src_lang,
+                            dst_lang=dst_lang,
+                            batch=payload_items,
+                            temperature=args.temperature,
+                            max_output_tokens=args.max_output_tokens,
+                            retries=args.retries,
+                            on_item=accept,
+                            compact=args.compact_prompt,
+                            terms=terms,
+                            on_failed=reject,
+                        )
+                    else:
+                        result = translate_batch(
+                            client=client,
+                            src_lang=src_lang,
+                            dst_lang=dst_lang,
+                            batch=payload_items,
+                            temperature=args.temperature,
+                            max_output_tokens=args.max_output_tokens,
+                            retries=args.retries,
+                            compact=args.compact_prompt,
+                            terms=terms,
+                            on_failed=reject,
+                        )
+                        for item_id, raw_t in result.items():
+                            try:
+                                accept(item_id, raw_t)
+                            except TranslationError as e:
+                                reject(item_id, e)
+                except TranslationError as e:
+                    # Whatever the batch could not produce is marked Error (the app can retry those rows).
+                    for it in batch_items:
+                        done.setdefault(it["id"], ("", STATUS_ERROR, str(e)))
+
+                if args.sleep:
+                    time.sleep(args.sleep)
+
+            ok_ids = [row_id for row_id, (_dst, status, _err) in done.items() if status == STATUS_DONE]
+            if pipeline is not None and ok_ids:
+                fixed = pipeline.fix_all((sources[row_id], done[row_id][0]) for row_id in ok_ids)
+                for row_id, text in zip(ok_ids, fixed):
+                    done[row_id] = (text, STATUS_DONE, None)
+            failed += sum(1 for _dst, status, _err in done.values() if status == STATUS_ERROR)
+
+            write_results(conn, [(row_id, dst, status, err) for row_id, (dst, status, err) in done.items()])
+            claimed = []
+            print(
+                f"Translated {translated}, from cache {from_cache}, errors {failed}...",
+                file=sys.stderr,
+            )
+    except KeyboardInterrupt:
+        release_claimed(conn, claimed)
+        print(f"Interrupted; returned {len(claimed)} claimed row(s) to Pending.", file=sys.stderr)
+        return 130
+    except BaseException:
+        release_claimed(conn, claimed)
+        raise
+    finally:
+        report_key_pool(key_pool)
+        if cassette is not None:
+            print(cassette.report_line(), file=sys.stderr)
+        if josa is not None:
+            print(josa.report_line(), file=sys.stderr)
+        if terms is not None:
+            print(terms.report_line(), file=sys.stderr)
+        if pipeline is not None:
+            for line in pipeline.report_lines():
+                print(line, file=sys.stderr)
+        conn.close()
+
+    print(
+        f"Done. Translated: {translated}. From cache: {from_cache}. Errors: {failed}. DB: {args.db}",
+        file=sys.stderr,
+    )
+    print(f"Cache: {cache_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
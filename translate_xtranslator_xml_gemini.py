@@ -2,24 +2,54 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import hashlib
 import json
-import os
 import re
 import sys
 import time
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator
 
 import requests
 
-
-PLACEHOLDER_RE = re.compile(
-    r"(\r\n|\r|\n|[+-]?<[^>]+>|\[pagebreak\]|%[-0-9.]*[A-Za-z])",
-    flags=re.IGNORECASE,
+from gemini_cassette import Cassette, CassetteMiss, RecordingStream, request_hash
+from gemini_key_pool import (
+    ApiKeyState,
+    KeyPool,
+    _lock_file,
+    default_usage_path,
+    estimate_tokens,
+    parse_retry_after,
+    split_api_keys,
+)
+from korean_josa import JosaFixer
+from session_terms import SessionTermMemory, terms_path_for_cache
+from scripts.bethesda_strings import (
+    STRINGS_LOCALE_LANGUAGES,
+    StringsTable,
+    is_strings_file,
+    iter_strings_files,
+    open_strings_file,
+    rebuild_strings,
+    write_strings_file,
 )
+from scripts.placeholder_tokens import PLACEHOLDER_RE
+from translation_job_queue import JobQueue, default_worker_id
+from translation_postedits import PostEditPipeline, is_korean_language
+from translation_schedule import (
+    DEFAULT_LONG_TEXT_CHARS,
+    ScheduleCheckpoint,
+    checkpoint_path_for_cache,
+    parse_priority_rules,
+    schedule_work,
+)
+
+
+DEFAULT_DAEMON_ADDRESS = "127.0.0.1:8765"
 
 
 class TranslationError(RuntimeError):
@@ -46,8 +76,16 @@ def _cache_key(*, model: str, src_lang: str, dst_lang: str, source_text: str) ->
     return h.hexdigest()
 
 
-def mask_placeholders(text: str) -> tuple[str, dict[str, str]]:
+# Compact marker letters for the semantic labels: {M0} = <mag>, {D1} = <dur>, {N2} = <number>, {3} = other.
+COMPACT_MARKER_LETTERS = {"MAG": "M", "DUR": "D", "NUM": "N"}
+
+_APPROX_TOKEN_RE = re.compile(r"[A-Za-z]+|[0-9]|\S")
+
+
+def mask_placeholders(text: str, *, compact: bool = False) -> tuple[str, dict[str, str]]:
     placeholder_map: dict[str, str] = {}
+    # Short markers only when the text has no braces of its own, so a marker can never match literal text.
+    compact = compact and "{" not in text and "}" not in text
 
     def repl(match: re.Match[str]) -> str:
         idx = len(placeholder_map)
@@ -56,7 +94,10 @@ def mask_placeholders(text: str) -> tuple[str, dict[str, str]]:
 
         original = match.group(0)
         label = _semantic_label_for_placeholder(original)
-        marker = f"__XT_PH_{label}_{idx:04d}__" if label else f"__XT_PH_{idx:04d}__"
+        if compact:
+            marker = f"{{{COMPACT_MARKER_LETTERS[label]}{idx}}}" if label else f"{{{idx}}}"
+        else:
+            marker = f"__XT_PH_{label}_{idx:04d}__" if label else f"__XT_PH_{idx:04d}__"
         placeholder_map[marker] = original
         return marker
 
@@ -115,6 +156,72 @@ def parse_model_json(text: str) -> Any:
         raise
 
 
+class StreamingTranslationsParser:
+    """
+    Incremental parser for the `{"translations":[{"id":..,"text":..}, ...]}` response shape.
+
+    Chunks are fed as they arrive; each item object is returned as soon as its closing brace is seen,
+    so callers can accept results before the whole body (or a truncated tail) has been received.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._item_start: int | None = None
+        self._item_depth = 0
+
+    def feed(self, chunk: str) -> list[tuple[int, str]]:
+        out: list[tuple[int, str]] = []
+        base = len(self._buf)
+        self._buf += chunk
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch == "{" or ch == "[":
+                if ch == "{" and self._item_start is None and self._stack and self._stack[-1] == "[":
+                    self._item_start = base + i
+                    self._item_depth = len(self._stack)
+                self._stack.append(ch)
+            elif ch == "}" or ch == "]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._item_start is not None and len(self._stack) == self._item_depth:
+                    item = _decode_stream_item(self._buf[self._item_start : base + i + 1])
+                    if item is not None:
+                        out.append(item)
+                    self._item_start = None
+
+        if self._item_start is None:
+            # Nothing is pending, so the consumed text is no longer needed.
+            self._buf = ""
+        return out
+
+
+def _decode_stream_item(raw: str) -> tuple[int, str] | None:
+    try:
+        obj = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(obj, dict):
+        return None
+    item_id = obj.get("id")
+    t = obj.get("text")
+    if isinstance(item_id, int) and isinstance(t, str):
+        return item_id, t
+    return None
+
+
 def read_xml_prolog(path: Path) -> tuple[bytes, bytes]:
     data = path.read_bytes()[:2048]
     bom = b"\xef\xbb\xbf" if data.startswith(b"\xef\xbb\xbf") else b""
@@ -134,14 +241,37 @@ def write_xml(path: Path, root: ET.Element, *, bom: bytes, prolog: bytes) -> Non
         f.write(xml_body)
 
 
+# Cache.load suggests `gemini_cache_tool.py compact` once this many lines (and over half of them) are stale.
+CACHE_STALE_HINT_LINES = 5000
+
+
+@contextlib.contextmanager
+def cache_write_lock(path: Path) -> Iterator[bool]:
+    """Hold `<cache>.lock` while writing; `gemini_cache_tool.py compact` takes it around its rewrite."""
+    lock_path = path.with_name(path.name + ".lock")
+    locked = _lock_file(lock_path)
+    try:
+        # If the lock stays busy past the timeout, write anyway rather than drop a paid-for translation.
+        yield locked
+    finally:
+        if locked:
+            lock_path.unlink(missing_ok=True)
+
+
 @dataclass
 class Cache:
     path: Path
     items: dict[str, str]
+    # Translations promoted from another model (`gemini_cache_tool.py promote`); only used after
+    # `validate_translation` accepts them for the string at hand.
+    fallback: dict[str, str] = field(default_factory=dict)
+    lines: int = 0
 
     @classmethod
     def load(cls, path: Path) -> "Cache":
         items: dict[str, str] = {}
+        fallback: dict[str, str] = {}
+        lines = 0
         if not path.exists():
             return cls(path=path, items=items)
         with path.open("r", encoding="utf-8") as f:
@@ -149,6 +279,7 @@ class Cache:
                 line = line.strip()
                 if not line:
                     continue
+                lines += 1
                 try:
                     obj = json.loads(line)
                 except json.JSONDecodeError:
@@ -156,13 +287,33 @@ class Cache:
                 key = obj.get("key")
                 dst = obj.get("dst")
                 if isinstance(key, str) and isinstance(dst, str):
-                    items[key] = dst
-        return cls(path=path, items=items)
+                    if "fallback" in obj:
+                        fallback[key] = dst
+                    else:
+                        items[key] = dst
+        stale = lines - len(items) - len(fallback)
+        if stale >= CACHE_STALE_HINT_LINES and stale * 2 > lines:
+            print(
+                f"[cache] {stale} of {lines} lines in {path} are superseded; "
+                f"`python3 gemini_cache_tool.py compact {path}` shrinks it",
+                file=sys.stderr,
+            )
+        return cls(path=path, items=items, fallback=fallback, lines=lines)
+
+    def lookup(self, key: str, source_text: str) -> tuple[str | None, bool]:
+        """(translation, from_fallback): this model's entry, else a promoted one that validates for `source_text`."""
+        dst = self.items.get(key)
+        if dst is not None:
+            return dst, False
+        dst = self.fallback.get(key)
+        if dst is not None and validate_translation(source_text, dst) is None:
+            return dst, True
+        return None, False
 
     def append(self, *, key: str, dst: str) -> None:
         self.items[key] = dst
         record = {"key": key, "dst": dst}
-        with self.path.open("a", encoding="utf-8") as f:
+        with cache_write_lock(self.path), self.path.open("a", encoding="utf-8") as f:
             f.write(json.dumps(record, ensure_ascii=False) + "\n")
 
 
@@ -170,17 +321,28 @@ class GeminiClient:
     def __init__(
         self,
         *,
-        api_key: str,
+        api_key: str | None = None,
         model: str,
         timeout_s: float = 60.0,
         base_url: str = "https://generativelanguage.googleapis.com/v1beta",
+        key_pool: KeyPool | None = None,
+        cassette: Cassette | None = None,
     ) -> None:
+        if key_pool is None:
+            if not api_key and not (cassette and cassette.replay):
+                raise ValueError("GeminiClient needs api_key or key_pool")
+            key_pool = KeyPool([api_key or "replay"])
+        self.key_pool = key_pool
+        self.cassette = cassette
+        self._model = model
         self._timeout_s = timeout_s
         self._session = requests.Session()
-        self._url = f"{base_url}/models/{model}:generateContent?key={api_key}"
+        self._url = f"{base_url}/models/{model}:generateContent?key="
+        self._stream_url = f"{base_url}/models/{model}:streamGenerateContent?alt=sse&key="
 
-    def generate_text(self, *, prompt: str, temperature: float, max_output_tokens: int) -> str:
-        payload = {
+    @staticmethod
+    def _build_payload(*, prompt: str, temperature: float, max_output_tokens: int) -> dict[str, Any]:
+        return {
             "contents": [{"role": "user", "parts": [{"text": prompt}]}],
             "generationConfig": {
                 "temperature": temperature,
@@ -194,22 +356,170 @@ class GeminiClient:
                 {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
             ],
         }
-        resp = self._session.post(self._url, json=payload, timeout=self._timeout_s)
+
+    @staticmethod
+    def _used_tokens(data: dict[str, Any]) -> int | None:
+        total = (data.get("usageMetadata") or {}).get("totalTokenCount")
+        return total if isinstance(total, int) else None
+
+    def _fail(self, key: ApiKeyState, ticket: int, resp: requests.Response) -> GeminiError:
+        retry_after = parse_retry_after(resp.headers, resp.text) if resp.status_code == 429 else None
+        self.key_pool.release(key, ticket, status=resp.status_code, retry_after=retry_after)
+        return GeminiError(f"Gemini API error HTTP {resp.status_code} (key {key.label}): {resp.text[:500]}")
+
+    def _post(self, kind: str, url: str, payload: dict[str, Any], *, stream: bool = False) -> Any:
+        """POST, or answer from / save to the cassette when recording or replaying."""
+        if self.cassette is None:
+            return self._session.post(url, json=payload, timeout=self._timeout_s, stream=stream)
+        cassette_key = request_hash(kind, self._model, payload)
+        if self.cassette.replay:
+            replayed = self.cassette.load(cassette_key)
+            if not stream:
+                replayed.wait()
+            return replayed
+        started = time.monotonic()
+        resp = self._session.post(url, json=payload, timeout=self._timeout_s, stream=stream)
+        if stream:
+            return RecordingStream(self.cassette, cassette_key, resp, started)
+        self.cassette.save(
+            cassette_key,
+            status=resp.status_code,
+            body=resp.text,
+            retry_after=resp.headers.get("Retry-After"),
+            latency_s=time.monotonic() - started,
+        )
+        return resp
+
+    def generate_text(self, *, prompt: str, temperature: float, max_output_tokens: int) -> str:
+        payload = self._build_payload(prompt=prompt, temperature=temperature, max_output_tokens=max_output_tokens)
+        key, ticket = self.key_pool.acquire(estimate_tokens(prompt))
+        try:
+            resp = self._post("generate", self._url + key.key, payload)
+        except (requests.RequestException, CassetteMiss):
+            self.key_pool.release(key, ticket, status=0)
+            raise
         if resp.status_code != 200:
-            raise GeminiError(f"Gemini API error HTTP {resp.status_code}: {resp.text[:500]}")
-        data = resp.json()
+            raise self._fail(key, ticket, resp)
+        try:
+            data = resp.json()
+        except ValueError as e:
+            self.key_pool.release(key, ticket, status=200)
+            raise GeminiError(f"Malformed Gemini response: {resp.text[:500]}") from e
+        self.key_pool.release(key, ticket, status=200, used_tokens=self._used_tokens(data))
         try:
             return data["candidates"][0]["content"]["parts"][0]["text"]
         except Exception as e:  # noqa: BLE001
             raise GeminiError(f"Unexpected Gemini response shape: {json.dumps(data)[:500]}") from e
 
+    def stream_text(self, *, prompt: str, temperature: float, max_output_tokens: int) -> Iterator[str]:
+        """Yield response text deltas from `streamGenerateContent` (SSE) as they arrive."""
+        payload = self._build_payload(prompt=prompt, temperature=temperature, max_output_tokens=max_output_tokens)
+        key, ticket = self.key_pool.acquire(estimate_tokens(prompt))
+        used: int | None = None
+        status = 0
+        try:
+            with self._post("stream", self._stream_url + key.key, payload, stream=True) as resp:
+                if resp.status_code != 200:
+                    status = -1
+                    raise self._fail(key, ticket, resp)
+                resp.encoding = "utf-8"
+                for line in resp.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    try:
+                        data = json.loads(line[5:].strip())
+                    except json.JSONDecodeError as e:
+                        raise GeminiError(f"Malformed Gemini stream event: {line[:500]}") from e
+                    used = self._used_tokens(data) or used
+                    for cand in data.get("candidates") or []:
+                        for part in (cand.get("content") or {}).get("parts") or []:
+                            t = part.get("text")
+                            if isinstance(t, str) and t:
+                                yield t
+                status = 200
+        finally:
+            # status -1: already released by _fail; 0: the connection or stream broke off.
+            if status >= 0:
+                self.key_pool.release(key, ticket, status=status, used_tokens=used)
+
+
+def add_key_pool_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--api-key",
+        action="append",
+        default=None,
+        help="Gemini API key; repeat or comma-separate for a key pool (or set GEMINI_API_KEYS / GEMINI_API_KEY)",
+    )
+    parser.add_argument("--rpm", type=float, default=0, help="Requests per minute allowed per key (0=unlimited)")
+    parser.add_argument("--tpm", type=float, default=0, help="Tokens per minute allowed per key (0=unlimited)")
+    parser.add_argument(
+        "--daily-requests",
+        type=int,
+        default=0,
+        help="Requests per day allowed per key, counted across runs (0=unlimited)",
+    )
+
 
-def build_batch_prompt(*, src_lang: str, dst_lang: str, items: list[dict[str, Any]]) -> str:
-    input_json = {
+def add_cassette_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", type=Path, default=None, metavar="DIR", help="Save every Gemini request/response (with latency) to DIR")
+    group.add_argument(
+        "--replay",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Answer Gemini requests from a --record DIR instead of the network (no API key needed)",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        default=0.0,
+        metavar="F",
+        help="--replay: wait F times the recorded latency per request (0=none, 1=as recorded; default: 0)",
+    )
+
+
+def cassette_from_args(args: argparse.Namespace) -> Cassette | None:
+    if args.replay is not None:
+        return Cassette(args.replay, replay=True, latency_scale=args.replay_latency)
+    if args.record is not None:
+        return Cassette(args.record, replay=False)
+    return None
+
+
+def key_pool_from_args(args: argparse.Namespace) -> KeyPool | None:
+    """KeyPool for the parsed `add_key_pool_arguments` flags, or None when no key is configured."""
+    keys = split_api_keys(args.api_key)
+    if not keys:
+        return None
+    return KeyPool(keys, rpm=args.rpm, tpm=args.tpm, daily_requests=args.daily_requests, usage_path=default_usage_path())
+
+
+def report_key_pool(pool: KeyPool) -> None:
+    pool.save_usage()
+    if len(pool.keys) > 1 or any(k.rate_limited for k in pool.keys):
+        for line in pool.report_lines():
+            print(line, file=sys.stderr)
+
+
+def build_batch_prompt(
+    *,
+    src_lang: str,
+    dst_lang: str,
+    items: list[dict[str, Any]],
+    compact: bool = False,
+    terms: list[tuple[str, str]] | None = None,
+) -> str:
+    """`terms`: (source, target) pairs the model must reuse, e.g. from `SessionTermMemory.pairs_for`."""
+    if compact:
+        return _build_compact_batch_prompt(src_lang=src_lang, dst_lang=dst_lang, items=items, terms=terms)
+    input_json: dict[str, Any] = {
         "source_language": src_lang,
         "target_language": dst_lang,
-        "items": items,
     }
+    if terms:
+        input_json["glossary"] = [{"source": src, "target": dst} for src, dst in terms]
+    input_json["items"] = items
     return (
         "You are a professional game localization translator.\n"
         f"Translate from {src_lang} to {dst_lang}.\n\n"
@@ -220,7 +530,8 @@ def build_batch_prompt(*, src_lang: str, dst_lang: str, items: list[dict[str, An
         "- Placeholder token hints: __XT_PH_MAG_####__ = magnitude/amount, __XT_PH_NUM_####__ = another numeric value (points/%/amount), __XT_PH_DUR_####__ = duration in seconds.\n"
         "- You MAY reorder numeric placeholder tokens (__XT_PH_MAG_####__, __XT_PH_NUM_####__, __XT_PH_DUR_####__) to create natural grammar, but do not reorder other tokens.\n"
         "- Do not add or remove line breaks; line breaks are represented as placeholder tokens.\n"
-        "- Output ONLY valid JSON, no markdown/code fences, no explanations.\n\n"
+        + ("- Translate every glossary term exactly as its glossary target (case-insensitive match; particles may follow).\n" if terms else "")
+        + "- Output ONLY valid JSON, no markdown/code fences, no explanations.\n\n"
         "Return JSON schema:\n"
         '{"translations":[{"id":0,"text":"..."}]}\n\n'
         "Input JSON:\n"
@@ -228,6 +539,39 @@ def build_batch_prompt(*, src_lang: str, dst_lang: str, items: list[dict[str, An
     )
 
 
+def _build_compact_batch_prompt(
+    *, src_lang: str, dst_lang: str, items: list[dict[str, Any]], terms: list[tuple[str, str]] | None = None
+) -> str:
+    """Short rules for the compact markers; items should carry batch-local ids (see `_localize_ids`)."""
+    long_markers = any("__XT_PH_" in it["text"] for it in items)
+    input_json: dict[str, Any] = {"terms": [[src, dst] for src, dst in terms]} if terms else {}
+    input_json["items"] = items
+    return (
+        f"Translate game text from {src_lang} to {dst_lang}.\n"
+        "Rules:\n"
+        "- Keep every {…} token"
+        + (" and __XT_PH_…__ token" if long_markers else "")
+        + " exactly, same count. {M0}=magnitude, {D0}=duration in seconds, {N0}=other number, {0}=markup or line break.\n"
+        "- {M}/{D}/{N} tokens may be reordered for natural grammar; keep other tokens in order.\n"
+        "- No raw markup (<p>, <img>, [pagebreak]); do not add or remove line breaks.\n"
+        + ("- Translate each terms[][0] as terms[][1].\n" if terms else "")
+        + "- Output only JSON: "
+        '{"translations":[{"id":0,"text":"..."}]}\n'
+        "Input:\n"
+        + json.dumps(input_json, ensure_ascii=False, separators=(",", ":"))
+    )
+
+
+def _localize_ids(batch: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], list[int]]:
+    """Renumber a batch 0..n-1 for the prompt; returns the items and the original id of each position."""
+    return [{"id": i, "text": it["text"]} for i, it in enumerate(batch)], [it["id"] for it in batch]
+
+
+def approx_token_count(text: str) -> int:
+    """Tokenizer-free estimate (Latin words, single digits and other characters) for comparing prompt encodings."""
+    return len(_APPROX_TOKEN_RE.findall(text))
+
+
 def translate_batch(
     *,
     client: GeminiClient,
@@ -237,8 +581,27 @@ def translate_batch(
     temperature: float,
     max_output_tokens: int,
     retries: int,
+    compact: bool = False,
+    terms: SessionTermMemory | None = None,
+    on_failed: Callable[[int, TranslationError], None] | None = None,
 ) -> dict[int, str]:
-    prompt = build_batch_prompt(src_lang=src_lang, dst_lang=dst_lang, items=batch)
+    """
+    Translate `batch` in one request; after the retries a failing batch is split in halves down to single items.
+
+    A single item that still fails raises `TranslationError`, or with `on_failed(id, error)` is reported
+    there and left out of the result, so the rest of the batch is still returned.
+    """
+    if compact:
+        prompt_items, ids = _localize_ids(batch)
+    else:
+        prompt_items, ids = batch, None
+    prompt = build_batch_prompt(
+        src_lang=src_lang,
+        dst_lang=dst_lang,
+        items=prompt_items,
+        compact=compact,
+        terms=terms.pairs_for(it["text"] for it in batch) if terms is not None else None,
+    )
     last_err: Exception | None = None
     for attempt in range(retries + 1):
         try:
@@ -259,6 +622,10 @@ def translate_batch(
                 item_id = entry.get("id")
                 t = entry.get("text")
                 if isinstance(item_id, int) and isinstance(t, str):
+                    if ids is not None:
+                        if not 0 <= item_id < len(ids):
+                            continue
+                        item_id = ids[item_id]
                     out[item_id] = t
 
             if len(out) != len(batch):
@@ -275,7 +642,11 @@ def translate_batch(
             break
 
     if len(batch) <= 1:
-        raise TranslationError(f"Failed to translate batch: {last_err}") from last_err
+        err = TranslationError(f"Failed to translate batch: {last_err}")
+        if on_failed is None or not batch:
+            raise err from last_err
+        on_failed(batch[0]["id"], err)
+        return {}
 
     mid = len(batch) // 2
     left = translate_batch(
@@ -286,6 +657,9 @@ def translate_batch(
         temperature=temperature,
         max_output_tokens=max_output_tokens,
         retries=retries,
+        compact=compact,
+        terms=terms,
+        on_failed=on_failed,
     )
     right = translate_batch(
         client=client,
@@ -295,12 +669,106 @@ def translate_batch(
         temperature=temperature,
         max_output_tokens=max_output_tokens,
         retries=retries,
+        compact=compact,
+        terms=terms,
+        on_failed=on_failed,
     )
     merged = dict(left)
     merged.update(right)
     return merged
 
 
+def translate_batch_streaming(
+    *,
+    client: GeminiClient,
+    src_lang: str,
+    dst_lang: str,
+    batch: list[dict[str, Any]],
+    temperature: float,
+    max_output_tokens: int,
+    retries: int,
+    on_item: Callable[[int, str], None],
+    compact: bool = False,
+    terms: SessionTermMemory | None = None,
+    on_failed: Callable[[int, TranslationError], None] | None = None,
+) -> None:
+    """
+    Streaming variant of `translate_batch`.
+
+    `on_item(id, text)` is called as soon as each item is complete in the stream; it should validate and
+    persist the result and raise `TranslationError` to reject it. Retries (and the final split) only
+    re-send the ids that never arrived or were rejected, so a truncated tail does not waste the head.
+    `on_failed` works as in `translate_batch`.
+    """
+    pending = {it["id"]: it for it in batch}
+    last_err: Exception | None = None
+    for attempt in range(retries + 1):
+        if compact:
+            prompt_items, ids = _localize_ids(list(pending.values()))
+        else:
+            prompt_items, ids = list(pending.values()), None
+        prompt = build_batch_prompt(
+            src_lang=src_lang,
+            dst_lang=dst_lang,
+            items=prompt_items,
+            compact=compact,
+            terms=terms.pairs_for(it["text"] for it in pending.values()) if terms is not None else None,
+        )
+        parser = StreamingTranslationsParser()
+        try:
+            for chunk in client.stream_text(
+                prompt=prompt,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+            ):
+                for item_id, t in parser.feed(chunk):
+                    if ids is not None:
+                        item_id = ids[item_id] if 0 <= item_id < len(ids) else None
+                    if item_id not in pending:
+                        continue
+                    try:
+                        on_item(item_id, t)
+                    except TranslationError as e:
+                        last_err = e
+                        continue
+                    del pending[item_id]
+        except Exception as e:  # noqa: BLE001
+            last_err = e
+
+        if not pending:
+            return
+        if last_err is None:
+            last_err = TranslationError(f"Stream ended with {len(pending)} of {len(batch)} translations missing.")
+        if attempt < retries:
+            time.sleep(min(30.0, 1.5**attempt))
+            continue
+        break
+
+    remaining = list(pending.values())
+    if len(remaining) <= 1:
+        err = TranslationError(f"Failed to translate batch: {last_err}")
+        if on_failed is None or not remaining:
+            raise err from last_err
+        on_failed(remaining[0]["id"], err)
+        return
+
+    mid = len(remaining) // 2
+    for half in (remaining[:mid], remaining[mid:]):
+        translate_batch_streaming(
+            client=client,
+            src_lang=src_lang,
+            dst_lang=dst_lang,
+            batch=half,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            retries=retries,
+            on_item=on_item,
+            compact=compact,
+            terms=terms,
+            on_failed=on_failed,
+        )
+
+
 def chunk_work(
     work: list[dict[str, Any]], *, batch_size: int, max_chars: int
 ) -> Iterable[list[dict[str, Any]]]:
@@ -308,7 +776,9 @@ def chunk_work(
     chars = 0
     for item in work:
         text_len = len(item["masked"])
-        if batch and (len(batch) >= batch_size or chars + text_len > max_chars):
+        # Scheduled work (see translation_schedule) is cut at priority changes so a batch never mixes tiers.
+        new_tier = batch and item.get("priority") != batch[-1].get("priority")
+        if batch and (new_tier or len(batch) >= batch_size or chars + text_len > max_chars):
             yield batch
             batch = []
             chars = 0
@@ -318,18 +788,371 @@ def chunk_work(
         yield batch
 
 
-def main(argv: list[str]) -> int:
+def validate_translation(src: str, dst: str) -> str | None:
+    """Why `dst` cannot stand in for `src` (same checks as a fresh translation, after unmasking), or None."""
+    if not dst.strip():
+        return "empty translation"
+    if _count_line_breaks(dst) != _count_line_breaks(src):
+        return "line break count differs"
+    src_tokens = Counter(m.group(0) for m in PLACEHOLDER_RE.finditer(src) if m.group(0) not in "\r\n")
+    dst_tokens = Counter(m.group(0) for m in PLACEHOLDER_RE.finditer(dst) if m.group(0) not in "\r\n")
+    if src_tokens != dst_tokens:
+        return "placeholders differ"
+    return None
+
+
+def _finalize_translation(it: dict[str, Any], raw_t: str, *, josa: JosaFixer | None = None) -> str:
+    if josa is not None:
+        # Markers still carry their placeholder map here, so particles after numeric values can be resolved.
+        raw_t = josa.fix(raw_t, it["placeholders"])
+    try:
+        out_t = unmask_placeholders(raw_t, it["placeholders"])
+    except TranslationError as e:
+        raise TranslationError(f"Validation failed for string index {it['id']}: {e}") from e
+
+    if _count_line_breaks(out_t) != _count_line_breaks(it["src"]):
+        raise TranslationError(
+            f"Newline count mismatch for string index {it['id']}: "
+            f"src has {_count_line_breaks(it['src'])} but dst has {_count_line_breaks(out_t)}"
+        )
+    return out_t
+
+
+def translate_work(
+    work: list[dict[str, Any]],
+    *,
+    client: GeminiClient,
+    src_lang: str,
+    dst_lang: str,
+    batch_size: int,
+    max_chars: int,
+    temperature: float,
+    max_output_tokens: int,
+    retries: int,
+    stream: bool,
+    sleep: float,
+    josa: JosaFixer | None,
+    on_done: Callable[[dict[str, Any], str], None],
+    compact: bool = False,
+    terms: SessionTermMemory | None = None,
+) -> int:
+    """
+    Translate `work` batch by batch; `on_done(item, text)` receives each validated translation.
+
+    With `terms`, every finished pair is learned from and later prompts carry the known terms they contain.
+    """
+    translated = 0
+    if terms is not None:
+        store = on_done
+
+        def on_done(it: dict[str, Any], out_t: str) -> None:
+            store(it, out_t)
+            terms.learn(it["src"], out_t, it.get("rec"))
+
+    for batch_items in chunk_work(work, batch_size=batch_size, max_chars=max_chars):
+        payload_items = [{"id": it["id"], "text": it["masked"]} for it in batch_items]
+        # Background items (long texts, see translation_schedule) are always streamed to keep a truncated head.
+        if stream or batch_items[0].get("background", False):
+            by_id = {it["id"]: it for it in batch_items}
+
+            def accept(item_id: int, raw_t: str) -> None:
+                nonlocal translated
+                it = by_id[item_id]
+                on_done(it, _finalize_translation(it, raw_t, josa=josa))
+                translated += 1
+
+            translate_batch_streaming(
+                client=client,
+                src_lang=src_lang,
+                dst_lang=dst_lang,
+                batch=payload_items,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+                retries=retries,
+                on_item=accept,
+                compact=compact,
+                terms=terms,
+            )
+        else:
+            result = translate_batch(
+                client=client,
+                src_lang=src_lang,
+                dst_lang=dst_lang,
+                batch=payload_items,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+                retries=retries,
+                compact=compact,
+                terms=terms,
+            )
+            for it in batch_items:
+                on_done(it, _finalize_translation(it, result[it["id"]], josa=josa))
+                translated += 1
+
+        if sleep:
+            time.sleep(sleep)
+
+        if translated and translated % 100 == 0:
+            print(f"Translated {translated}/{len(work)}...", file=sys.stderr)
+    return translated
+
+
+def prompt_size_line(work: list[dict[str, Any]], *, src_lang: str, dst_lang: str, args: argparse.Namespace) -> str:
+    """Size of the requests `work` would produce (first attempt, no retries), for comparing prompt encodings."""
+    requests_n = chars = in_tokens = out_tokens = 0
+    for batch_items in chunk_work(work, batch_size=args.batch_size, max_chars=args.max_chars):
+        items = [{"id": it["id"], "text": it["masked"]} for it in batch_items]
+        if args.compact_prompt:
+            items, _ids = _localize_ids(items)
+        prompt = build_batch_prompt(src_lang=src_lang, dst_lang=dst_lang, items=items, compact=args.compact_prompt)
+        requests_n += 1
+        chars += len(prompt)
+        in_tokens += approx_token_count(prompt)
+        # Output carries the same ids and markers; the translated words themselves do not depend on the encoding.
+        out_tokens += approx_token_count(json.dumps({"translations": items}, ensure_ascii=False, separators=(",", ":")))
+    mode = "compact" if args.compact_prompt else "standard"
+    return (
+        f"Prompt estimate ({mode}): {requests_n} request(s), {chars} chars, "
+        f"~{in_tokens} input tokens, ~{out_tokens} output tokens (approximate)."
+    )
+
+
+def _source_digest(entries: list[tuple[str, Any]], *, model: str, src_lang: str, dst_lang: str) -> str:
+    h = hashlib.sha1()
+    for part in (model, src_lang, dst_lang, *(src for src, _dst in entries)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def run_queue_worker(
+    args: argparse.Namespace,
+    *,
+    key_pool: KeyPool,
+    cassette: Cassette | None,
+    terms: SessionTermMemory | None,
+    entries: list[tuple[str, Any]],
+    work: list[dict[str, Any]],
+    post_edit_targets: list[tuple[Any, str]],
+    cache: Cache,
+    src_lang: str,
+    dst_lang: str,
+    write_output: Callable[[list[tuple[Any, str]]], None],
+) -> int:
+    """
+    `--queue` mode: share `work` with other workers through a `JobQueue`.
+
+    The first worker cuts the batches and records cache hits in the manifest; every worker then leases
+    batches until none are left. The worker that sees the queue complete first assembles the output
+    from the manifest and results only, so it is identical whichever workers did the batches.
+    """
+    queue = JobQueue(args.queue)
+    worker = args.worker_id or default_worker_id()
+    digest = _source_digest(entries, model=args.model, src_lang=src_lang, dst_lang=dst_lang)
+    if not queue.exists():
+        work_ids = {it["id"] for it in work}
+        post_edit_elems = {id(elem) for elem, _src in post_edit_targets}
+        manifest = {
+            "source_digest": digest,
+            "model": args.model,
+            "src_lang": src_lang,
+            "dst_lang": dst_lang,
+            "temperature": args.temperature,
+            "max_output_tokens": args.max_output_tokens,
+            "josa": bool(args.josa),
+            "compact": bool(args.compact_prompt),
+            "prefilled": {str(idx): dst.text for idx, (_src, dst) in enumerate(entries) if idx not in work_ids and dst.text},
+            "post_edit_ids": [idx for idx, (_src, dst) in enumerate(entries) if id(dst) in post_edit_elems],
+        }
+        # Rows keep what translate_work acts on: background batches are streamed, `rec` feeds the term memory.
+        batches = [
+            [
+                {
+                    "id": it["id"],
+                    "src": it["src"],
+                    "key": it["key"],
+                    "rec": it.get("rec"),
+                    "priority": it.get("priority"),
+                    "background": bool(it.get("background", False)),
+                }
+                for it in batch
+            ]
+            for batch in chunk_work(work, batch_size=args.batch_size, max_chars=args.max_chars)
+        ]
+        if queue.create(manifest, batches):
+            print(f"[queue] created {args.queue}: {len(batches)} batch(es)", file=sys.stderr)
+    manifest = queue.load_manifest()
+    if manifest["source_digest"] != digest:
+        raise SystemExit(f"--queue {args.queue} was created for a different input, model or language pair")
+
+    client = GeminiClient(model=manifest["model"], key_pool=key_pool, cassette=cassette)
+    josa = JosaFixer() if manifest["josa"] and is_korean_language(dst_lang) else None
+    count = manifest["batches"]
+    translated = 0
+    while True:
+        pending = queue.pending(count)
+        if not pending:
+            break
+        leased = next((n for n in pending if queue.try_lease(n, worker, args.lease_seconds)), None)
+        if leased is None:
+            # Everything left is leased by live workers: wait for results or for a lease to expire.
+            time.sleep(args.poll_seconds)
+            continue
+
+        items = []
+        for row in queue.batch(leased):
+            masked, placeholder_map = mask_placeholders(row["src"], compact=manifest.get("compact", False))
+            items.append({**row, "masked": masked, "placeholders": placeholder_map})
+        results: dict[int, str] = {}
+        try:
+            translate_work(
+                items,
+                client=client,
+                src_lang=src_lang,
+                dst_lang=dst_lang,
+                batch_size=len(items),
+                max_chars=sys.maxsize,
+                temperature=manifest["temperature"],
+                max_output_tokens=manifest["max_output_tokens"],
+                retries=args.retries,
+                stream=args.stream,
+                sleep=args.sleep,
+                josa=josa,
+                on_done=lambda it, out_t: results.__setitem__(it["id"], out_t),
+                compact=manifest.get("compact", False),
+                terms=terms,
+            )
+        except BaseException:
+            queue.release(leased, worker)
+            report_key_pool(key_pool)
+            raise
+        queue.complete(leased, worker, results)
+        translated += len(results)
+        print(f"[queue] {worker}: batch {leased} done ({len(pending) - 1} left)", file=sys.stderr)
+
+    report_key_pool(key_pool)
+    if cassette is not None:
+        print(cassette.report_line(), file=sys.stderr)
+    if josa is not None:
+        print(josa.report_line(), file=sys.stderr)
+    if terms is not None:
+        print(terms.report_line(), file=sys.stderr)
+    if not queue.try_finalize(worker):
+        print(f"[queue] {worker}: translated {translated}; output written by {queue.finalized_by()}", file=sys.stderr)
+        return 0
+
+    texts = {int(k): v for k, v in manifest["prefilled"].items()}
+    results = queue.results()
+    texts.update(results)
+    keys = {row["id"]: row["key"] for n in range(count) for row in queue.batch(n)}
+    for idx, text in sorted(results.items()):
+        if keys[idx] not in cache.items:
+            cache.append(key=keys[idx], dst=text)
+    for idx, (_src, dst) in enumerate(entries):
+        if idx in texts:
+            dst.text = texts[idx]
+    write_output([(entries[idx][1], entries[idx][0]) for idx in manifest["post_edit_ids"]])
+    return 0
+
+
+@dataclass
+class StringsSlot:
+    """Stands in for an XML <Dest> element when translating STRINGS tables directly."""
+
+    text: str | None = None
+
+
+@dataclass
+class StringsFile:
+    source: StringsTable
+    out_name: str
+    slots: dict[int, StringsSlot]
+
+
+@dataclass
+class RawInput:
+    """A plain list of strings to translate (daemon jobs); `main()` fills one slot per text."""
+
+    texts: list[str]
+    src_lang: str
+    dst_lang: str
+    cache_path: Path
+    slots: list[StringsSlot] = field(default_factory=list)
+
+
+def _locale_suffix(name: str, locale: str) -> int:
+    return name.lower().rfind(f"_{locale.lower()}.")
+
+
+def load_strings_input(
+    input_path: Path, *, source_locale: str, target_locale: str, existing_root: Path | None
+) -> tuple[list[StringsFile], list[tuple[str, StringsSlot]]]:
+    """Source-locale tables under `input_path` plus one slot per non-empty string.
+
+    Each slot starts with the string's text from the matching `<stem>_<target>.<ext>` table (looked up
+    in `existing_root`, default: next to the source file), so already-translated ids are skipped by the
+    same rules as an XML <Dest>.
+    """
+    paths = [input_path] if input_path.is_file() else list(iter_strings_files(input_path, source_locale))
+    files: list[StringsFile] = []
+    entries: list[tuple[str, StringsSlot]] = []
+    for path in paths:
+        idx = _locale_suffix(path.name, source_locale)
+        if idx < 0:
+            raise SystemExit(f"{path.name}: expected a _{source_locale}.<ext> STRINGS file name")
+        ext = path.name[idx + len(source_locale) + 2 :]
+        out_name = f"{path.name[:idx]}_{target_locale}.{ext}"
+        existing_path = (existing_root or path.parent) / out_name
+        existing: dict[int, str] = {}
+        if existing_path.is_file():
+            with open_strings_file(existing_path) as table:
+                existing = dict(table.iter_items())
+
+        source = open_strings_file(path)
+        slots: dict[int, StringsSlot] = {}
+        for sid, src_text in source.iter_items():
+            if not src_text:
+                continue
+            slot = slots[sid] = StringsSlot(existing.get(sid))
+            entries.append((src_text, slot))
+        files.append(StringsFile(source=source, out_name=out_name, slots=slots))
+    return files, entries
+
+
+def write_strings_output(files: list[StringsFile], out_dir: Path) -> int:
+    """Write `<stem>_<target>.<ext>` for each source table; ids without a translation keep the source text."""
+    for f in files:
+        replacements = {sid: slot.text for sid, slot in f.slots.items() if slot.text}
+        write_strings_file(out_dir / f.out_name, rebuild_strings(f.source, replacements))
+        f.source.close()
+    return len(files)
+
+
+def main(argv: list[str], *, warm: Any = None, raw: RawInput | None = None) -> int:
+    """
+    CLI entry point. The daemon (`translation_daemon.py`) calls it per job with `warm` (reused caches, key
+    pools and HTTP clients) and, for string-list jobs, `raw` instead of an input file.
+    """
     parser = argparse.ArgumentParser(
         description="Translate xTranslator XML export using Gemini (Google AI Studio) API.",
     )
-    parser.add_argument("--input", required=True, type=Path, help="Input xTranslator XML file")
-    parser.add_argument("--output", type=Path, help="Output translated XML file")
-    parser.add_argument("--model", default="gemini-2.5-flash-lite", help="Gemini model name")
     parser.add_argument(
-        "--api-key",
+        "--input",
+        type=Path,
+        help="Input xTranslator XML file, or a STRINGS/DLSTRINGS/ILSTRINGS file or directory",
+    )
+    parser.add_argument("--output", type=Path, help="Output translated XML file (output directory for STRINGS input)")
+    parser.add_argument("--source-locale", default="en", help="STRINGS input: source file locale suffix (default: en)")
+    parser.add_argument("--target-locale", default="ko", help="STRINGS input: locale suffix to write (default: ko)")
+    parser.add_argument(
+        "--existing",
+        type=Path,
         default=None,
-        help="Gemini API key (or set GEMINI_API_KEY env var)",
+        help="STRINGS input: directory with existing <name>_<target-locale> tables to keep (default: next to the input)",
     )
+    parser.add_argument("--model", default="gemini-2.5-flash-lite", help="Gemini model name")
+    add_key_pool_arguments(parser)
+    add_cassette_arguments(parser)
     parser.add_argument("--batch-size", type=int, default=20, help="Strings per API request")
     parser.add_argument("--max-chars", type=int, default=12000, help="Max characters per API request")
     parser.add_argument("--max-output-tokens", type=int, default=8192, help="Gemini max output tokens")
@@ -340,44 +1163,170 @@ def main(argv: list[str]) -> int:
     parser.add_argument("--overwrite", action="store_true", help="Overwrite existing non-empty Dest values")
     parser.add_argument("--dry-run", action="store_true", help="Parse and report, but do not call API or write output")
     parser.add_argument("--cache", type=Path, default=None, help="JSONL cache file path")
+    parser.add_argument(
+        "--no-post-edit",
+        action="store_true",
+        help="Write raw model output (skip the Korean post-edit fixers applied to all results before writing)",
+    )
+    parser.add_argument(
+        "--josa",
+        action="store_true",
+        help="Fix Korean particles after numeric placeholders/numbers/names in new translations (을/를, 이/가, ...)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Use streamGenerateContent: accept and cache each translation as it arrives, re-queue only missing ids",
+    )
+    parser.add_argument(
+        "--compact-prompt",
+        action="store_true",
+        help="Fewer tokens per request: short markers ({M0}, {D1}, {N2}, {3}), batch-local ids, minimal JSON and short rules",
+    )
+    parser.add_argument(
+        "--priority",
+        action="append",
+        default=None,
+        metavar="PATTERN=N",
+        help="Translate record types in priority order, lower first (e.g. BOOK:DESC=9,*:FULL=0; repeatable; "
+        "ahead of the built-in rules: names, then spell/effect/perk descriptions, books last)",
+    )
+    parser.add_argument("--no-priority", action="store_true", help="Translate in document order")
+    parser.add_argument(
+        "--long-text-chars",
+        type=int,
+        default=DEFAULT_LONG_TEXT_CHARS,
+        help=f"Strings longer than this go to the last (streamed) tier (0=off; default: {DEFAULT_LONG_TEXT_CHARS})",
+    )
+    parser.add_argument(
+        "--no-term-memory",
+        action="store_true",
+        help="Do not learn term translations during the run or add them to later prompts (kept in *.gemini_terms.jsonl)",
+    )
+    parser.add_argument(
+        "--reset-term-memory",
+        action="store_true",
+        help="Delete the saved *.gemini_terms.jsonl before the run and learn terms from scratch",
+    )
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        default=None,
+        help="Shared job-queue directory: several processes/machines run the same command and split the batches",
+    )
+    parser.add_argument("--worker-id", default=None, help="--queue: name of this worker in leases (default: host-pid)")
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=600.0,
+        help="--queue: a batch not finished within this time is reclaimed by another worker (default: 600)",
+    )
+    parser.add_argument("--poll-seconds", type=float, default=5.0, help="--queue: wait between checks when all batches are leased")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a local daemon that keeps caches, key pools and connections warm between jobs (see --listen)",
+    )
+    parser.add_argument(
+        "--listen",
+        default=DEFAULT_DAEMON_ADDRESS,
+        help=f"--serve: HOST:PORT or unix:/path/to.sock (default: {DEFAULT_DAEMON_ADDRESS})",
+    )
+    parser.add_argument(
+        "--daemon",
+        default=None,
+        metavar="ADDRESS",
+        help="Send this command to a running --serve daemon (HOST:PORT or unix:/path) and stream its progress",
+    )
     args = parser.parse_args(argv)
 
-    api_key = args.api_key or os.environ.get("GEMINI_API_KEY")
-    if not api_key and not args.dry_run:
+    if warm is not None and (args.serve or args.daemon):
+        parser.error("--serve/--daemon cannot be used inside a daemon job")
+    if args.serve:
+        from translation_daemon import serve
+
+        return serve(args)
+    if args.daemon:
+        from translation_daemon import run_remote
+
+        return run_remote(args.daemon, argv)
+    if args.input is None and raw is None:
+        parser.error("--input is required")
+
+    cassette = cassette_from_args(args)
+    if cassette is not None and cassette.replay:
+        # Nothing is sent: a local pool only keeps --rpm/--tpm pacing and stays out of the daily usage file.
+        key_pool = KeyPool(["replay"], rpm=args.rpm, tpm=args.tpm)
+    else:
+        key_pool = warm.key_pool(args) if warm is not None else key_pool_from_args(args)
+    if key_pool is None and not args.dry_run:
         print("Missing Gemini API key. Set GEMINI_API_KEY or pass --api-key.", file=sys.stderr)
         return 2
 
-    output_path = args.output or args.input.with_suffix(args.input.suffix + ".translated.xml")
-    cache_path = args.cache or args.input.with_suffix(args.input.suffix + ".gemini_cache.jsonl")
-
-    bom, prolog = read_xml_prolog(args.input)
-    tree = ET.parse(args.input)
-    root = tree.getroot()
-
-    src_lang = root.findtext("./Params/Source") or "english"
-    dst_lang = root.findtext("./Params/Dest") or "korean"
-
-    strings = root.findall("./Content/String")
-    total = len(strings)
-
-    cache = Cache.load(cache_path)
+    strings_mode = raw is None and (args.input.is_dir() or is_strings_file(args.input.name))
+    if raw is not None:
+        source_label = f"{len(raw.texts)} raw strings"
+        output_path = None
+        cache_path = args.cache or raw.cache_path
+        src_lang, dst_lang = raw.src_lang, raw.dst_lang
+        raw.slots = [StringsSlot() for _ in raw.texts]
+        entries = [(text, slot) for text, slot in zip(raw.texts, raw.slots) if text]
+        recs: list[str | None] = [None] * len(entries)  # no record types: term memory judges the text alone
+        total = len(raw.texts)
+    elif strings_mode:
+        source_label = str(args.input)
+        input_dir = args.input if args.input.is_dir() else args.input.parent
+        output_path = args.output or input_dir / f"translated_{args.target_locale}"
+        cache_path = args.cache or input_dir / f"strings_{args.source_locale}_{args.target_locale}.gemini_cache.jsonl"
+        src_lang = STRINGS_LOCALE_LANGUAGES.get(args.source_locale.lower(), args.source_locale.lower())
+        dst_lang = STRINGS_LOCALE_LANGUAGES.get(args.target_locale.lower(), args.target_locale.lower())
+        strings_files, entries = load_strings_input(
+            args.input,
+            source_locale=args.source_locale,
+            target_locale=args.target_locale,
+            existing_root=args.existing,
+        )
+        recs = [None] * len(entries)
+        total = len(entries)
+    else:
+        source_label = str(args.input)
+        output_path = args.output or args.input.with_suffix(args.input.suffix + ".translated.xml")
+        cache_path = args.cache or args.input.with_suffix(args.input.suffix + ".gemini_cache.jsonl")
+
+        bom, prolog = read_xml_prolog(args.input)
+        tree = ET.parse(args.input)
+        root = tree.getroot()
+
+        src_lang = root.findtext("./Params/Source") or "english"
+        dst_lang = root.findtext("./Params/Dest") or "korean"
+
+        strings = root.findall("./Content/String")
+        total = len(strings)
+        entries = []
+        recs = []
+        for node in strings:
+            src_elem = node.find("Source")
+            src_text = (src_elem.text or "") if src_elem is not None else ""
+            if not src_text:
+                continue
+            dst_elem = node.find("Dest")
+            if dst_elem is None:
+                dst_elem = ET.SubElement(node, "Dest")
+            entries.append((src_text, dst_elem))
+            recs.append((node.findtext("REC") or "").strip())
+
+    cache = warm.load_cache(cache_path) if warm is not None else Cache.load(cache_path)
+    terms = None
+    if not args.no_term_memory:
+        terms = SessionTermMemory.load(
+            terms_path_for_cache(cache_path), persist=not args.dry_run, reset=args.reset_term_memory
+        )
 
     work: list[dict[str, Any]] = []
-    already = 0
-    skipped = 0
-    for idx, node in enumerate(strings):
-        src_elem = node.find("Source")
-        if src_elem is None:
-            skipped += 1
-            continue
-        src_text = src_elem.text or ""
-        if not src_text:
-            skipped += 1
-            continue
-
-        dst_elem = node.find("Dest")
-        if dst_elem is None:
-            dst_elem = ET.SubElement(node, "Dest")
+    post_edit_targets: list[tuple[Any, str]] = []
+    already = from_fallback = 0
+    skipped = total - len(entries)
+    for idx, (src_text, dst_elem) in enumerate(entries):
         dst_text = dst_elem.text or ""
 
         if not args.overwrite:
@@ -385,16 +1334,22 @@ def main(argv: list[str]) -> int:
             src_norm = _normalize_for_compare(src_text)
             if dst_norm and dst_norm != src_norm:
                 skipped += 1
+                if terms is not None:
+                    terms.learn(src_text, dst_text, recs[idx])
                 continue
 
         key = _cache_key(model=args.model, src_lang=src_lang, dst_lang=dst_lang, source_text=src_text)
-        cached = cache.items.get(key)
-        if isinstance(cached, str):
+        cached, promoted = cache.lookup(key, src_text)
+        if cached is not None:
             dst_elem.text = cached
+            post_edit_targets.append((dst_elem, src_text))
             already += 1
+            from_fallback += promoted
+            if terms is not None:
+                terms.learn(src_text, cached, recs[idx])
             continue
 
-        masked, placeholder_map = mask_placeholders(src_text)
+        masked, placeholder_map = mask_placeholders(src_text, compact=args.compact_prompt)
         work.append(
             {
                 "id": idx,
@@ -403,60 +1358,122 @@ def main(argv: list[str]) -> int:
                 "key": key,
                 "masked": masked,
                 "placeholders": placeholder_map,
+                "rec": recs[idx],
             }
         )
 
-        if args.limit and len(work) >= args.limit:
+        if args.no_priority and args.limit and len(work) >= args.limit:
             break
 
+    if not args.no_priority:
+        work = schedule_work(work, parse_priority_rules(args.priority), long_text_chars=args.long_text_chars)
+    if args.limit:
+        work = work[: args.limit]
+    post_edit_targets.extend((it["dst_elem"], it["src"]) for it in work)
+
     print(
-        f"Loaded {args.input} ({total} strings). "
-        f"To translate: {len(work)}. From cache: {already}. Skipped: {skipped}.",
+        f"Loaded {source_label} ({total} strings). "
+        f"To translate: {len(work)}. From cache: {already}"
+        + (f" ({from_fallback} from another model)" if from_fallback else "")
+        + f". Skipped: {skipped}.",
         file=sys.stderr,
     )
 
     if args.dry_run:
+        print(prompt_size_line(work, src_lang=src_lang, dst_lang=dst_lang, args=args), file=sys.stderr)
         return 0
 
-    client = GeminiClient(api_key=api_key, model=args.model)
-    translated = 0
-    for batch_items in chunk_work(work, batch_size=args.batch_size, max_chars=args.max_chars):
-        payload_items = [{"id": it["id"], "text": it["masked"]} for it in batch_items]
-        result = translate_batch(
+    def write_output(targets: list[tuple[Any, str]]) -> None:
+        if not args.no_post_edit:
+            pipeline = PostEditPipeline(dst_lang)
+            if pipeline.enabled:
+                targets = [(elem, src) for elem, src in targets if elem.text]
+                fixed = pipeline.fix_all((src, elem.text or "") for elem, src in targets)
+                for (elem, _src), text in zip(targets, fixed):
+                    elem.text = text
+                for line in pipeline.report_lines():
+                    print(line, file=sys.stderr)
+
+        if raw is not None:
+            print(f"Done. Translated {sum(1 for slot in raw.slots if slot.text)} of {total} strings.", file=sys.stderr)
+        elif strings_mode:
+            written = write_strings_output(strings_files, output_path)
+            print(f"Done. Wrote {written} STRINGS file(s) to: {output_path}", file=sys.stderr)
+        else:
+            write_xml(output_path, root, bom=bom, prolog=prolog)
+            print(f"Done. Wrote: {output_path}", file=sys.stderr)
+        print(f"Cache: {cache_path}", file=sys.stderr)
+
+    if args.queue:
+        return run_queue_worker(
+            args,
+            key_pool=key_pool,
+            cassette=cassette,
+            terms=terms,
+            entries=entries,
+            work=work,
+            post_edit_targets=post_edit_targets,
+            cache=cache,
+            src_lang=src_lang,
+            dst_lang=dst_lang,
+            write_output=write_output,
+        )
+
+    checkpoint = ScheduleCheckpoint(checkpoint_path_for_cache(cache_path), work, source=source_label)
+    unfinished = {id(it["dst_elem"]) for it in work}
+
+    def store(it: dict[str, Any], out_t: str) -> None:
+        it["dst_elem"].text = out_t
+        cache.append(key=it["key"], dst=out_t)
+        unfinished.discard(id(it["dst_elem"]))
+        checkpoint.mark_done(it)
+
+    if warm is not None and cassette is None:
+        client = warm.client(args.model, key_pool)
+    else:
+        client = GeminiClient(model=args.model, key_pool=key_pool, cassette=cassette)
+    josa = JosaFixer() if args.josa and is_korean_language(dst_lang) else None
+    try:
+        translate_work(
+            work,
             client=client,
             src_lang=src_lang,
             dst_lang=dst_lang,
-            batch=payload_items,
+            batch_size=args.batch_size,
+            max_chars=args.max_chars,
             temperature=args.temperature,
             max_output_tokens=args.max_output_tokens,
             retries=args.retries,
+            stream=args.stream,
+            sleep=args.sleep,
+            josa=josa,
+            on_done=store,
+            compact=args.compact_prompt,
+            terms=terms,
         )
-        for it in batch_items:
-            raw_t = result[it["id"]]
-            try:
-                out_t = unmask_placeholders(raw_t, it["placeholders"])
-            except TranslationError as e:
-                raise TranslationError(f"Validation failed for string index {it['id']}: {e}") from e
-
-            if _count_line_breaks(out_t) != _count_line_breaks(it["src"]):
-                raise TranslationError(
-                    f"Newline count mismatch for string index {it['id']}: "
-                    f"src has {_count_line_breaks(it['src'])} but dst has {_count_line_breaks(out_t)}"
-                )
-
-            it["dst_elem"].text = out_t
-            cache.append(key=it["key"], dst=out_t)
-            translated += 1
-
-        if args.sleep:
-            time.sleep(args.sleep)
-
-        if translated and translated % 100 == 0:
-            print(f"Translated {translated}/{len(work)}...", file=sys.stderr)
-
-    write_xml(output_path, root, bom=bom, prolog=prolog)
-    print(f"Done. Wrote: {output_path}", file=sys.stderr)
-    print(f"Cache: {cache_path}", file=sys.stderr)
+    except KeyboardInterrupt:
+        # Highest priorities were done first, so what is finished is worth writing out.
+        checkpoint.save("interrupted")
+        print(f"Interrupted; writing the {len(work) - len(unfinished)} translated string(s) so far.", file=sys.stderr)
+        write_output([(elem, src) for elem, src in post_edit_targets if id(elem) not in unfinished])
+        return 130
+    except BaseException:
+        checkpoint.save("failed")
+        raise
+    finally:
+        report_key_pool(key_pool)
+        if cassette is not None:
+            print(cassette.report_line(), file=sys.stderr)
+        if work:
+            print(checkpoint.summary_line(), file=sys.stderr)
+
+    checkpoint.save("done")
+    if josa is not None:
+        print(josa.report_line(), file=sys.stderr)
+    if terms is not None:
+        print(terms.report_line(), file=sys.stderr)
+
+    write_output(post_edit_targets)
     return 0
 
 
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Local translation daemon for `translate_xtranslator_xml_gemini.py --serve`.
+
+Each CLI run pays for importing `requests`, loading the JSONL cache and opening a new HTTPS session.
+The daemon keeps those warm between jobs: caches stay loaded (reloaded only when the file was changed
+by someone else), key pools keep their rate-limit state and cool-downs, and each (model, key pool) has
+one `GeminiClient` with a live connection pool.
+
+HTTP API (localhost TCP or a Unix socket; one job runs at a time, others wait their turn):
+
+- `POST /jobs` with `{"argv": [...CLI args...], "cwd": "..."}` runs the CLI on an input file, or
+  `{"strings": [...], "src_lang": "english", "dst_lang": "korean", "argv": [...options...]}` translates a
+  raw list. The response is NDJSON streamed while the job runs: `{"event": "log", "message": ...}` for
+  every progress line, `{"event": "result", "translations": [...]}` for raw lists, and finally
+  `{"event": "exit", "code": N}`.
+- `GET /status` returns uptime, job count, loaded caches and key-pool stats.
+
+Jobs run arbitrary CLI arguments with the daemon's API keys, so every request must carry
+`Authorization: Bearer TOKEN`. The token is generated at startup and written to a user-only file
+(`daemon_token_path(address)`, mode 0600) that clients of the same user read. `POST /jobs` also
+requires `Content-Type: application/json` and rejects requests with an `Origin` header, so a web
+page cannot submit one, and TCP addresses must be loopback.
+
+`--daemon ADDRESS` on the CLI is the thin client: it forwards its own arguments and prints the stream.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hmac
+import http.client
+import io
+import ipaddress
+import json
+import os
+import re
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+from translate_xtranslator_xml_gemini import (
+    Cache,
+    GeminiClient,
+    RawInput,
+    key_pool_from_args,
+    main as cli_main,
+)
+from gemini_key_pool import KeyPool, split_api_keys
+
+
+def default_daemon_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or str(Path.home() / ".cache")
+    return Path(base) / "xtranslator-ai" / "daemon"
+
+
+def _parse_address(address: str) -> tuple[str, str | tuple[str, int]]:
+    """("unix", path) or ("tcp", (host, port)) from `unix:/path` or `HOST:PORT`."""
+    if address.startswith("unix:"):
+        return "unix", address[5:]
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise SystemExit(f"bad daemon address (expected HOST:PORT or unix:/path): {address}")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+def _is_loopback_host(host: str) -> bool:
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except OSError:
+        return False
+    return bool(infos) and all(ipaddress.ip_address(info[4][0].split("%", 1)[0]).is_loopback for info in infos)
+
+
+def daemon_token_path(address: str) -> Path:
+    """Where `--serve --listen ADDRESS` writes its access token (one file per address)."""
+    kind, addr = _parse_address(address)
+    name = f"{kind}_{addr[0]}_{addr[1]}" if isinstance(addr, tuple) else f"{kind}_{addr}"
+    return default_daemon_cache_dir() / f"{re.sub(r'[^A-Za-z0-9.-]+', '_', name)}.token"
+
+
+def _write_token(path: Path) -> str:
+    token = secrets.token_urlsafe(32)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    return token
+
+
+def read_daemon_token(address: str) -> str:
+    path = daemon_token_path(address)
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError:
+        raise SystemExit(f"no access token for daemon {address} at {path} (is `--serve --listen {address}` running as this user?)")
+
+
+def _without_option(argv: list[str], option: str) -> list[str]:
+    out: list[str] = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = True
+        elif not arg.startswith(option + "="):
+            out.append(arg)
+    return out
+
+
+class WarmState:
+    """Resources reused across jobs; `main()` asks for them through `load_cache`, `key_pool` and `client`."""
+
+    def __init__(self, default_args: argparse.Namespace) -> None:
+        self._default_keys = split_api_keys(default_args.api_key)
+        self._caches: dict[Path, tuple[Cache, tuple[int, int]]] = {}
+        self._pools: dict[tuple, KeyPool] = {}
+        self._clients: dict[tuple[str, int], GeminiClient] = {}
+
+    @staticmethod
+    def _stamp(path: Path) -> tuple[int, int]:
+        try:
+            st = path.stat()
+        except OSError:
+            return (-1, -1)
+        return (st.st_size, st.st_mtime_ns)
+
+    def load_cache(self, path: Path) -> Cache:
+        path = path.resolve()
+        known = self._caches.get(path)
+        if known is not None and known[1] == self._stamp(path):
+            return known[0]
+        cache = Cache.load(path)
+        self._caches[path] = (cache, self._stamp(path))
+        return cache
+
+    def settle(self) -> None:
+        """After a job: remember the caches' file state, so only outside changes trigger a reload."""
+        for path, (cache, _stamp) in list(self._caches.items()):
+            self._caches[path] = (cache, self._stamp(path))
+
+    def key_pool(self, args: argparse.Namespace) -> KeyPool | None:
+        keys = split_api_keys(args.api_key) if args.api_key else self._default_keys
+        if not keys:
+            return None
+        ident = (tuple(keys), args.rpm, args.tpm, args.daily_requests)
+        pool = self._pools.get(ident)
+        if pool is None:
+            args.api_key = list(keys)
+            pool = self._pools[ident] = key_pool_from_args(args)
+        return pool
+
+    def client(self, model: str, pool: KeyPool) -> GeminiClient:
+        ident = (model, id(pool))
+        client = self._clients.get(ident)
+        if client is None:
+            client = self._clients[ident] = GeminiClient(model=model, key_pool=pool)
+        return client
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "caches": {str(p): len(c.items) for p, (c, _s) in self._caches.items()},
+            "keys": [line for pool in self._pools.values() for line in pool.report_lines()],
+        }
+
+
+class _EventLines(io.TextIOBase):
+    """stderr replacement that forwards each complete line as a `log` event."""
+
+    def __init__(self, emit: Callable[[dict[str, Any]], None]) -> None:
+        self._emit = emit
+        self._buf = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._buf += text
+        while "\n" in self._buf:
+            line, self._buf = self._buf.split("\n", 1)
+            self._emit({"event": "log", "message": line})
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buf:
+            self._emit({"event": "log", "message": self._buf})
+            self._buf = ""
+
+
+class _Daemon:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.warm = WarmState(args)
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.jobs = 0
+
+    def run_job(self, job: dict[str, Any], emit: Callable[[dict[str, Any]], None]) -> None:
+        argv = [str(a) for a in job.get("argv") or []]
+        raw = None
+        if "strings" in job:
+            src_lang = str(job.get("src_lang") or "english")
+            dst_lang = str(job.get("dst_lang") or "korean")
+            raw = RawInput(
+                texts=[str(t) for t in job["strings"]],
+                src_lang=src_lang,
+                dst_lang=dst_lang,
+                cache_path=default_daemon_cache_dir() / f"raw_{src_lang}_{dst_lang}.gemini_cache.jsonl",
+            )
+            raw.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            self.jobs += 1
+            code = 1
+            old_cwd = os.getcwd()
+            out = _EventLines(emit)
+            try:
+                os.chdir(job.get("cwd") or old_cwd)
+                with contextlib.redirect_stderr(out):
+                    code = cli_main(argv, warm=self.warm, raw=raw)
+            except SystemExit as e:
+                if isinstance(e.code, int) or e.code is None:
+                    code = e.code or 0
+                else:
+                    out.write(f"{e.code}\n")
+                    code = 2
+            except Exception as e:  # noqa: BLE001 - report to the client, keep serving
+                out.write(f"Job failed: {type(e).__name__}: {e}\n")
+                code = 1
+            finally:
+                out.flush()
+                os.chdir(old_cwd)
+                self.warm.settle()
+        if raw is not None and code == 0:
+            emit({"event": "result", "translations": [slot.text for slot in raw.slots]})
+        emit({"event": "exit", "code": code})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "xtranslator-daemon/1"
+    daemon: _Daemon
+    token: str
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - BaseHTTPRequestHandler signature
+        pass
+
+    def address_string(self) -> str:
+        return str(self.client_address or "unix")
+
+    def _json(self, status: int, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        scheme, _sep, given = (self.headers.get("Authorization") or "").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(given.strip().encode("utf-8"), self.token.encode("utf-8")):
+            return True
+        self._json(401, {"error": "missing or wrong access token"})
+        return False
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+        if self.path != "/status":
+            self._json(404, {"error": "not found"})
+            return
+        if not self._authorized():
+            return
+        d = self.daemon
+        self._json(200, {"uptime_s": round(time.time() - d.started, 1), "jobs": d.jobs, "busy": d.lock.locked(), **d.warm.status()})
+
+    def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+        if self.path != "/jobs":
+            self._json(404, {"error": "not found"})
+            return
+        if self.headers.get("Origin") is not None:
+            self._json(403, {"error": "cross-origin requests are not accepted"})
+            return
+        if (self.headers.get("Content-Type") or "").split(";", 1)[0].strip().lower() != "application/json":
+            self._json(415, {"error": "Content-Type must be application/json"})
+            return
+        if not self._authorized():
+            return
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            if not isinstance(job, dict):
+                raise ValueError("job must be a JSON object")
+        except ValueError as e:
+            self._json(400, {"error": str(e)})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.end_headers()
+        gone = False
+
+        def emit(event: dict[str, Any]) -> None:
+            nonlocal gone
+            if gone:
+                return
+            try:
+                self.wfile.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            except OSError:
+                # Client went away: finish the job anyway so its results still land in the cache.
+                gone = True
+
+        self.daemon.run_job(job, emit)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self) -> tuple[socket.socket, str]:
+        conn, _addr = super().get_request()
+        return conn, ""
+
+
+def serve(args: argparse.Namespace) -> int:
+    kind, address = _parse_address(args.listen)
+    if kind == "tcp" and not _is_loopback_host(address[0]):  # type: ignore[index]
+        raise SystemExit(f"--listen must be a loopback address (127.0.0.1, ::1, localhost) or unix:/path: {args.listen}")
+    token_path = daemon_token_path(args.listen)
+    token = _write_token(token_path)
+    handler = type("Handler", (_Handler,), {"daemon": _Daemon(args), "token": token})
+    if kind == "unix":
+        path = Path(str(address))
+        path.unlink(missing_ok=True)
+        server: socketserver.BaseServer = _UnixHTTPServer(str(path), handler)
+        os.chmod(path, 0o600)
+    else:
+        server = ThreadingHTTPServer(address, handler)  # type: ignore[arg-type]
+    print(f"[daemon] listening on {args.listen}; token in {token_path} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if kind == "unix":
+            Path(str(address)).unlink(missing_ok=True)
+        with contextlib.suppress(OSError):
+            if token_path.read_text(encoding="utf-8") == token:
+                token_path.unlink()
+    return 0
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float | None = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self._path)
+
+
+def _connect(address: str) -> http.client.HTTPConnection:
+    kind, addr = _parse_address(address)
+    if kind == "unix":
+        return _UnixHTTPConnection(str(addr))
+    host, port = addr  # type: ignore[misc]
+    return http.client.HTTPConnection(host, port)
+
+
+def submit_job(address: str, job: dict[str, Any], on_event: Callable[[dict[str, Any]], None]) -> int:
+    """POST a job and feed every streamed event to `on_event`; returns the job's exit code."""
+    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {read_daemon_token(address)}"}
+    conn = _connect(address)
+    try:
+        conn.request("POST", "/jobs", body=json.dumps(job).encode("utf-8"), headers=headers)
+        resp = conn.getresponse()
+        if resp.status != 200:
+            raise SystemExit(f"daemon error HTTP {resp.status}: {resp.read()[:500].decode('utf-8', 'replace')}")
+        code = 1
+        for line in resp:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            on_event(event)
+            if event.get("event") == "exit":
+                code = int(event.get("code") or 0)
+        return code
+    finally:
+        conn.close()
+
+
+def translate_strings_remote(
+    address: str, strings: list[str], *, src_lang: str = "english", dst_lang: str = "korean", options: list[str] | None = None
+) -> list[str | None]:
+    """Translate a raw list through a running daemon (None for strings that were empty or failed)."""
+    result: list[str | None] = []
+
+    def on_event(event: dict[str, Any]) -> None:
+        nonlocal result
+        if event.get("event") == "log":
+            print(event.get("message", ""), file=sys.stderr)
+        elif event.get("event") == "result":
+            result = event.get("translations") or []
+
+    job = {"strings": strings, "src_lang": src_lang, "dst_lang": dst_lang, "argv": options or []}
+    code = submit_job(address, job, on_event)
+    if code != 0:
+        raise SystemExit(code)
+    return result
+
+
+def run_remote(address: str, argv: list[str]) -> int:
+    """Thin client: run this CLI invocation (minus --daemon) on the daemon."""
+
+    def on_event(event: dict[str, Any]) -> None:
+        if event.get("event") == "log":
+            print(event.get("message", ""), file=sys.stderr)
+
+    try:
+        return submit_job(address, {"argv": _without_option(argv, "--daemon"), "cwd": os.getcwd()}, on_event)
+    except OSError as e:
+        print(f"Cannot reach translator daemon at {address}: {e}", file=sys.stderr)
+        return 2
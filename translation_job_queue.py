@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+File-backed batch queue so several translator processes (or machines sharing a mount) can work on one
+input together.
+
+Layout of a queue directory:
+
+- `manifest.json`: run settings and the input digest, written once when the queue is created.
+- `batches/NNNNNN.json`: the fixed batches (created together with the manifest).
+- `leases/NNNNNN.lease`: `{"worker", "expires", "token"}` while a worker owns a batch, and
+  `NNNNNN.lease.reclaimed-TOKEN` markers recording which worker took over an expired lease.
+- `results/NNNNNN.json`: `{id: translation}` once a batch is done (first result wins).
+- `finalized`: the worker that wrote the output.
+
+Only atomic file operations are used (O_EXCL create, hard link, rename), no byte-range locks, so it
+works on network filesystems where SQLite's locking is unreliable. Batches are cut once and the first
+result of each batch is final, so the assembled output does not depend on which worker did what.
+Lease expiry compares wall clocks; workers on different machines need roughly synchronized clocks.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import socket
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+QUEUE_FORMAT = 1
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _write_tmp(path: Path, payload: Any) -> Path:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    return tmp
+
+
+def _write_new(path: Path, payload: Any) -> bool:
+    """Create `path` with JSON content, never visible half-written; False if it already exists."""
+    tmp = _write_tmp(path, payload)
+    try:
+        os.link(tmp, path)
+        return True
+    except FileExistsError:
+        return False
+    except OSError:
+        # No hard links on this filesystem: exclusive create, then write (briefly empty to readers).
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(tmp.read_text(encoding="utf-8"))
+        return True
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+class JobQueue:
+    def __init__(self, queue_dir: Path) -> None:
+        self.queue_dir = queue_dir
+        self.manifest_path = queue_dir / "manifest.json"
+        self.batches_dir = queue_dir / "batches"
+        self.leases_dir = queue_dir / "leases"
+        self.results_dir = queue_dir / "results"
+        self.finalized_path = queue_dir / "finalized"
+
+    def exists(self) -> bool:
+        return self.manifest_path.is_file()
+
+    def create(self, manifest: dict[str, Any], batches: list[list[dict[str, Any]]]) -> bool:
+        """Create the queue atomically; False if another worker created it first (use theirs)."""
+        tmp = self.queue_dir.with_name(f"{self.queue_dir.name}.tmp-{uuid.uuid4().hex}")
+        (tmp / "batches").mkdir(parents=True)
+        (tmp / "leases").mkdir()
+        (tmp / "results").mkdir()
+        for n, batch in enumerate(batches):
+            _write_new(tmp / "batches" / f"{n:06d}.json", batch)
+        _write_new(tmp / "manifest.json", {"format": QUEUE_FORMAT, "batches": len(batches), **manifest})
+        try:
+            if self.queue_dir.is_dir() and not any(self.queue_dir.iterdir()):
+                self.queue_dir.rmdir()
+            os.rename(tmp, self.queue_dir)
+            return True
+        except OSError:
+            if not self.exists():
+                raise
+            return False
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def load_manifest(self) -> dict[str, Any]:
+        manifest = _read_json(self.manifest_path)
+        if not isinstance(manifest, dict) or manifest.get("format") != QUEUE_FORMAT:
+            raise SystemExit(f"unreadable or incompatible queue manifest: {self.manifest_path}")
+        return manifest
+
+    def batch(self, n: int) -> list[dict[str, Any]]:
+        return json.loads((self.batches_dir / f"{n:06d}.json").read_text(encoding="utf-8"))
+
+    def is_done(self, n: int) -> bool:
+        return (self.results_dir / f"{n:06d}.json").exists()
+
+    def pending(self, count: int) -> list[int]:
+        done = {p.stem for p in self.results_dir.iterdir() if p.suffix == ".json"}
+        return [n for n in range(count) if f"{n:06d}" not in done]
+
+    def try_lease(self, n: int, worker: str, lease_s: float) -> bool:
+        """Lease batch `n` for `worker`, taking over a lease that has expired."""
+        path = self.leases_dir / f"{n:06d}.lease"
+        lease = {"worker": worker, "expires": time.time() + lease_s, "token": uuid.uuid4().hex}
+        if _write_new(path, lease):
+            return True
+        held = _read_json(path)
+        if isinstance(held, dict):
+            if float(held.get("expires", 0)) > time.time():
+                return False
+            token = str(held.get("token") or f"{held.get('worker')}-{held.get('expires')}")
+        else:
+            # Leases are written atomically, so this one is damaged; treat it as expired after a lease period.
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                return False
+            if mtime_ns / 1e9 + lease_s > time.time():
+                return False
+            token = f"unreadable-{mtime_ns}"
+        # The expired lease stays in place until it is replaced, and the marker for its token can be created
+        # once, so exactly one worker takes it over.
+        if not _write_new(path.with_name(f"{path.name}.reclaimed-{token}"), {"worker": worker}):
+            return False
+        if self.is_done(n):
+            return False
+        print(f"[queue] reclaimed batch {n} from {held.get('worker') if isinstance(held, dict) else '?'}", file=sys.stderr)
+        os.replace(_write_tmp(path, lease), path)
+        return True
+
+    def release(self, n: int, worker: str) -> None:
+        path = self.leases_dir / f"{n:06d}.lease"
+        held = _read_json(path)
+        # An expired lease is left for try_lease to replace; removing it could race with a takeover.
+        if isinstance(held, dict) and held.get("worker") == worker and float(held.get("expires", 0)) > time.time():
+            path.unlink(missing_ok=True)
+
+    def complete(self, n: int, worker: str, results: dict[int, str]) -> bool:
+        """Publish batch `n`'s results; False if another worker's result was already there (theirs is kept)."""
+        final = self.results_dir / f"{n:06d}.json"
+        tmp = self.results_dir / f".{n:06d}.{uuid.uuid4().hex}.tmp"
+        tmp.write_text(json.dumps({str(k): v for k, v in results.items()}, ensure_ascii=False), encoding="utf-8")
+        try:
+            os.link(tmp, final)
+            won = True
+        except FileExistsError:
+            won = False
+        except OSError:
+            # No hard links on this filesystem: fall back to rename (last writer wins within the race window).
+            won = not final.exists()
+            if won:
+                os.replace(tmp, final)
+        tmp.unlink(missing_ok=True)
+        self.release(n, worker)
+        return won
+
+    def results(self) -> dict[int, str]:
+        out: dict[int, str] = {}
+        for p in sorted(self.results_dir.glob("*.json")):
+            for k, v in json.loads(p.read_text(encoding="utf-8")).items():
+                out[int(k)] = v
+        return out
+
+    def try_finalize(self, worker: str) -> bool:
+        """Claim the one-time output assembly; False if another worker already did it."""
+        return _write_new(self.finalized_path, {"worker": worker, "at": time.time()})
+
+    def finalized_by(self) -> str | None:
+        held = _read_json(self.finalized_path)
+        return held.get("worker") if isinstance(held, dict) else None
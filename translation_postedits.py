@@ -0,0 +1,643 @@
+#!/usr/bin/env python3
+"""
+Post-translation fixers for Korean game strings.
+
+Python port of the post-edit chain the C# Core runs after unmasking (`PercentSignFixer`,
+`MagDurPlaceholderFixer`, `PlaceholderUnitBinder.EnforceUnitsFromSource`, `KoreanTranslationFixer`).
+All patterns are compiled once at import time; `PostEditPipeline.fix_all` runs rule-major over a whole
+batch of results, with a cheap substring gate per rule, and keeps per-rule hit counters and timings.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from korean_josa import (
+    choose_conjunction_particle,
+    choose_directional_particle,
+    choose_object_particle,
+    choose_object_particle_latin,
+    choose_subject_particle,
+    choose_topic_particle,
+    choose_topic_particle_latin,
+    fix_object_particle_safely,
+    fix_object_particle_safely_latin,
+    fix_topic_particle_safely,
+    fix_topic_particle_safely_latin,
+)
+
+
+_INVISIBLE_SEPARATORS = ("\u200b", "\ufeff", "\u2060")
+
+# .NET `\p{P}` has no `re` equivalent; this is the punctuation seen around particles in practice.
+_PUNCT = r"""!"#%&'()*,\-./:;?@\[\\\]_{}…‘’“”·「」『』《》〈〉、。"""
+_PARTICLE_BOUNDARY = rf"(?=$|[\s{_PUNCT}])"
+_LATIN_NOUN = r"(?P<noun>[A-Z][A-Za-z0-9 \-'’]{1,40})"
+
+
+def is_korean_language(lang: str | None) -> bool:
+    s = (lang or "").strip().lower()
+    if not s:
+        return False
+    if s in ("korean", "ko") or s.startswith(("ko-", "ko_")):
+        return True
+    return "korean" in s or "한국" in s
+
+
+def remove_invisible_separators(text: str) -> str:
+    for ch in _INVISIBLE_SEPARATORS:
+        if ch in text:
+            text = text.replace(ch, "")
+    return text
+
+
+def _looks_like_korean_text(text: str) -> bool:
+    return any("가" <= ch <= "힣" for ch in text)
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+
+
+class PostEditRule(ABC):
+    """One post-edit step. `gate` is a cheap pre-check so most strings never reach the regexes."""
+
+    name = "rule"
+
+    def gate(self, source: str, dest: str) -> bool:
+        return True
+
+    @abstractmethod
+    def apply(self, source: str, dest: str) -> str:
+        """`dest` with this rule's fixes applied (unchanged when nothing matches)."""
+
+
+class PercentSignRule(PostEditRule):
+    """Port of `PercentSignFixer.FixDuplicatePercents` ("50%%", "<25%>%", "10%포인트", "밀어치기%")."""
+
+    name = "percent_sign"
+
+    _DUPLICATE = re.compile(r"%(?:\s*%)+")
+    _STRAY_AFTER_PERCENT_PLACEHOLDER = re.compile(r"(?P<ph>[+-]?<\s*[0-9]+(?:\.[0-9]+)?\s*%\s*>)(?:\s*%)+")
+    _STRAY_AFTER_WORD = re.compile(r"(?<=[가-힣A-Za-z])%(?=(?:\s|[,.!?…:;\"'”’)\]}]|$))")
+    _PERCENT_POINT_GARBAGE = re.compile(
+        r"(?P<pct>\b[0-9]+(?:\.[0-9]+)?%)\s*포인트(?P<post>(?:의|가|이|을|를|은|는|도|만|까지|부터)?\b)?"
+    )
+
+    def gate(self, source: str, dest: str) -> bool:
+        return "%" in dest
+
+    def apply(self, source: str, dest: str) -> str:
+        working = self._DUPLICATE.sub("%", dest)
+        working = self._STRAY_AFTER_PERCENT_PLACEHOLDER.sub(lambda m: m.group("ph"), working)
+        if "포인트" in working:
+            working = self._PERCENT_POINT_GARBAGE.sub(lambda m: m.group("pct") + (m.group("post") or ""), working)
+        return self._STRAY_AFTER_WORD.sub("", working)
+
+
+_KNOWN_SUBJECTS_KO = {
+    "health": "체력",
+    "magicka": "매지카",
+    "stamina": "지구력",
+    "carry weight": "무게 한계",
+    "smithing": "제련",
+    "enchanting": "마법부여",
+    "two-handed": "양손무기",
+    "one-handed": "한손무기",
+    "archery": "궁술",
+    "light armor": "경갑",
+    "heavy armor": "중갑",
+    "sneak": "은신",
+    "pickpocket": "소매치기",
+    "lockpicking": "자물쇠 따기",
+    "conjuration": "소환마법",
+    "destruction": "파괴마법",
+    "restoration": "회복마법",
+    "illusion": "환영마법",
+    "alteration": "변화마법",
+    "speech": "화술",
+    "alchemy": "연금술",
+}
+
+
+def _subject_ko(subject: str) -> str:
+    s = subject.strip()
+    return _KNOWN_SUBJECTS_KO.get(s.lower(), s)
+
+
+class MagDurRule(PostEditRule):
+    """
+    Port of the generic parts of `MagDurPlaceholderFixer`: duplicate-sign cleanup, the "bad <mag>/<dur>
+    usage" templates, and the swapped-placeholder fallback. The large per-effect template catalogue stays
+    in the app.
+    """
+
+    name = "mag_dur"
+
+    _I = re.IGNORECASE
+    _MAG = re.compile(r"[+-]?<\s*mag\s*>", _I)
+    _DUR = re.compile(r"[+-]?<\s*dur\s*>", _I)
+    _DOUBLE_PLUS = re.compile(r"\+\s*\+\s*<\s*mag\s*>", _I)
+    _DOUBLE_MINUS = re.compile(r"-\s*-\s*<\s*mag\s*>", _I)
+    _DUR_LOOKS_AMOUNT = re.compile(r"[+-]?<\s*dur\s*>\s*(%|퍼센트|만큼|점|포인트|수치)", _I)
+    _MAG_LOOKS_TIME = re.compile(
+        r"([+-]?<\s*mag\s*>\s*%?\s*(초간|초|분|시간|일|주|개월|년|동안|간))"
+        r"|((초간|초|분|시간|일|주|개월|년|동안|간)\s*[+-]?<\s*mag\s*>\s*%?)",
+        _I,
+    )
+    _MAG_PERCENT = re.compile(r"[+-]?<\s*mag\s*>\s*%", _I)
+    _DUR_PERCENT = re.compile(r"[+-]?<\s*dur\s*>\s*%", _I)
+
+    _REGEN = re.compile(
+        r"^(?P<attr>Health|Magicka|Stamina)\s+regenerates\s+(?P<mag><\s*mag\s*>)%\s+(?P<speed>faster|slower)"
+        r"\s+for\s+(?P<dur><\s*dur\s*>)\s+seconds\.?$",
+        _I,
+    )
+    _CARRY_WEIGHT_REDUCED = re.compile(
+        r"^Carry\s+weight\s+is\s+reduced\s+by\s+(?P<mag><\s*mag\s*>)\s+for\s+(?P<dur><\s*dur\s*>)\.?\s*$", _I
+    )
+    _DEAL_DAMAGE_DURING = re.compile(
+        r"^Deal\s+(?P<mag><\s*mag\s*>)\s+damage(s)?\s+during\s+(?P<dur><\s*dur\s*>)\s+seconds\.?$", _I
+    )
+    _POINTS_STRONGER = re.compile(
+        r"^(?P<skill>[A-Za-z][A-Za-z \-']*?)\s+is\s+(?P<mag><\s*mag\s*>)\s+points?\s+stronger"
+        r"\s+for\s+(?P<dur><\s*dur\s*>)\s+seconds\.?$",
+        _I,
+    )
+    _SIGNED_AMOUNT_FOR_DURATION = re.compile(
+        r"^(?P<mag>[+-]?<\s*mag\s*>)\s+(?P<subject>[A-Za-z][A-Za-z \-']*?)\s+for\s+(?P<dur><\s*dur\s*>)\s+seconds\.?$",
+        _I,
+    )
+
+    def gate(self, source: str, dest: str) -> bool:
+        return "<" in dest and bool(source.strip())
+
+    def apply(self, source: str, dest: str) -> str:
+        if not (self._MAG.search(dest) or self._DUR.search(dest)):
+            return dest
+
+        dest = self._DOUBLE_PLUS.sub("+<mag>", dest)
+        dest = self._DOUBLE_MINUS.sub("-<mag>", dest)
+
+        templated = self._try_bad_usage_templates(source.strip(), dest)
+        if templated is not None:
+            return templated
+
+        mags = self._MAG.findall(dest)
+        durs = self._DUR.findall(dest)
+        if len(mags) == 1 and len(durs) == 1 and self._looks_like_bad_usage(dest):
+            return _swap_once(dest, mags[0], durs[0])
+        return dest
+
+    def _looks_like_bad_usage(self, dest: str) -> bool:
+        return bool(
+            self._DUR_LOOKS_AMOUNT.search(dest)
+            or self._MAG_LOOKS_TIME.search(dest)
+            or (not self._MAG_PERCENT.search(dest) and self._DUR_PERCENT.search(dest))
+        )
+
+    def _try_bad_usage_templates(self, src: str, dest: str) -> str | None:
+        m = self._REGEN.match(src)
+        if m:
+            if not self._looks_like_bad_usage(dest):
+                return dest
+            speed_ko = "빨라집니다" if m.group("speed").lower() == "faster" else "느려집니다"
+            return f"{m.group('dur').strip()}초 동안 {_subject_ko(m.group('attr'))} 재생 속도가 {m.group('mag').strip()}% {speed_ko}."
+
+        m = self._CARRY_WEIGHT_REDUCED.match(src)
+        if m:
+            if not self._looks_like_bad_usage(dest):
+                return dest
+            return f"{m.group('dur').strip()} 동안 무게 한계가 {m.group('mag').strip()}만큼 감소합니다."
+
+        m = self._DEAL_DAMAGE_DURING.match(src)
+        if m:
+            if not self._looks_like_bad_usage(dest):
+                return dest
+            return f"{m.group('dur').strip()}초 동안 {m.group('mag').strip()}의 피해를 줍니다."
+
+        m = self._POINTS_STRONGER.match(src)
+        if m:
+            if not self._looks_like_bad_usage(dest):
+                return dest
+            return f"{m.group('dur').strip()}초 동안 {_subject_ko(m.group('skill'))}이(가) {m.group('mag').strip()}포인트 더 강해집니다."
+
+        m = self._SIGNED_AMOUNT_FOR_DURATION.match(src)
+        if m:
+            return f"{m.group('dur').strip()}초 동안 {_subject_ko(m.group('subject'))} {m.group('mag').strip()}."
+
+        return None
+
+
+def _swap_once(text: str, a: str, b: str) -> str:
+    tmp = "__XT_SWAP_TMP__"
+    working = re.sub(re.escape(a), tmp, text, flags=re.IGNORECASE)
+    working = re.sub(re.escape(b), lambda _m: a, working, flags=re.IGNORECASE)
+    return working.replace(tmp, b)
+
+
+class UnitBinderRule(PostEditRule):
+    """Port of `PlaceholderUnitBinder.EnforceUnitsFromSource` (초 after <dur>, 초당, stray 포인트)."""
+
+    name = "unit_binder"
+
+    _I = re.IGNORECASE
+    _PER_SECOND = re.compile(r"\b(?:per|every|each)\s+second\b", _I)
+    _ANY_PLACEHOLDER = re.compile(r"[+-]?<[^>]+>")
+    _PLACEHOLDER_SECONDS = re.compile(r"(?P<ph>[+-]?<[^>]+>)\s*seconds?\b", _I)
+    _SOURCE_HAS_POINTS = re.compile(r"\bpoints?\b", _I)
+    _PLACEHOLDER_POINTS_KO = re.compile(r"(?P<tok>[+-]?<[^>]+>)\s*포인트(?P<post>(?:의|가|이|을|를|은|는|도|만|까지|부터)?\b)?")
+    _NUMERIC_ANGLE = re.compile(r"^(?P<sign>[+-]?)<\s*(?P<n>[0-9]+)\s*>$")
+    _DUR_ANGLE = re.compile(r"^[+-]?<\s*dur\s*>$", _I)
+    _MAG_ANGLE = re.compile(r"^[+-]?<\s*mag\s*>$", _I)
+    _HAS_PER_SECOND_KO = re.compile(r"(?:초\s*당|매\s*초|초\s*마다)\b")
+    _TIGHTEN_VALUE_UNIT = re.compile(r"(?P<v>[+-]?<[^>]+>|\b[0-9]+(?:\.[0-9]+)?\b)\s+(?P<unit>초|포인트)\b")
+    _TIME_UNIT_LOOKAHEAD = r"(?P<ws>\s*)(?!(초간|초|분|시간|일|주|개월|년))"
+    _DUR_SECONDS = re.compile(r"(?P<tok>[+-]?<\s*dur\s*>)" + _TIME_UNIT_LOOKAHEAD)
+
+    def gate(self, source: str, dest: str) -> bool:
+        return "<" in source and bool(dest.strip()) and len(source) <= 2000 and len(dest) <= 2000
+
+    def apply(self, source: str, dest: str) -> str:
+        strip_points = "<" in dest and "포인트" in dest and not self._SOURCE_HAS_POINTS.search(source)
+
+        needs_dur_seconds = False
+        numeric_seconds: list[str] = []
+        for m in self._PLACEHOLDER_SECONDS.finditer(source):
+            ph = m.group("ph")
+            if self._DUR_ANGLE.match(ph):
+                needs_dur_seconds = True
+                continue
+            num = self._NUMERIC_ANGLE.match(ph)
+            if num and num.group("n") not in numeric_seconds:
+                numeric_seconds.append(num.group("n"))
+        needs_per_second = bool(self._PER_SECOND.search(source))
+
+        if not (needs_dur_seconds or numeric_seconds or needs_per_second or strip_points):
+            return dest
+
+        working = dest
+        if needs_dur_seconds:
+            working = self._DUR_SECONDS.sub(lambda m: m.group("tok") + "초" + m.group("ws"), working)
+        for n in numeric_seconds:
+            pattern = re.compile(r"(?P<tok>[+-]?<\s*" + re.escape(n) + r"\s*>)" + self._TIME_UNIT_LOOKAHEAD)
+            working = pattern.sub(lambda m: m.group("tok") + "초" + m.group("ws"), working)
+        if needs_per_second:
+            token_pattern = self._rate_token_pattern(source)
+            if token_pattern:
+                working = self._ensure_rate_word(working, token_pattern)
+        if strip_points:
+            working = self._PLACEHOLDER_POINTS_KO.sub(lambda m: m.group("tok") + (m.group("post") or ""), working)
+
+        if " " in working:
+            working = self._TIGHTEN_VALUE_UNIT.sub(lambda m: m.group("v") + m.group("unit"), working)
+        return working
+
+    def _rate_token_pattern(self, source: str) -> str | None:
+        per_second = self._PER_SECOND.search(source)
+        if not per_second:
+            return None
+        token = ""
+        for m in self._ANY_PLACEHOLDER.finditer(source):
+            if m.start() >= per_second.start():
+                break
+            token = m.group(0).strip()
+        if not token:
+            return None
+        if self._MAG_ANGLE.match(token):
+            return r"[+-]?<\s*mag\s*>"
+        num = self._NUMERIC_ANGLE.match(token)
+        if num:
+            return r"[+-]?<\s*" + re.escape(num.group("n")) + r"\s*>"
+        return None
+
+    def _ensure_rate_word(self, text: str, token_pattern: str) -> str:
+        if self._HAS_PER_SECOND_KO.search(text):
+            return text
+        m = re.search(token_pattern, text, re.IGNORECASE)
+        if not m:
+            return text
+        working = text[: m.start()] + "초당 " + text[m.start() :]
+        working = re.sub(r"(?P<prev>[가-힣A-Za-z])초당\b", lambda m2: m2.group("prev") + " 초당", working)
+        return re.sub(r"초당\s+<", "초당 <", working)
+
+
+class ParenthesizedParticleRule(PostEditRule):
+    """Port of `ParenthesizedParticleStep`: "검을(를)" / "매지카은/는" -> the correct single particle."""
+
+    name = "korean_paren_particles"
+
+    _OBJ = r"(?:을\(를\)|를\(을\)|\(\s*을\s*\)\s*를|\(\s*를\s*\)\s*을|을/를|를/을)"
+    _TOPIC = r"(?:은\(는\)|는\(은\)|\(\s*은\s*\)\s*는|\(\s*는\s*\)\s*은|은/는|는/은)"
+    _SUBJ = r"(?:이\(가\)|가\(이\)|\(\s*이\s*\)\s*가|\(\s*가\s*\)\s*이|이/가|가/이)"
+    _CONJ = r"(?:과\(와\)|와\(과\)|\(\s*와\s*\)\s*과|\(\s*과\s*\)\s*와|과/와|와/과)"
+    _DIR = r"(?:\(\s*으\s*\)\s*로|으로\(로\)|로\(으로\)|으로/로|로/으로)"
+    _HANGUL_NOUN = r"(?P<noun>[가-힣]{1,30})\s*"
+
+    _PATTERNS = (
+        (re.compile(_HANGUL_NOUN + _OBJ), choose_object_particle),
+        (re.compile(_LATIN_NOUN + r"\s*" + _OBJ), choose_object_particle_latin),
+        (re.compile(_HANGUL_NOUN + _TOPIC), choose_topic_particle),
+        (re.compile(_LATIN_NOUN + r"\s*" + _TOPIC), choose_topic_particle_latin),
+        (re.compile(_HANGUL_NOUN + _SUBJ), choose_subject_particle),
+        (re.compile(_HANGUL_NOUN + _CONJ), choose_conjunction_particle),
+        (re.compile(_HANGUL_NOUN + _DIR), choose_directional_particle),
+    )
+
+    def gate(self, source: str, dest: str) -> bool:
+        return "(" in dest or "/" in dest
+
+    def apply(self, source: str, dest: str) -> str:
+        working = dest
+        for pattern, choose in self._PATTERNS:
+            working = pattern.sub(lambda m, choose=choose: m.group("noun") + choose(m.group("noun")), working)
+        return working
+
+
+class AttachedParticleRule(PostEditRule):
+    """Port of `AttachedSeparatedParticleStep`: "매지카을" -> "매지카를", "검 를" -> "검을"."""
+
+    name = "korean_particles"
+
+    _B = _PARTICLE_BOUNDARY
+    _OBJECT = (
+        (re.compile(r"(?P<noun>[가-힣]{1,30})\s+(?P<particle>을|를)" + _B), fix_object_particle_safely),
+        (re.compile(r"(?P<noun>[가-힣]{1,30})(?P<particle>을|를)" + _B), fix_object_particle_safely),
+        (re.compile(_LATIN_NOUN + r"\s+(?P<particle>을|를)" + _B), fix_object_particle_safely_latin),
+        (re.compile(_LATIN_NOUN + r"(?P<particle>을|를)" + _B), fix_object_particle_safely_latin),
+    )
+    _TOPIC = (
+        (re.compile(r"(?P<noun>[가-힣]{1,30})\s+(?P<particle>은|는)" + _B), fix_topic_particle_safely),
+        (re.compile(r"(?P<noun>[가-힣]{1,30})(?P<particle>은|는)" + _B), fix_topic_particle_safely),
+        (re.compile(_LATIN_NOUN + r"\s+(?P<particle>은|는)" + _B), fix_topic_particle_safely_latin),
+        (re.compile(_LATIN_NOUN + r"(?P<particle>은|는)" + _B), fix_topic_particle_safely_latin),
+    )
+    _DUPLICATE_PRONOUN_TOPIC = re.compile(
+        r"(?P<pronoun>저는|나는|너는|그는|그녀는|우리는|너희는|여러분은|당신은)(?:은|는)" + _B
+    )
+
+    def gate(self, source: str, dest: str) -> bool:
+        return any(p in dest for p in "을를은는")
+
+    def apply(self, source: str, dest: str) -> str:
+        working = dest
+        if "을" in working or "를" in working:
+            for pattern, fix in self._OBJECT:
+                working = pattern.sub(lambda m, fix=fix: m.group("noun") + fix(m.group("noun"), m.group("particle")), working)
+        if "은" in working or "는" in working:
+            for pattern, fix in self._TOPIC:
+                working = pattern.sub(lambda m, fix=fix: m.group("noun") + fix(m.group("noun"), m.group("particle")), working)
+            working = self._DUPLICATE_PRONOUN_TOPIC.sub(lambda m: m.group("pronoun"), working)
+        return working
+
+
+class StatAndSubjectParticleRule(PostEditRule):
+    """Port of `StatAndSubjectParticleStep`: "체력에게" -> "체력에", "중갑 가 <mag>" -> "중갑이 <mag>"."""
+
+    name = "korean_stat_subject"
+
+    _STAT_DATIVE_FROM = re.compile(r"(?P<stat>체력|매지카|지구력)에게서")
+    _STAT_DATIVE = re.compile(r"(?P<stat>체력|매지카|지구력)에게(?P<suffix>는|도|만|까지|부터)?" + _PARTICLE_BOUNDARY)
+    _SEPARATED_SUBJECT = re.compile(r"(?P<noun>[가-힣]{2,20})\s+(?P<particle>가|이)\s+(?=(?:[+-]?<|\b[0-9]))")
+
+    _VALUE = re.compile(r"[<0-9]")
+
+    def gate(self, source: str, dest: str) -> bool:
+        return "에게" in dest or (" " in dest and self._VALUE.search(dest) is not None)
+
+    def apply(self, source: str, dest: str) -> str:
+        working = dest
+        if "에게" in working:
+            working = self._STAT_DATIVE_FROM.sub(lambda m: m.group("stat") + "에서", working)
+            working = self._STAT_DATIVE.sub(lambda m: m.group("stat") + "에" + (m.group("suffix") or ""), working)
+        if " " in working and self._VALUE.search(working):
+            working = self._SEPARATED_SUBJECT.sub(
+                lambda m: m.group("noun") + choose_subject_particle(m.group("noun")) + " ", working
+            )
+        return working
+
+
+class DurationProbabilityRule(PostEditRule):
+    """Port of `DurationProbabilityStep`: misplaced "<dur>초 동안" and "N% <dur>초 동안 확률로"."""
+
+    name = "korean_duration_probability"
+
+    _I = re.IGNORECASE
+    _SUBJECT = r"(?P<subject>[^\W\d_][\w \-'’]{0,40})"
+    _RAW_DURATION_WITH_EUI = re.compile(
+        _SUBJECT + r"\s*초\s*동안\s*(?P<dur>[+-]?<\s*(?:dur|[0-9]+)\s*>)\s*초?\s*의", _I
+    )
+    _RAW_DURATION = re.compile(_SUBJECT + r"\s*초\s*동안\s*(?P<dur>[+-]?<\s*(?:dur|[0-9]+)\s*>)\s*초?\b", _I)
+    _PROBABILITY_AFTER_DURATION = re.compile(
+        r"(?P<chance>(?:[+-]?<\s*[0-9]+(?:\.[0-9]+)?\s*%\s*>(?:\s*%)*|\b[0-9]+(?:\.[0-9]+)?\s*%))\s+"
+        r"(?P<duration>(?:[+-]?<[^>]+>|\b[0-9]+(?:\.[0-9]+)?\b)\s*초(?:\s*(?:동안|간))?)\s+"
+        r"확률로" + _PARTICLE_BOUNDARY,
+        _I,
+    )
+
+    def gate(self, source: str, dest: str) -> bool:
+        return "초" in dest
+
+    def apply(self, source: str, dest: str) -> str:
+        working = dest
+        if "<" in working and "동안" in working:
+            working = self._RAW_DURATION_WITH_EUI.sub(
+                lambda m: m.group("dur").strip() + "초 동안 " + m.group("subject").strip() + "의", working
+            )
+            working = self._RAW_DURATION.sub(
+                lambda m: m.group("dur").strip() + "초 동안 " + m.group("subject").strip(), working
+            )
+        if "%" in working and "확률로" in working:
+            working = self._PROBABILITY_AFTER_DURATION.sub(
+                lambda m: m.group("chance").strip() + " 확률로 " + m.group("duration").strip(), working
+            )
+        return working
+
+
+class ArtifactCleanupRule(PostEditRule):
+    """Port of `ArtifactCleanupStep` plus the "효과 효과" collapse from `KoreanTranslationFixer`."""
+
+    name = "korean_artifacts"
+
+    _DUPLICATE_EFFECT_WORD = re.compile(r"효과\s+효과")
+    _HAGI_BEFORE_STATE = re.compile(r"(?P<stem>[가-힣]{2,30})하기(?=\s*상태)")
+    _HAGI_BEFORE_HAPNIDA = re.compile(r"(?P<stem>[가-힣]{2,30})하기\s*합니다")
+    _WEAPON_GOODS_DROP = re.compile(
+        r"무기\s*(?:을|를)?\s*물건\s*전달(?P<ending>합니다|한다|해라|해|하세요|하십시오)?(?P<punct>[.!?…]*)"
+    )
+    _STAT_POINTS_OBJECT = re.compile(r"(?P<stat>체력|매지카|지구력)\s*포인트를")
+    _ADJACENT_NUMERIC_BEFORE_DURATION = re.compile(
+        r"(?P<points>[+-]?<\s*[0-9]+\s*>)(?:\s*포인트)?\s*(?P<dur>[+-]?<\s*[0-9]+\s*>)\s*초\s*(?P<time>동안|간)\b",
+        re.IGNORECASE,
+    )
+    _POINT_SECOND_POINT = re.compile(r"포인트\s*초\s*포인트")
+    _DUPLICATE_POINTS = re.compile(r"포인트\s*포인트")
+    _DROP_WEAPON_ENDINGS = {
+        "하십시오": "무기를 내리십시오",
+        "하세요": "무기를 내리세요",
+        "합니다": "무기를 내리십시오",
+        "한다": "무기를 내려라",
+        "해라": "무기를 내려라",
+    }
+
+    def gate(self, source: str, dest: str) -> bool:
+        return any(k in dest for k in ("효과", "하기", "물건", "포인트", "초"))
+
+    def apply(self, source: str, dest: str) -> str:
+        working = dest
+        if "효과" in working:
+            working = self._DUPLICATE_EFFECT_WORD.sub("효과", working)
+        if "하기" in working and "상태" in working:
+            working = self._HAGI_BEFORE_STATE.sub(lambda m: m.group("stem"), working)
+        if "하기" in working and "합니다" in working:
+            working = self._HAGI_BEFORE_HAPNIDA.sub(lambda m: m.group("stem") + "합니다", working)
+        if "무기" in working and "물건" in working:
+            working = self._WEAPON_GOODS_DROP.sub(
+                lambda m: self._DROP_WEAPON_ENDINGS.get(m.group("ending") or "", "무기를 내려") + m.group("punct"),
+                working,
+            )
+        if "포인트를" in working:
+            working = self._STAT_POINTS_OBJECT.sub(
+                lambda m: m.group("stat") + choose_object_particle(m.group("stat")), working
+            )
+        if "<" in working and "초" in working and "동안" in working:
+            working = self._ADJACENT_NUMERIC_BEFORE_DURATION.sub(
+                lambda m: f"{m.group('dur').strip()}초 {m.group('time')} {m.group('points').strip()}포인트", working
+            )
+        if "포인트" in working and "초" in working:
+            working = self._POINT_SECOND_POINT.sub("포인트", working)
+            working = self._DUPLICATE_POINTS.sub("포인트", working)
+        return working
+
+
+def default_rules() -> list[PostEditRule]:
+    # Same order as the app: percent cleanup right after unmasking, then MagDur, units, Korean fixes.
+    return [
+        PercentSignRule(),
+        MagDurRule(),
+        UnitBinderRule(),
+        ParenthesizedParticleRule(),
+        AttachedParticleRule(),
+        StatAndSubjectParticleRule(),
+        DurationProbabilityRule(),
+        ArtifactCleanupRule(),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class RuleStats:
+    checked: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+
+class PostEditPipeline:
+    def __init__(self, target_lang: str, rules: list[PostEditRule] | None = None) -> None:
+        self.target_lang = target_lang
+        self.rules = rules if rules is not None else default_rules()
+        self.stats: dict[str, RuleStats] = {r.name: RuleStats() for r in self.rules}
+        self.strings_changed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return is_korean_language(self.target_lang)
+
+    def fix(self, source: str, dest: str) -> str:
+        return self.fix_all([(source, dest)])[0]
+
+    def fix_all(self, pairs: Iterable[tuple[str, str]]) -> list[str]:
+        """Apply every rule over the whole batch (rule-major) and return the fixed dest texts."""
+        items = list(pairs)
+        sources = [src or "" for src, _ in items]
+        original = [dst or "" for _, dst in items]
+        if not self.enabled:
+            return original
+
+        # Like the app, only strings that already look Korean are touched.
+        dests = list(original)
+        active: list[int] = []
+        for i, dst in enumerate(original):
+            if dst.strip() and _looks_like_korean_text(dst):
+                dests[i] = remove_invisible_separators(dst)
+                active.append(i)
+
+        for rule in self.rules:
+            stats = self.stats[rule.name]
+            gate = rule.gate
+            apply = rule.apply
+            t0 = time.perf_counter()
+            for i in active:
+                src = sources[i]
+                dst = dests[i]
+                if not gate(src, dst):
+                    continue
+                stats.checked += 1
+                fixed = apply(src, dst)
+                if fixed != dst:
+                    stats.hits += 1
+                    dests[i] = fixed
+            stats.seconds += time.perf_counter() - t0
+
+        self.strings_changed += sum(1 for a, b in zip(original, dests) if a != b)
+        return dests
+
+    def report_lines(self) -> list[str]:
+        lines = [f"[post-edit] changed={self.strings_changed}"]
+        for rule in self.rules:
+            s = self.stats[rule.name]
+            lines.append(f"[post-edit]   {rule.name}: hits={s.hits} checked={s.checked} time={s.seconds * 1000:.1f}ms")
+        return lines
+
+
+def main(argv: list[str]) -> int:
+    from translate_xtranslator_xml_gemini import read_xml_prolog, write_xml
+    import xml.etree.ElementTree as ET
+
+    ap = argparse.ArgumentParser(description="Apply the Korean post-edit fixers to an existing xTranslator XML.")
+    ap.add_argument("--input", required=True, type=Path, help="Input xTranslator XML file")
+    ap.add_argument("--output", type=Path, help="Output XML (default: overwrite --input)")
+    ap.add_argument("--target-lang", default=None, help="Override <Params><Dest> language")
+    args = ap.parse_args(argv)
+
+    bom, prolog = read_xml_prolog(args.input)
+    root = ET.parse(args.input).getroot()
+    target_lang = args.target_lang or root.findtext("./Params/Dest") or "korean"
+
+    nodes: list[ET.Element] = []
+    pairs: list[tuple[str, str]] = []
+    for node in root.findall("./Content/String"):
+        dst_elem = node.find("Dest")
+        if dst_elem is None or not dst_elem.text:
+            continue
+        nodes.append(dst_elem)
+        pairs.append((node.findtext("Source") or "", dst_elem.text))
+
+    pipeline = PostEditPipeline(target_lang)
+    t0 = time.perf_counter()
+    fixed = pipeline.fix_all(pairs)
+    elapsed = time.perf_counter() - t0
+    for dst_elem, text in zip(nodes, fixed):
+        dst_elem.text = text
+
+    out_path = args.output or args.input
+    write_xml(out_path, root, bom=bom, prolog=prolog)
+    for line in pipeline.report_lines():
+        print(line, file=sys.stderr)
+    print(f"[post-edit] strings={len(pairs)} elapsed={elapsed:.2f}s out={out_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
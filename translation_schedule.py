@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Priority order for translation work, so a run that stops early has done the most visible strings.
+
+Each item gets a priority from its record type (`REC`, e.g. `WEAP:FULL`) using `PATTERN=N` rules (fnmatch
+patterns, first match wins, lower runs first). Items in the background tier (`BACKGROUND_PRIORITY` or
+longer than the long-text limit, typically `BOOK:DESC`) run last and are always streamed, so a truncated
+response keeps the finished items. Batches never mix priorities.
+
+`ScheduleCheckpoint` writes a small JSON file next to the cache with done/total per priority and per
+record type while the run goes on; the cache itself is what a later run resumes from.
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+BACKGROUND_PRIORITY = 9
+DEFAULT_PRIORITY = 5
+DEFAULT_LONG_TEXT_CHARS = 2000
+
+# Names first, then short spell/effect/perk descriptions, then everything else; books in the background.
+DEFAULT_PRIORITY_RULES: list[tuple[str, int]] = [
+    ("*:FULL", 0),
+    ("*:NNAM", 0),
+    ("*:SHRT", 0),
+    ("SPEL:DESC", 1),
+    ("MGEF:DNAM", 1),
+    ("PERK:DESC", 1),
+    ("BOOK:DESC", BACKGROUND_PRIORITY),
+]
+
+
+def parse_priority_rules(values: list[str] | None) -> list[tuple[str, int]]:
+    """`PATTERN=N` items from repeated/comma-separated `--priority` values, ahead of the defaults."""
+    rules: list[tuple[str, int]] = []
+    for value in values or []:
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            pattern, sep, number = item.rpartition("=")
+            if not sep or not pattern.strip() or not number.strip().lstrip("-").isdigit():
+                raise SystemExit(f"bad --priority rule (expected PATTERN=N, e.g. BOOK:DESC=9): {item}")
+            rules.append((pattern.strip().upper(), int(number)))
+    return rules + DEFAULT_PRIORITY_RULES
+
+
+def priority_for(rec: str, rules: list[tuple[str, int]]) -> int:
+    rec = rec.upper()
+    for pattern, priority in rules:
+        if fnmatch.fnmatchcase(rec, pattern):
+            return priority
+    return DEFAULT_PRIORITY
+
+
+def schedule_work(work: list[dict[str, Any]], rules: list[tuple[str, int]], *, long_text_chars: int) -> list[dict[str, Any]]:
+    """Set `priority`/`background` on every item and return them ordered (stable within a priority)."""
+    for it in work:
+        priority = priority_for(it.get("rec") or "", rules)
+        if long_text_chars and len(it["src"]) > long_text_chars:
+            priority = max(priority, BACKGROUND_PRIORITY)
+        it["priority"] = priority
+        it["background"] = priority >= BACKGROUND_PRIORITY
+    return sorted(work, key=lambda it: it["priority"])
+
+
+@dataclass
+class _Counts:
+    total: int = 0
+    done: int = 0
+
+
+class ScheduleCheckpoint:
+    """done/total per priority and record type, rewritten atomically at most every `interval_s` seconds."""
+
+    def __init__(self, path: Path, work: list[dict[str, Any]], *, source: str, interval_s: float = 2.0) -> None:
+        self.path = path
+        self.source = source
+        self.interval_s = interval_s
+        self._last_write = 0.0
+        self._by_priority: dict[int, _Counts] = {}
+        self._by_rec: dict[str, _Counts] = {}
+        for it in work:
+            self._by_priority.setdefault(it.get("priority", DEFAULT_PRIORITY), _Counts()).total += 1
+            self._by_rec.setdefault(it.get("rec") or "", _Counts()).total += 1
+
+    def mark_done(self, it: dict[str, Any]) -> None:
+        self._by_priority[it.get("priority", DEFAULT_PRIORITY)].done += 1
+        self._by_rec[it.get("rec") or ""].done += 1
+        if time.monotonic() - self._last_write >= self.interval_s:
+            self.save("running")
+
+    def save(self, status: str) -> None:
+        self._last_write = time.monotonic()
+        payload = {
+            "source": self.source,
+            "status": status,
+            "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "done": sum(c.done for c in self._by_priority.values()),
+            "total": sum(c.total for c in self._by_priority.values()),
+            "priorities": {str(p): [c.done, c.total] for p, c in sorted(self._by_priority.items())},
+            "records": {rec or "?": [c.done, c.total] for rec, c in sorted(self._by_rec.items())},
+        }
+        try:
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError as ex:
+            # Best-effort: the cache still has every finished translation.
+            print(f"[schedule] checkpoint not written ({self.path}): {ex}", file=sys.stderr)
+
+    def summary_line(self) -> str:
+        parts = [f"p{p}={c.done}/{c.total}" for p, c in sorted(self._by_priority.items())]
+        return "[schedule] " + " ".join(parts)
+
+
+def checkpoint_path_for_cache(cache_path: Path) -> Path:
+    name = cache_path.name
+    if name.endswith(".gemini_cache.jsonl"):
+        return cache_path.with_name(name[: -len(".gemini_cache.jsonl")] + ".gemini_progress.json")
+    return cache_path.with_name(name + ".progress.json")